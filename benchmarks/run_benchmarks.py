@@ -0,0 +1,404 @@
+"""
+Headless benchmarks for the core data paths
+
+Run from the repository root:
+
+    python -m benchmarks.run_benchmarks --sizes 1000 100000 1000000 --output bench.json
+
+Results are written as JSON so runs of different versions can be compared.
+The Tk benchmarks run on $DISPLAY, or on a private Xvfb server when Xvfb is
+installed; otherwise they are reported as skipped.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import generate_ledger
+from src.utils.aggregates import CategoryTotals, LedgerTotals
+from src.utils.analytics import LedgerArrays
+from src.utils.balance_index import BalanceIndex
+from src.utils.csv_importer import CsvImporter
+from src.utils.duplicates import Deduplicator, DuplicateIndex
+from src.utils.ledger import Ledger
+from src.utils.ledger_io import LedgerIO
+from src.utils.parallel_import import ParallelCsvImporter
+from src.utils.search_index import SearchIndex
+from src.utils.sort_index import SortIndex
+from src.utils.sqlite_store import SqliteStore
+
+DEFAULT_SIZES = [1000, 100000, 1000000]
+
+# Number of statement files the parallel import benchmark splits a ledger into
+STATEMENT_FILES = 4
+
+# Indexes the window builds in steps after adopting a mapped ledger (main.SUMMED_INDEXES)
+SUMMED_INDEXES = ("totals", "categories", "balance")
+
+class BenchmarkRun:
+    """Collects timings and skipped benchmarks for one run"""
+
+    def __init__(self):
+        self.results = []
+        self.skipped = []
+
+    def time(self, name, size, function, *args):
+        """Time a single call and record it"""
+        start = time.perf_counter()
+        value = function(*args)
+        seconds = time.perf_counter() - start
+        self.results.append({
+            "name": name,
+            "size": size,
+            "seconds": round(seconds, 6),
+            "rows_per_second": round(size / seconds) if seconds > 0 else None
+        })
+        print(f"{name:<40} {size:>9,} rows {seconds:>10.4f} s", flush=True)
+        return value
+
+    def skip(self, name, reason):
+        """Record a benchmark that could not run"""
+        self.skipped.append({"name": name, "reason": reason})
+        print(f"{name:<40} skipped: {reason}", flush=True)
+
+def ledger_bytes(ledger):
+    """Approximate the memory held by the ledger columns"""
+    return (
+        sys.getsizeof(ledger.descriptions)
+        + ledger.dates.itemsize * len(ledger.dates)
+        + ledger.amounts.itemsize * len(ledger.amounts)
+        + ledger.types.itemsize * len(ledger.types)
+        + ledger.categories.itemsize * len(ledger.categories)
+    )
+
+def bench_file_io(run, ledger, workdir):
+    """Time save/load/export/import through the path-based I/O layer"""
+    size = len(ledger)
+    totals = LedgerTotals()
+    totals.on_reset(ledger)
+    data = {
+        "transactions": ledger,
+        "total_income": totals.income,
+        "total_expenses": totals.expenses,
+        "saved_date": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    }
+
+    json_path = os.path.join(workdir, f"ledger_{size}.json")
+    run.time("io.save_json", size, LedgerIO.save_json, data, json_path)
+    run.time("io.load_json", size, LedgerIO.load_json, json_path)
+
+    binary_path = os.path.join(workdir, f"ledger_{size}.ledger")
+    run.time("io.save_binary", size, LedgerIO.save_binary, data, binary_path)
+    run.time("io.load_binary", size, LedgerIO.load_binary, binary_path)
+    run.time("io.map_binary", size, LedgerIO.map_binary, binary_path)
+
+    csv_path = os.path.join(workdir, f"ledger_{size}.csv")
+    run.time("io.export_csv", size, LedgerIO.export_csv, ledger, csv_path)
+    run.time("io.import_csv", size, LedgerIO.import_csv, csv_path)
+
+    run.time("csv_importer.stream", size, stream_csv, csv_path)
+
+    # The same rows as separate statements, parsed in worker processes and merged
+    statement_paths = []
+    step = -(-size // STATEMENT_FILES)
+    for number, start in enumerate(range(0, size, step)):
+        statement = Ledger()
+        statement.extend_ledger(ledger, start, start + step)
+        statement_paths.append(os.path.join(workdir, f"statement_{size}_{number}.csv"))
+        LedgerIO.export_csv(statement, statement_paths[-1])
+    run.time(f"csv_importer.parallel[{len(statement_paths)} files]", size,
+             drain, ParallelCsvImporter(statement_paths))
+
+    db_path = os.path.join(workdir, f"ledger_{size}.db")
+    run.time("io.save_sqlite", size, LedgerIO.save, data, db_path)
+    run.time("io.load_sqlite", size, LedgerIO.load, db_path)
+    store = SqliteStore(db_path)
+    try:
+        transaction = ledger.record(0)
+        run.time("sqlite.insert_one", 1, store.insert, transaction)
+    finally:
+        store.close()
+
+def bench_adopt(run, size, workdir):
+    """Time opening a binary ledger the way the window does: map it, then take it over"""
+    path = os.path.join(workdir, f"ledger_{size}.ledger")
+    target = Ledger()
+    target.attach("totals", LedgerTotals())
+    target.attach("categories", CategoryTotals())
+    target.attach("balance", BalanceIndex())
+    target.attach("search", SearchIndex())
+    target.attach("sort", SortIndex())
+    target.attach("duplicates", DuplicateIndex())
+
+    # What blocks the window before the rows are listed, then the steps after it
+    mapped = LedgerIO.map_binary(path)["transactions"]
+    run.time("adopt.replace_deferred", size, target.replace, mapped, SUMMED_INDEXES)
+    run.time("adopt.catch_up", size, target.catch_up)
+
+    # Rebuilding every index at once, for comparison
+    mapped = LedgerIO.map_binary(path)["transactions"]
+    run.time("adopt.replace_rebuild", size, target.replace, mapped)
+
+def stream_csv(path):
+    """Drain a CsvImporter the way the UI does, without Tk"""
+    return drain(CsvImporter(path))
+
+def drain(importer):
+    """Start a BatchLoader and append its batches to a ledger the way the UI does"""
+    importer.start()
+    ledger = Ledger()
+    while not importer.done():
+        for batch in importer.get_batches():
+            ledger.extend_ledger(batch)
+        time.sleep(0.001)
+    for batch in importer.get_batches():
+        ledger.extend_ledger(batch)
+    return ledger
+
+def bench_totals(run, ledger):
+    """Time building the totals index and incremental inserts"""
+    size = len(ledger)
+    copy = Ledger()
+    copy.extend_ledger(ledger)
+    run.time("totals.build", size, copy.attach, "totals", LedgerTotals())
+
+    def append_rows(count):
+        for transaction in ledger.records(0, count):
+            copy.append(transaction)
+
+    count = min(size, 1000)
+    run.time("totals.incremental_append_1000", count, append_rows, count)
+
+    categories = run.time("categories.build", size, copy.attach, "categories", CategoryTotals())
+    run.time("categories.top", size, categories.top, Ledger.EXPENSE, 8)
+
+def bench_balance(run, ledger):
+    """Time building the balance index, back-dated inserts and balance-as-of queries"""
+    size = len(ledger)
+    copy = Ledger()
+    copy.extend_ledger(ledger)
+    balance = run.time("balance.build", size, copy.attach, "balance", BalanceIndex())
+
+    # Spread over the whole date range, so inserts land in the middle of the history
+    count = min(size, 1000)
+    step = max(size // count, 1)
+
+    def insert_rows():
+        for row in range(0, size, step):
+            copy.append(ledger.record(row))
+
+    def query_balances():
+        for row in range(0, size, step):
+            balance.balance_at(ledger.dates[row])
+
+    run.time("balance.backdated_append_1000", count, insert_rows)
+    run.time("balance.query_1000", count, query_balances)
+
+def bench_analytics(run, ledger):
+    """Time copying the ledger into NumPy arrays and vectorized statistics over them"""
+    size = len(ledger)
+    copy = Ledger()
+    copy.extend_ledger(ledger)
+    arrays = copy.attach("arrays", LedgerArrays())
+    run.time("analytics.build", size, arrays.refresh)
+    run.time("analytics.totals", size, arrays.totals)
+    run.time("analytics.by_month", size, arrays.by_month)
+    run.time("analytics.summary", size, arrays.summary)
+    run.time("analytics.histogram", size, arrays.histogram)
+
+def bench_duplicates(run, ledger):
+    """Time building the duplicate index and checking a full re-import against it"""
+    size = len(ledger)
+    copy = Ledger()
+    copy.extend_ledger(ledger)
+    index = copy.attach("duplicates", DuplicateIndex())
+    run.time("duplicates.build", size, index.build)
+
+    # Every row of a re-imported statement is a duplicate
+    run.time("duplicates.filter_reimport", size, lambda: Deduplicator(index).filter(ledger))
+
+def bench_startup(run):
+    """Time the imports before the window can open, and the charts import deferred to the background"""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    def import_in_new_interpreter(module):
+        subprocess.run([sys.executable, "-c", f"import {module}"], cwd=root, check=True)
+
+    # Each includes starting the interpreter
+    run.time("startup.import_main", 0, import_in_new_interpreter, "main")
+    run.time("startup.import_charts", 0, import_in_new_interpreter, "src.components.charts")
+
+def bench_search(run, ledger):
+    """Time building the search index and typical queries against it"""
+    size = len(ledger)
+    copy = Ledger()
+    search = copy.attach("search", SearchIndex())
+    copy.replace(ledger)
+    run.time("search.build", size, search.catch_up)
+
+    def first_screen(query):
+        # What the list does per keystroke: search, then read the first rows
+        matches = search.search(query)
+        return [matches[position] for position in range(min(len(matches), 12))]
+
+    for query in ("coffee", "e", "salary", "#12"):
+        run.time(f"search.query[{query}]", size, first_screen, query)
+
+def bench_timeline(run, ledger):
+    """Time rebuilding the running balance from the balance index and downsampling it to 800 pixels"""
+    from src.utils.timeline import BalanceTimeline
+
+    def sample_balance():
+        timeline = BalanceTimeline(ledger.indexes["balance"])
+        bounds = timeline.bounds()
+        return timeline.sample(bounds[0], bounds[1], 800) if bounds else None
+
+    run.time("charts.balance_timeline", len(ledger), sample_balance)
+
+def bench_charts(run, ledger):
+    """Time creating FinancialCharts over a ledger, then update_charts plus one draw"""
+    import tkinter as tk
+    try:
+        from src.components.charts import FinancialCharts
+    except ImportError as e:
+        run.skip("charts.create", f"matplotlib unavailable ({e})")
+        return
+    from src.styles.theme import AppTheme
+
+    ledger.attach("totals", LedgerTotals())
+    ledger.attach("categories", CategoryTotals())
+    ledger.attach("balance", BalanceIndex())
+
+    root = tk.Tk()
+    root.geometry("1200x800")
+    try:
+        charts = run.time("charts.create", len(ledger), FinancialCharts, root, AppTheme().colors, ledger)
+
+        def redraw():
+            charts.update_charts()
+            charts.render()
+
+        run.time("charts.update", len(ledger), redraw)
+    finally:
+        root.destroy()
+
+@contextmanager
+def display():
+    """Yield True if a display is available, starting Xvfb when needed"""
+    if os.environ.get("DISPLAY"):
+        yield True
+        return
+
+    xvfb = shutil.which("Xvfb")
+    if not xvfb:
+        yield False
+        return
+
+    server = subprocess.Popen([xvfb, ":97", "-screen", "0", "1920x1080x24"],
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    os.environ["DISPLAY"] = ":97"
+    time.sleep(0.5)
+    try:
+        yield True
+    finally:
+        del os.environ["DISPLAY"]
+        server.terminate()
+        server.wait()
+
+def bench_transaction_list(run, ledger, virtual):
+    """Time TransactionList.bulk_load until the last chunk is in"""
+    import tkinter as tk
+    from src.components.transactions import TransactionList
+
+    root = tk.Tk()
+    root.geometry("1200x800")
+    try:
+        target = Ledger()
+        target.attach("search", SearchIndex())
+        target.attach("sort", SortIndex())
+        transaction_list = TransactionList(root, target, virtual=virtual)
+        root.update()
+        finished = []
+
+        def load():
+            transaction_list.bulk_load(ledger, lambda loaded, cancelled: finished.append(loaded))
+            while not finished:
+                root.update()
+
+        mode = "virtual" if virtual else "items"
+        run.time(f"transaction_list.bulk_load_{mode}", len(ledger), load)
+    finally:
+        root.destroy()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run headless Personal Finance Tracker benchmarks")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                        help="ledger sizes to benchmark")
+    parser.add_argument("--output", default="bench_output.json",
+                        help="path of the JSON results file")
+    parser.add_argument("--no-gui", action="store_true",
+                        help="skip the Tk benchmarks")
+    args = parser.parse_args(argv)
+
+    run = BenchmarkRun()
+    memory = []
+    bench_startup(run)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        for size in args.sizes:
+            ledger = run.time("synthetic.generate", size, generate_ledger, size)
+            memory.append({"size": size, "ledger_bytes": ledger_bytes(ledger)})
+
+            bench_file_io(run, ledger, workdir)
+            bench_adopt(run, size, workdir)
+            bench_totals(run, ledger)
+            bench_search(run, ledger)
+            bench_balance(run, ledger)
+            bench_analytics(run, ledger)
+            bench_duplicates(run, ledger)
+            ledger.attach("totals", LedgerTotals())
+            ledger.attach("categories", CategoryTotals())
+            ledger.attach("balance", BalanceIndex())
+            bench_timeline(run, ledger)
+
+    if args.no_gui:
+        run.skip("transaction_list.bulk_load", "disabled with --no-gui")
+        run.skip("charts.create", "disabled with --no-gui")
+    else:
+        with display() as available:
+            if not available:
+                run.skip("transaction_list.bulk_load", "no $DISPLAY and Xvfb not found")
+                run.skip("charts.create", "no $DISPLAY and Xvfb not found")
+            else:
+                for size in args.sizes:
+                    ledger = generate_ledger(size)
+                    bench_charts(run, ledger)
+                    bench_transaction_list(run, ledger, virtual=True)
+                    # One Tk item per row is only practical for the small sizes
+                    if size <= 100000:
+                        bench_transaction_list(run, ledger, virtual=False)
+
+    report = {
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "sizes": args.sizes,
+        "results": run.results,
+        "memory": memory,
+        "skipped": run.skipped
+    }
+    with open(args.output, 'w') as file:
+        json.dump(report, file, indent=2)
+    print(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+import random
+from datetime import date, timedelta
+from src.utils.ledger import Ledger
+
+# Merchants with a typical expense size, used as the center of a log-normal
+# spread, and their category
+EXPENSE_MERCHANTS = [
+    ("Grocery Store", 60.0, "Groceries"),
+    ("Coffee Shop", 5.5, "Dining"),
+    ("Gas Station", 45.0, "Transport"),
+    ("Restaurant", 35.0, "Dining"),
+    ("Online Shopping", 40.0, "Shopping"),
+    ("Pharmacy", 18.0, "Health"),
+    ("Electric Bill", 90.0, "Utilities"),
+    ("Internet Bill", 60.0, "Utilities"),
+    ("Phone Bill", 45.0, "Utilities"),
+    ("Rent", 1400.0, "Housing"),
+    ("Gym Membership", 30.0, "Health"),
+    ("Streaming Service", 13.0, "Entertainment"),
+    ("Public Transit", 2.75, "Transport"),
+    ("Bookstore", 22.0, "Shopping"),
+    ("Hardware Store", 55.0, "Home"),
+]
+
+INCOME_SOURCES = [
+    ("Salary", 3200.0, "Salary"),
+    ("Freelance Project", 650.0, "Freelance"),
+    ("Interest", 12.0, "Investments"),
+    ("Refund", 35.0, "Refunds"),
+    ("Dividends", 80.0, "Investments"),
+]
+
+def generate_ledger(count, seed=42, start=date(2015, 1, 1), per_day=6.0):
+    """
+    Generate a synthetic ledger with realistic dates, amounts, descriptions and categories
+
+    Transactions are in date order, several per day. Expenses dominate and
+    follow a log-normal spread around a per-merchant typical amount; income
+    is mostly salary, paid on the 1st and 15th.
+
+    Args:
+        count (int): Number of transactions to generate
+        seed (int): Random seed, so runs are comparable between versions
+        start (date): Date of the first transaction
+        per_day (float): Average number of transactions per day
+
+    Returns:
+        Ledger: The generated transactions
+    """
+    rng = random.Random(seed)
+    ledger = Ledger()
+    day = start
+    remaining_today = 0
+
+    for _ in range(count):
+        # Advance through the calendar with a Poisson-like number of rows per day
+        while remaining_today == 0:
+            day += timedelta(days=1)
+            remaining_today = int(rng.expovariate(1 / per_day)) + (1 if day.day in (1, 15) else 0)
+
+        if day.day in (1, 15) and remaining_today == 1:
+            description, typical, category = INCOME_SOURCES[0]
+            transaction_type = "Income"
+        elif rng.random() < 0.04:
+            description, typical, category = rng.choice(INCOME_SOURCES[1:])
+            transaction_type = "Income"
+        else:
+            description, typical, category = rng.choice(EXPENSE_MERCHANTS)
+            transaction_type = "Expense"
+
+        # Some descriptions carry a reference number, like real bank exports
+        if rng.random() < 0.3:
+            description = f"{description} #{rng.randint(1000, 9999)}"
+
+        amount = round(typical * rng.lognormvariate(0, 0.35), 2)
+        ledger.append_row({
+            'date': day.isoformat(),
+            'description': description,
+            'amount': max(amount, 0.01),
+            'type': transaction_type,
+            'category': category
+        })
+        remaining_today -= 1
+
+    ledger.notify_append(0, len(ledger))
+    return ledger
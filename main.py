@@ -2,13 +2,29 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 from src.components.loading_screen import LoadingScreen
 from src.components.transactions import TransactionInput, TransactionList
-from src.components.charts import FinancialCharts
+from src.components.chart_panel import ChartPanel
 from src.styles.theme import AppTheme
 from src.utils.animations import ValueAnimator
 from src.utils.file_handler import FileHandler
-import time
+from src.utils.json_writer import JsonWriter
+from src.utils.ledger import Ledger
+from src.utils.ledger_io import describe_skipped
+from src.utils.aggregates import CategoryTotals, LedgerTotals
+from src.utils.balance_index import BalanceIndex
+from src.utils.duplicates import Deduplicator, DuplicateIndex
+from src.utils.search_index import SearchIndex
+from src.utils.sort_index import SortIndex
+from src.utils.sqlite_store import SqliteStore
+from src.utils.journal import Journal, JournalRecovery, DEFAULT_DIRECTORY as AUTOSAVE_DIRECTORY
+import sys
 import datetime
 
+# Running sums built in steps after a file is adopted, rather than before it is shown
+SUMMED_INDEXES = ("totals", "categories", "balance")
+
+# Rows passed to those sums per step between window events
+INDEX_STEP = 50000
+
 class PersonalFinanceTracker:
     def __init__(self, root):
         self.root = root
@@ -46,7 +62,7 @@ class PersonalFinanceTracker:
         self.menu_highlight.grid(row=1, column=0, sticky="ew")
         
         # Show loading screen
-        loading = LoadingScreen(root)
+        self.loading = LoadingScreen(root)
         
         # Set minimum window size
         self.root.minsize(1200, 800)
@@ -56,11 +72,48 @@ class PersonalFinanceTracker:
         screen_height = root.winfo_screenheight()
         self.root.geometry(f"{screen_width}x{screen_height}+0+0")
         
-        # Initialize transaction data
-        self.transactions = []
-        self.total_income = 0.0
-        self.total_expenses = 0.0
+        # Initialize transaction data (one ledger shared by every view)
+        self.ledger = Ledger()
+        
+        # Running totals maintained by the ledger on every change
+        self.totals = self.ledger.attach("totals", LedgerTotals())
+        
+        # Income and expenses per category, for the category chart
+        self.ledger.attach("categories", CategoryTotals())
+        
+        # Prefix sums by date for balance-as-of and date range queries
+        self.balance = self.ledger.attach("balance", BalanceIndex())
+        
+        # Search and sort indexes behind the transaction list
+        self.ledger.attach("search", SearchIndex())
+        self.ledger.attach("sort", SortIndex())
+        
+        # Transaction identities, for skipping duplicates when importing into current data
+        self.duplicates = self.ledger.attach("duplicates", DuplicateIndex())
         
+        # Open SQLite ledger that new transactions are written to, if any
+        self.store = None
+        
+        # JSON save running in the background, if any
+        self.json_writer = None
+        
+        # Pending step of an adopted ledger's index catch-up, if any
+        self.index_job = None
+        
+        # Autosave journal, set once the last session has been restored
+        self.journal = None
+        self.root.protocol("WM_DELETE_WINDOW", self.exit_app)
+        
+        # Build the window in stages behind the loading screen; the last
+        # session and the charts then load in the background
+        self.loading.run([
+            ("Building interface...", self.setup_interface, 3),
+            ("Applying theme...", self.apply_native_widget_styles, 1),
+            ("Opening autosave...", self.setup_autosave, 1)
+        ], on_complete=self.startup_finished)
+    
+    def setup_interface(self):
+        """Create the main container and every section of the window"""
         # Create main container with modern styling
         self.main_container = ttk.Frame(self.root, padding="20", style="Main.TFrame")
         self.main_container.grid(row=2, column=0, sticky="nsew", padx=20, pady=20)
@@ -75,9 +128,75 @@ class PersonalFinanceTracker:
         self.setup_header()
         self.setup_balance_section()
         self.setup_main_content()
+    
+    def startup_finished(self):
+        """Load the charts once the window is shown"""
+        self.charts.start()
+    
+    def setup_autosave(self):
+        """Open the autosave journal and restore the last session from it in the background"""
+        try:
+            journal = Journal(AUTOSAVE_DIRECTORY)
+        except Exception as e:
+            messagebox.showwarning("Autosave Unavailable", f"Changes will not be autosaved: {str(e)}")
+            return
+        
+        # New transactions wait until the journal can record them
+        self.transaction_input.set_enabled(False, "Restoring last session...")
+        recovery = JournalRecovery(journal).start()
+        
+        def on_restored(loaded, cancelled):
+            self.refresh_totals()
+            self.charts.update_charts()
+            self.attach_journal(journal, recovery, cancelled)
+        
+        self.transaction_list.stream_load(recovery, on_restored)
+    
+    def attach_journal(self, journal, recovery, cancelled, poll_interval=50):
+        """
+        Start autosaving into the journal once its recovery has stopped reading
+        
+        Args:
+            journal (Journal): The recovered journal
+            recovery (JournalRecovery): Its recovery, which may still be running if cancelled
+            cancelled (bool): Whether the restore was cancelled before its rows were loaded
+            poll_interval (int): Milliseconds between checks of the recovery thread
+        """
+        # Records can only be numbered once recovery has set the journal's sequence
+        if recovery.thread.is_alive():
+            self.root.after(poll_interval, self.attach_journal, journal, recovery, cancelled, poll_interval)
+            return
         
-        # Apply theme overrides for native widgets
-        self.apply_native_widget_styles()
+        self.transaction_input.set_enabled(True)
+        if recovery.error:
+            messagebox.showwarning("Autosave Unavailable", f"Changes will not be autosaved: {recovery.error}")
+            return
+        self.journal = journal
+        if journal.warning and not cancelled:
+            messagebox.showwarning("Last Session Incomplete",
+                                   f"{journal.warning}.\n"
+                                   f"Only the transactions added after it was opened were restored.")
+        
+        # A cancelled or incomplete session is replaced by whatever the window
+        # holds now, so it isn't restored again
+        if cancelled or journal.warning:
+            journal.compact(self.ledger)
+        self.sync_journal()
+    
+    def sync_journal(self):
+        """Periodically fsync the journal so batched records reach the disk"""
+        if self.journal is not None:
+            self.journal.sync()
+            self.root.after(1000, self.sync_journal)
+    
+    def exit_app(self):
+        """Flush the autosave journal and close the application"""
+        # Let a background save finish so the file is complete
+        if self.json_writer is not None:
+            self.json_writer.wait()
+        if self.journal is not None:
+            self.journal.close()
+        self.root.quit()
     
     def setup_custom_menu(self):
         """Setup custom menu with buttons instead of standard menu"""
@@ -119,7 +238,7 @@ class PersonalFinanceTracker:
         file_menu.add_command(label="Export to CSV", command=self.export_to_csv)
         file_menu.add_command(label="Import from CSV", command=self.import_from_csv)
         file_menu.add_separator()
-        file_menu.add_command(label="Exit", command=self.root.quit)
+        file_menu.add_command(label="Exit", command=self.exit_app)
         
         # Help menu button
         self.help_button = tk.Menubutton(
@@ -158,173 +277,302 @@ class PersonalFinanceTracker:
         """Clear all data and start fresh"""
         if messagebox.askyesno("New Data", "Are you sure you want to clear all data? This cannot be undone."):
             # Reset transaction data
-            self.transactions = []
-            self.total_income = 0.0
-            self.total_expenses = 0.0
+            self.transaction_list.cancel_bulk_load()
+            self.cancel_index_catch_up()
+            self.ledger.clear()
+            self.set_store(None)
+            if self.journal is not None:
+                self.journal.compact(self.ledger)
             
             # Update UI
             self.income_label.config(text="$0.00")
             self.expense_label.config(text="$0.00")
             self.balance_label.config(text="$0.00")
+            self.refresh_month()
             
             # Clear transaction list
             self.transaction_list.clear_transactions()
             
             # Update charts
-            self.charts.update_charts(self.transactions)
+            self.charts.update_charts()
             
             messagebox.showinfo("New Data", "All data has been cleared.")
     
     def save_data(self):
         """Save financial data to a file"""
-        # Prepare data to save
+        if self.json_writer is not None:
+            messagebox.showinfo("Save In Progress", "Please wait until the current save has finished.")
+            return
+        
+        # Prepare data to save, with totals that include every row
+        self.ledger.catch_up()
         data = {
-            "transactions": self.transaction_list.get_all_transactions(),
-            "total_income": self.total_income,
-            "total_expenses": self.total_expenses,
+            "transactions": self.ledger,
+            "total_income": self.totals.income,
+            "total_expenses": self.totals.expenses,
             "saved_date": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         }
         
-        # Save data using FileHandler
-        if FileHandler.save_data(data):
-            messagebox.showinfo("Save Successful", "Your financial data has been saved successfully.")
+        # Save data using FileHandler; JSON is written in the background
+        result = FileHandler.save_data(data)
+        if isinstance(result, JsonWriter):
+            self.json_writer = result
+            self.watch_json_save()
+        elif result:
+            self.save_finished(result)
+    
+    def watch_json_save(self, poll_interval=100):
+        """Poll a background JSON save and report how it ended"""
+        writer = self.json_writer
+        if not writer.finished:
+            self.root.after(poll_interval, self.watch_json_save, poll_interval)
+            return
+        
+        self.json_writer = None
+        if writer.error:
+            messagebox.showerror("Save Error", f"An error occurred while saving: {writer.error}")
+        else:
+            self.save_finished(writer.path)
+    
+    def save_finished(self, file_path):
+        """Keep track of the saved file and confirm the save"""
+        # Keep a saved database open so new transactions are inserted as they are added
+        if file_path.lower().endswith((".db", ".sqlite")):
+            self.set_store(SqliteStore(file_path))
+        else:
+            self.set_store(None)
+        
+        # A binary ledger holds exactly the current rows, so autosave can refer to it
+        if file_path.lower().endswith(".ledger") and self.journal is not None:
+            self.journal.compact(self.ledger, source=file_path)
+        messagebox.showinfo("Save Successful", "Your financial data has been saved successfully.")
+    
+    def set_store(self, store):
+        """Switch the SQLite ledger that new transactions are written to"""
+        if self.store is not None and self.store is not store:
+            self.store.close()
+        self.store = store
     
     def load_data(self):
         """Load financial data from a file"""
         # Confirm if there's unsaved data
-        if self.transactions and messagebox.askyesno("Unsaved Data", 
+        if self.ledger and not messagebox.askyesno("Unsaved Data", 
                                                    "Loading will replace your current data. Continue?"):
-            # Load data using FileHandler
-            data = FileHandler.load_data()
+            return
+        
+        # Load data using FileHandler
+        data = FileHandler.load_data()
+        
+        if data:
+            transactions = data["transactions"]
             
-            if data:
-                # Update transaction data
-                self.transactions = data.get("transactions", [])
-                self.total_income = data.get("total_income", 0.0)
-                self.total_expenses = data.get("total_expenses", 0.0)
-                
-                # Update UI
-                self.income_label.config(text=f"${self.total_income:.2f}")
-                self.expense_label.config(text=f"${self.total_expenses:.2f}")
-                self.balance_label.config(text=f"${self.total_income - self.total_expenses:.2f}")
+            def on_loaded(loaded, cancelled):
+                # A JSON file's saved date and unreadable rows are only known once it is parsed
+                saved_date = getattr(transactions, "metadata", data).get("saved_date", "Unknown")
+                unreadable = describe_skipped(getattr(transactions, "skipped", None))
                 
-                # Update transaction list
-                self.transaction_list.clear_transactions()
-                for transaction in self.transactions:
-                    self.transaction_list.add_transaction(transaction, update_ui=False)
-                
-                # Update charts
-                self.charts.update_charts(self.transactions)
-                
-                # Show success message with saved date if available
-                saved_date = data.get("saved_date", "Unknown")
-                messagebox.showinfo("Load Successful", 
-                                   f"Your financial data has been loaded successfully.\nLast saved: {saved_date}")
-        elif not self.transactions:
-            # If no current data, load without confirmation
-            data = FileHandler.load_data()
+                if getattr(transactions, "error", None):
+                    messagebox.showerror("Load Error", 
+                                        f"An error occurred while loading: {transactions.error}\n"
+                                        f"{loaded} transactions were loaded before the error.")
+                elif cancelled:
+                    messagebox.showinfo("Load Cancelled",
+                                       f"Loading was cancelled after {loaded} transactions.")
+                elif unreadable:
+                    messagebox.showwarning("Loaded With Errors",
+                                           f"Your financial data has been loaded, but {unreadable}.\n"
+                                           f"Last saved: {saved_date}")
+                else:
+                    # Show success message with saved date if available
+                    messagebox.showinfo("Load Successful", 
+                                       f"Your financial data has been loaded successfully.\nLast saved: {saved_date}")
             
-            if data:
-                # Update transaction data
-                self.transactions = data.get("transactions", [])
-                self.total_income = data.get("total_income", 0.0)
-                self.total_expenses = data.get("total_expenses", 0.0)
-                
-                # Update UI
-                self.income_label.config(text=f"${self.total_income:.2f}")
-                self.expense_label.config(text=f"${self.total_expenses:.2f}")
-                self.balance_label.config(text=f"${self.total_income - self.total_expenses:.2f}")
-                
-                # Update transaction list
-                self.transaction_list.clear_transactions()
-                for transaction in self.transactions:
-                    self.transaction_list.add_transaction(transaction, update_ui=False)
-                
-                # Update charts
-                self.charts.update_charts(self.transactions)
-                
-                # Show success message with saved date if available
-                saved_date = data.get("saved_date", "Unknown")
-                messagebox.showinfo("Load Successful", 
-                                   f"Your financial data has been loaded successfully.\nLast saved: {saved_date}")
+            if data.get("mapped"):
+                self.adopt_ledger(transactions, on_loaded, data.get("source"))
+            else:
+                self.bulk_load_transactions(transactions, on_loaded)
+            self.set_store(data.get("store"))
     
     def export_to_csv(self):
         """Export transaction data to CSV"""
-        if not self.transactions:
+        if not self.ledger:
             messagebox.showinfo("No Data", "There is no data to export.")
             return
         
-        if FileHandler.export_to_csv(self.transactions):
+        if FileHandler.export_to_csv(self.ledger):
             messagebox.showinfo("Export Successful", "Your financial data has been exported to CSV successfully.")
     
     def import_from_csv(self):
-        """Import transaction data from CSV"""
-        # Confirm if there's unsaved data
-        if self.transactions and messagebox.askyesno("Unsaved Data", 
-                                                   "Importing will replace your current data. Continue?"):
-            transactions = FileHandler.import_from_csv()
+        """Import transaction data from CSV, replacing or adding to the current data"""
+        # Existing data is either kept, with duplicates of it skipped, or replaced
+        merge = False
+        if self.ledger:
+            merge = messagebox.askyesnocancel(
+                "Existing Data",
+                "Add the imported transactions to your current data?\n\n"
+                "Yes: add them, skipping transactions you already have\n"
+                "No: replace your current data"
+            )
+            if merge is None:
+                return
+        
+        # Parse the files in the background and load them into the ledger, ending in date order
+        importer = FileHandler.start_csv_import()
+        
+        if importer:
+            # Stop any load still running, so duplicates are checked against settled data
+            self.transaction_list.cancel_bulk_load()
+            self.cancel_index_catch_up()
+            deduplicator = Deduplicator(self.duplicates) if merge else None
             
-            if transactions:
-                # Reset current data
-                self.transactions = []
-                self.total_income = 0.0
-                self.total_expenses = 0.0
-                
-                # Process imported transactions
-                for transaction in transactions:
-                    if transaction['type'] == "Income":
-                        self.total_income += transaction['amount']
-                    else:
-                        self.total_expenses += transaction['amount']
-                
-                # Update UI
-                self.income_label.config(text=f"${self.total_income:.2f}")
-                self.expense_label.config(text=f"${self.total_expenses:.2f}")
-                self.balance_label.config(text=f"${self.total_income - self.total_expenses:.2f}")
-                
-                # Update transaction list
-                self.transaction_list.clear_transactions()
-                for transaction in transactions:
-                    self.transaction_list.add_transaction(transaction, update_ui=False)
+            def on_loaded(loaded, cancelled):
+                # Duplicates dropped against the ledger, then between the files themselves
+                skipped = getattr(importer, 'duplicates_skipped', 0)
+                if deduplicator is not None:
+                    skipped += deduplicator.skipped
+                skipped_text = f"\n{skipped} duplicate transactions were skipped." if skipped else ""
+                unreadable = describe_skipped(importer.skipped)
+                if unreadable:
+                    skipped_text += f"\n{unreadable}."
                 
-                # Update transactions list
-                self.transactions = transactions
-                
-                # Update charts
-                self.charts.update_charts(self.transactions)
-                
-                messagebox.showinfo("Import Successful", 
-                                   f"Successfully imported {len(transactions)} transactions.")
-        elif not self.transactions:
-            # If no current data, import without confirmation
-            transactions = FileHandler.import_from_csv()
+                if importer.error:
+                    messagebox.showerror("Import Error", 
+                                        f"An error occurred while importing: {importer.error}\n"
+                                        f"{loaded} transactions were imported before the error.")
+                elif cancelled:
+                    messagebox.showinfo("Import Cancelled",
+                                       f"Import was cancelled after {loaded} transactions.")
+                else:
+                    messagebox.showinfo("Import Successful", 
+                                       f"Successfully imported {loaded} transactions.{skipped_text}")
             
-            if transactions:
-                # Process imported transactions
-                for transaction in transactions:
-                    if transaction['type'] == "Income":
-                        self.total_income += transaction['amount']
-                    else:
-                        self.total_expenses += transaction['amount']
-                
-                # Update UI
-                self.income_label.config(text=f"${self.total_income:.2f}")
-                self.expense_label.config(text=f"${self.total_expenses:.2f}")
-                self.balance_label.config(text=f"${self.total_income - self.total_expenses:.2f}")
-                
-                # Update transaction list
-                self.transaction_list.clear_transactions()
-                for transaction in transactions:
-                    self.transaction_list.add_transaction(transaction, update_ui=False)
-                
-                # Update transactions list
-                self.transactions = transactions
-                
-                # Update charts
-                self.charts.update_charts(self.transactions)
-                
-                messagebox.showinfo("Import Successful", 
-                                   f"Successfully imported {len(transactions)} transactions.")
+            if merge:
+                on_complete = self.date_order_finished(importer, len(self.ledger), self.bulk_load_finished(on_loaded))
+                self.transaction_list.stream_load(importer, on_complete, deduplicator=deduplicator)
+            else:
+                self.reset_for_bulk_load()
+                on_complete = self.date_order_finished(importer, 0, self.bulk_load_finished(on_loaded))
+                self.transaction_list.stream_load(importer, on_complete)
+            
+            # Imported data lives only in memory until it is saved
+            self.set_store(None)
+    
+    def bulk_load_transactions(self, transactions, on_loaded):
+        """
+        Replace the current data in chunks without blocking the window
+        
+        Args:
+            transactions: A Ledger, or a BatchLoader streaming batches from a worker thread
+            on_loaded (callable): Called with (loaded_count, cancelled) when done
+        """
+        self.reset_for_bulk_load()
+        on_complete = self.bulk_load_finished(on_loaded)
+        if isinstance(transactions, Ledger):
+            self.transaction_list.bulk_load(transactions, on_complete)
+        else:
+            self.transaction_list.stream_load(transactions, on_complete)
+    
+    def adopt_ledger(self, ledger, on_loaded, source=None):
+        """
+        Replace the current data with a memory-mapped ledger, without copying it
+        
+        The rows are listed right away; the running sums take them in steps
+        between window events, and on_loaded is called once they have all.
+        
+        Args:
+            ledger (Ledger): Ledger whose rows are decoded on demand
+            on_loaded (callable): Called with (loaded_count, cancelled) when done
+            source (str): The unchanged .ledger file it was mapped from, if any
+        """
+        self.reset_for_bulk_load()
+        self.ledger.replace(ledger, deferred=SUMMED_INDEXES)
+        self.transaction_list.refresh()
+        
+        # Snapshot before any edit; an unchanged file is referred to rather than copied
+        if self.journal is not None:
+            self.journal.compact(self.ledger, source)
+        self.catch_up_indexes(self.bulk_load_finished(on_loaded, snapshot=False))
+    
+    def catch_up_indexes(self, on_complete):
+        """Pass adopted rows to the running sums one step at a time"""
+        self.index_job = None
+        if self.ledger.catch_up(INDEX_STEP):
+            on_complete(len(self.ledger), False)
+        else:
+            self.index_job = self.root.after(1, self.catch_up_indexes, on_complete)
+    
+    def cancel_index_catch_up(self):
+        """Stop stepping an adopted ledger into the running sums"""
+        if self.index_job is not None:
+            self.root.after_cancel(self.index_job)
+            self.index_job = None
+    
+    def date_order_finished(self, importer, start, on_complete):
+        """
+        Build a completion callback that first puts imported rows in date order
+        
+        A single CSV file is loaded in file order as it is read; rows from
+        start on are only sorted, and the running sums rebuilt in steps, if
+        the file wasn't already in date order.
+        
+        Args:
+            importer (BatchLoader): The import, whose in_date_order tells whether to sort
+            start (int): First imported row
+            on_complete (callable): Called with (loaded_count, cancelled) once the rows are in order
+        """
+        def on_loaded(loaded, cancelled):
+            if getattr(importer, "in_date_order", True) or not self.ledger.sort_by_date(start, SUMMED_INDEXES):
+                on_complete(loaded, cancelled)
+                return
+            self.transaction_list.refresh()
+            self.catch_up_indexes(lambda rows, _: on_complete(loaded, cancelled))
+        
+        return on_loaded
+    
+    def reset_for_bulk_load(self):
+        """Stop any load still in progress, then reset current data"""
+        self.transaction_list.cancel_bulk_load()
+        self.cancel_index_catch_up()
+        self.ledger.clear()
+        self.transaction_list.clear_transactions()
+    
+    def bulk_load_finished(self, on_loaded, snapshot=True):
+        """
+        Build the completion callback shared by every bulk load
+        
+        Args:
+            on_loaded (callable): Called with (loaded_count, cancelled) when done
+            snapshot (bool): Make the loaded ledger the autosave snapshot (False if it already is)
+        """
+        def on_complete(loaded, cancelled):
+            # Update totals and charts from whatever was loaded
+            self.refresh_totals()
+            self.charts.update_charts()
+            
+            # The loaded ledger becomes the new autosave snapshot
+            if snapshot and self.journal is not None:
+                self.journal.compact(self.ledger)
+            on_loaded(loaded, cancelled)
+        
+        return on_complete
+    
+    def refresh_totals(self):
+        """Update the balance labels from the ledger totals"""
+        self.income_label.config(text=f"${self.totals.income:.2f}")
+        self.expense_label.config(text=f"${self.totals.expenses:.2f}")
+        self.balance_label.config(text=f"${self.totals.balance:.2f}")
+        self.refresh_month()
+    
+    def refresh_month(self):
+        """Update the month-to-date line from the balance index"""
+        today = datetime.date.today()
+        month_start = today.replace(day=1)
+        income, expenses = self.balance.totals_between(month_start, today)
+        opening = self.balance.balance_at(month_start - datetime.timedelta(days=1))
+        self.month_label.config(
+            text=f"This month: ${income:,.2f} income, ${expenses:,.2f} expenses"
+                 f"  ·  Balance on {month_start:%b} 1: ${opening:,.2f}"
+        )
     
     def show_about(self):
         """Show about dialog"""
@@ -343,7 +591,8 @@ class PersonalFinanceTracker:
         - Save: Save your financial data to a file
         - Load: Load previously saved financial data
         - Export to CSV: Export your transactions to a CSV file
-        - Import from CSV: Import transactions from a CSV file
+        - Import from CSV: Import transactions from one or more CSV files, merged by date,
+          optionally adding them to your current data without duplicates
         - Exit: Close the application
         
         Adding Transactions:
@@ -355,6 +604,8 @@ class PersonalFinanceTracker:
         Viewing Data:
         - The top section shows your total income, expenses, and net balance
         - The left panel shows your transaction history
+        - Type in the search box above the history to filter it by description
+        - Click a column heading to sort the history by that column
         - The right panel displays charts visualizing your financial data
         """
         messagebox.showinfo("Help", help_text)
@@ -519,6 +770,16 @@ class PersonalFinanceTracker:
         ttk.Label(net_frame, text="Net Balance", style="Balance.TLabel").pack(side="left")
         self.balance_label = ttk.Label(net_frame, text="$0.00", style="PositiveBalance.TLabel")
         self.balance_label.pack(side="right", padx=10)
+        
+        # Month-to-date figures under the totals
+        self.month_label = ttk.Label(
+            inner_frame,
+            text="",
+            font=("Inter", 11),
+            foreground=self.theme.colors['text_secondary'],
+            background=self.theme.colors['card_bg']
+        )
+        self.month_label.grid(row=1, column=0, columnspan=6, pady=(10, 0))
     
     def setup_main_content(self):
         """Setup main content area with transaction input and lists"""
@@ -531,8 +792,10 @@ class PersonalFinanceTracker:
         left_content.pack(fill="both", expand=True)
         
         # Initialize transaction components
-        self.transaction_input = TransactionInput(left_content, self.handle_transaction_added)
-        self.transaction_list = TransactionList(left_content)
+        self.transaction_input = TransactionInput(
+            left_content, self.handle_transaction_added, lambda: self.ledger.category_names
+        )
+        self.transaction_list = TransactionList(left_content, self.ledger)
         
         # Right column: Charts
         right_frame = ttk.Frame(self.main_container, style="Card.TFrame")
@@ -542,48 +805,68 @@ class PersonalFinanceTracker:
         right_content = ttk.Frame(right_frame, style="Card.TFrame", padding=20)
         right_content.pack(fill="both", expand=True)
         
-        # Initialize charts
-        self.charts = FinancialCharts(right_content, self.theme.colors)
+        # Charts are created once matplotlib has loaded, see startup_finished()
+        self.charts = ChartPanel(right_content, self.theme.colors, self.ledger)
     
     def handle_transaction_added(self, transaction):
         """Handle new transaction added"""
-        # Add to transactions list
-        self.transactions.append(transaction)
+        # Animate from totals that include every row of an adopted file
+        self.ledger.catch_up()
+        old_income = self.totals.income
+        old_expenses = self.totals.expenses
+        old_balance = self.totals.balance
+        
+        # Add to the shared ledger (totals update with it)
+        self.ledger.append(transaction)
+        
+        # Write just this row to an open database
+        if self.store is not None:
+            self.store.insert(transaction)
+        
+        # Autosave the change as one journal record
+        if self.journal is not None:
+            self.journal.append(transaction)
+            if self.journal.needs_compaction():
+                self.journal.compact(self.ledger)
         
         # Update totals with animation
         if transaction['type'] == "Income":
             ValueAnimator.animate_value_change(
                 self.root,
                 self.income_label,
-                self.total_income,
-                self.total_income + transaction['amount']
+                old_income,
+                self.totals.income
             )
-            self.total_income += transaction['amount']
         else:
             ValueAnimator.animate_value_change(
                 self.root,
                 self.expense_label,
-                self.total_expenses,
-                self.total_expenses + transaction['amount']
+                old_expenses,
+                self.totals.expenses
             )
-            self.total_expenses += transaction['amount']
         
         # Update net balance
-        net_balance = self.total_income - self.total_expenses
         ValueAnimator.animate_value_change(
             self.root,
             self.balance_label,
-            net_balance - transaction['amount'] if transaction['type'] == "Expense" else net_balance,
-            net_balance
+            old_balance,
+            self.totals.balance
         )
         
+        self.refresh_month()
+        
         # Update transaction list
         self.transaction_list.add_transaction(transaction)
         
-        # Update charts with the transactions list
-        self.charts.update_charts(self.transactions)
+        # Update charts from the ledger
+        self.charts.update_charts()
 
 if __name__ == "__main__":
+    # Batch mode: work on ledger files without starting Tk
+    if "--headless" in sys.argv[1:]:
+        from src.utils.batch_cli import run
+        sys.exit(run([arg for arg in sys.argv[1:] if arg != "--headless"]))
+    
     root = tk.Tk()
     app = PersonalFinanceTracker(root)
     root.mainloop() 
\ No newline at end of file
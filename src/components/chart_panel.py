@@ -0,0 +1,68 @@
+import importlib
+import threading
+from tkinter import ttk
+
+# Imports matplotlib, which takes longer than building the rest of the window
+CHARTS_MODULE = "src.components.charts"
+
+class ChartPanel:
+    """
+    Stand-in for FinancialCharts until matplotlib is ready
+
+    The window is shown with a placeholder where the charts go. start()
+    imports the charts module on a background thread, and once it is
+    loaded the charts are created in the placeholder's place, drawing
+    whatever the ledger holds by then.
+    """
+
+    def __init__(self, parent, colors, ledger, poll_interval=50):
+        self.parent = parent
+        self.colors = colors
+        self.ledger = ledger
+        self.poll_interval = poll_interval
+
+        # The FinancialCharts, once created
+        self.charts = None
+
+        # Background import state
+        self.thread = None
+        self.error = None
+
+        # Placeholder with the same frame and title as the charts
+        self.placeholder = ttk.LabelFrame(parent, text="Financial Overview", padding="20")
+        self.placeholder.pack(fill="both", expand=True)
+        self.status_label = ttk.Label(self.placeholder, text="Loading charts...")
+        self.status_label.pack(expand=True)
+
+    def start(self):
+        """Start importing the charts module in the background"""
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.import_charts, daemon=True)
+            self.thread.start()
+            self.placeholder.after(self.poll_interval, self.poll)
+
+    def import_charts(self):
+        """Import matplotlib and the charts module (runs on the background thread)"""
+        try:
+            importlib.import_module(CHARTS_MODULE)
+        except Exception as e:
+            self.error = str(e)
+
+    def poll(self):
+        """Create the charts once the import has finished"""
+        if self.thread.is_alive():
+            self.placeholder.after(self.poll_interval, self.poll)
+            return
+
+        if self.error:
+            self.status_label.config(text=f"Charts are unavailable: {self.error}")
+            return
+
+        from src.components.charts import FinancialCharts
+        self.placeholder.destroy()
+        self.charts = FinancialCharts(self.parent, self.colors, self.ledger)
+
+    def update_charts(self):
+        """Redraw the charts, if they have been created"""
+        if self.charts is not None:
+            self.charts.update_charts()
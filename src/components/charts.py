@@ -1,10 +1,43 @@
+import math
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from matplotlib.ticker import FuncFormatter, MaxNLocator
+from PIL import Image, ImageTk
 from tkinter import ttk
+from src.utils.aggregates import PERIODS
+from src.utils.dates import iso_day, short_date
+from src.utils.render_scheduler import RenderScheduler
+from src.utils.timeline import BalanceTimeline
 
 class FinancialCharts:
-    def __init__(self, parent, colors):
+    RECENT_COUNT = 5  # Number of bars in the recent transactions chart
+    CATEGORY_COUNT = 8  # Expense categories shown before "Other"
+    TREND_BUCKETS = 36  # Number of most recent periods in the trend chart
+    TREND_TICKS = 6  # Most x-axis labels on the trend chart
+    ZOOM_STEP = 0.8  # Fraction of the balance chart's days kept per zoom-in step
+    
+    def __init__(self, parent, colors, ledger, incremental=True):
         self.colors = colors
+        self.ledger = ledger
+        
+        # Rollup period shown by the trend chart, one of aggregates.PERIODS
+        self.trend_period = "month"
+        
+        # Running balance: the timeline, its line, and the zoomed (first, last) day or None for all
+        self.timeline = None
+        self.balance_line = None
+        self.balance_empty = None
+        self.balance_view = None
+        
+        # In incremental mode artists are created once and only their data changes
+        self.incremental = incremental
+        self.artists = None
+        
+        # Resize state: latest size event and the bitmap shown while resizing
+        self.pending_resize = None
+        self.resize_snapshot = None
+        self.resize_preview = None
+        
         self.setup_charts(parent)
     
     def setup_charts(self, parent):
@@ -12,8 +45,19 @@ class FinancialCharts:
         self.charts_frame = ttk.LabelFrame(parent, text="Financial Overview", padding="20")
         self.charts_frame.pack(fill="both", expand=True)
         
+        # Period picker for the trend chart
+        trend_frame = ttk.Frame(self.charts_frame)
+        trend_frame.pack(fill="x", padx=5)
+        ttk.Label(trend_frame, text="Trend by:").pack(side="left", padx=(0, 5))
+        self.period_picker = ttk.Combobox(trend_frame, values=PERIODS, state="readonly", width=8)
+        self.period_picker.set(self.trend_period)
+        self.period_picker.pack(side="left")
+        self.period_picker.bind("<<ComboboxSelected>>", self.on_period_selected)
+        
         # Create figure for matplotlib with professional dark theme
-        self.fig, (self.pie_ax, self.bar_ax) = plt.subplots(2, 1, figsize=(8, 10), dpi=100)
+        self.fig, (self.pie_ax, self.category_ax, self.bar_ax, self.trend_ax, self.balance_ax) = plt.subplots(
+            5, 1, figsize=(8, 22), dpi=100
+        )
         self.fig.patch.set_facecolor(self.colors['card_bg'])
         
         # Style the charts
@@ -38,33 +82,265 @@ class FinancialCharts:
         
         # Create canvas with higher DPI for sharper rendering
         self.canvas = FigureCanvasTkAgg(self.fig, master=self.charts_frame)
-        canvas_widget = self.canvas.get_tk_widget()
+        self.canvas_widget = canvas_widget = self.canvas.get_tk_widget()
         canvas_widget.pack(fill="both", expand=True, padx=5, pady=5)
         
-        # Configure resize event
-        self.charts_frame.bind('<Configure>', self.on_resize)
+        # All renders go through one scheduler so bursts of requests are merged
+        self.scheduler = RenderScheduler(canvas_widget, self.render)
+        
+        # Configure resize event (replaces the canvas' own redraw-per-event handler)
+        canvas_widget.bind('<Configure>', self.on_resize)
         
-        # Initial empty charts
-        self.update_charts([])
+        # Mouse wheel zooms the running balance
+        self.canvas.mpl_connect('scroll_event', self.on_balance_scroll)
+        
+        # Initial charts
+        self.update_charts()
     
     def on_resize(self, event):
         """Handle resize event"""
-        w, h = event.width - 50, event.height - 50  # Increased padding
-        if w > 0 and h > 0:
-            self.fig.set_size_inches(w/100, h/100)  # Adjusted for higher DPI
+        if event.width <= 1 or event.height <= 1:
+            return
+        self.pending_resize = event
+        
+        # Show the last render scaled to the new size until resizing settles
+        self.show_resize_preview(event.width, event.height)
+        self.scheduler.request(settle=True)
+    
+    def show_resize_preview(self, width, height):
+        """Cover the canvas with the last rendered bitmap scaled to a size"""
+        if self.resize_snapshot is None:
+            if self.scheduler.performed == 0:
+                return  # Nothing has been rendered yet
+            buffer = self.canvas.buffer_rgba()
+            self.resize_snapshot = Image.frombuffer(
+                "RGBA", (buffer.shape[1], buffer.shape[0]), bytes(buffer), "raw", "RGBA", 0, 1
+            )
+        
+        scaled = self.resize_snapshot.resize((width, height), Image.NEAREST)
+        self.resize_preview = ImageTk.PhotoImage(scaled)
+        self.canvas_widget.delete("resize_preview")
+        self.canvas_widget.create_image(0, 0, anchor="nw", image=self.resize_preview, tags="resize_preview")
+    
+    def request_render(self):
+        """Ask for a redraw, merged with any other pending redraw"""
+        self.scheduler.request()
+    
+    def render(self):
+        """Apply the latest size, if it changed, and draw the figure once"""
+        if self.pending_resize is None:
             self.canvas.draw()
+            return
+        
+        event = self.pending_resize
+        self.pending_resize = None
+        self.canvas_widget.delete("resize_preview")
+        self.resize_snapshot = None
+        self.resize_preview = None
+        
+        # The Tk canvas resizes its image and figure, then draws once when idle
+        self.canvas.resize(event)
+        
+        # Resample the balance for the new width before that draw
+        self.draw_balance()
+    
+    def render_stats(self):
+        """Get requested vs. performed render counts"""
+        return self.scheduler.stats()
+    
+    def update_charts(self):
+        """Update the charts with current ledger data"""
+        if self.incremental:
+            self.update_artists()
+        else:
+            self.rebuild_charts()
+    
+    def on_period_selected(self, event=None):
+        """Show the trend for the period chosen in the picker"""
+        self.trend_period = self.period_picker.get()
+        self.update_charts()
+    
+    def category_data(self):
+        """
+        Get the largest expense categories, plus "Other", from the category totals
+        
+        Returns:
+            tuple: (labels, amounts), largest last so it is drawn at the top
+        """
+        categories = self.ledger.indexes["categories"]
+        pairs = categories.top(self.ledger.EXPENSE, self.CATEGORY_COUNT)[::-1]
+        return [label for label, _ in pairs], [amount for _, amount in pairs]
+    
+    def style_category_axes(self):
+        """Apply the bar chart styling, with horizontal bars, to the category chart"""
+        self.category_ax.set_facecolor(self.colors['card_bg'])
+        self.category_ax.spines['top'].set_visible(False)
+        self.category_ax.spines['right'].set_visible(False)
+        self.category_ax.spines['bottom'].set_color(self.colors['border'])
+        self.category_ax.spines['left'].set_color(self.colors['border'])
+        self.category_ax.grid(True, axis='x', linestyle='--', 
+                              alpha=0.15, color=self.colors['chart_grid'])
+        self.category_ax.tick_params(axis='both', length=0)
+        self.category_ax.set_title('Top Expense Categories',
+                                   pad=20,
+                                   fontsize=14,
+                                   color=self.colors['text'],
+                                   fontweight='bold')
+    
+    def trend_data(self):
+        """Get bucket keys, income and expenses for the trend chart from the ledger rollups"""
+        totals = self.ledger.indexes["totals"]
+        return totals.series(self.trend_period, self.TREND_BUCKETS)
+    
+    def trend_title(self):
+        """Title of the trend chart for the current period"""
+        return f'Income & Expenses by {self.trend_period.capitalize()}'
+    
+    def trend_ticks(self, keys):
+        """Get evenly spaced x positions and labels for the trend chart"""
+        step = max(1, math.ceil(len(keys) / self.TREND_TICKS))
+        positions = range(0, len(keys), step)
+        return positions, [keys[position] for position in positions]
+    
+    def style_trend_axes(self):
+        """Apply the bar chart styling to the trend chart"""
+        self.trend_ax.set_facecolor(self.colors['card_bg'])
+        self.trend_ax.spines['top'].set_visible(False)
+        self.trend_ax.spines['right'].set_visible(False)
+        self.trend_ax.spines['bottom'].set_color(self.colors['border'])
+        self.trend_ax.spines['left'].set_color(self.colors['border'])
+        self.trend_ax.grid(True, axis='y', linestyle='--', 
+                           alpha=0.15, color=self.colors['chart_grid'])
+        self.trend_ax.tick_params(axis='both', length=0)
+    
+    def style_balance_axes(self):
+        """Apply the trend chart styling, with day labels, to the balance chart"""
+        self.balance_ax.set_facecolor(self.colors['card_bg'])
+        self.balance_ax.spines['top'].set_visible(False)
+        self.balance_ax.spines['right'].set_visible(False)
+        self.balance_ax.spines['bottom'].set_color(self.colors['border'])
+        self.balance_ax.spines['left'].set_color(self.colors['border'])
+        self.balance_ax.grid(True, axis='y', linestyle='--', 
+                             alpha=0.15, color=self.colors['chart_grid'])
+        self.balance_ax.tick_params(axis='both', length=0)
+        
+        # x values are days since 1970-01-01
+        self.balance_ax.xaxis.set_major_locator(MaxNLocator(5, integer=True))
+        self.balance_ax.xaxis.set_major_formatter(FuncFormatter(lambda day, position: iso_day(int(day))))
+        
+        self.balance_ax.set_title('Running Balance (scroll to zoom)',
+                                  pad=20,
+                                  fontsize=14,
+                                  color=self.colors['text'],
+                                  fontweight='bold')
+    
+    def create_balance_artists(self):
+        """Create the running balance line and its empty-state text"""
+        self.balance_line, = self.balance_ax.plot([], [], color=self.colors['primary'], linewidth=1.5)
+        self.balance_empty = self.balance_ax.text(
+            0.5, 0.5, 'No transaction data available',
+            horizontalalignment='center',
+            verticalalignment='center',
+            transform=self.balance_ax.transAxes,
+            fontsize=12,
+            color=self.colors['text_secondary'],
+            style='italic'
+        )
+    
+    def balance_range(self):
+        """Get the (first, last) day the balance chart shows, or None without data"""
+        if self.timeline is None:
+            self.timeline = BalanceTimeline(self.ledger.indexes["balance"])
+        bounds = self.timeline.bounds()
+        if bounds is None:
+            return None
+        first, last = self.balance_view or bounds
+        if first == last:
+            # A single day still needs a width to show it
+            return first - 1, last + 1
+        return first, last
+    
+    def balance_data(self):
+        """
+        Get the running balance downsampled to the chart's pixel width
+        
+        Returns:
+            tuple: (days, balances, (first, last) day shown), or None without data
+        """
+        view = self.balance_range()
+        if view is None:
+            return None
+        width = self.balance_ax.get_window_extent().width
+        days, balances = self.timeline.sample(view[0], view[1], width)
+        return days, balances, view
+    
+    def draw_balance(self):
+        """Resample the running balance line for the current data, zoom and size"""
+        if self.balance_line is None:
+            return
+        data = self.balance_data()
+        self.balance_empty.set_visible(data is None)
+        if data is None:
+            self.balance_line.set_data([], [])
+            return
+        
+        days, balances, (first, last) = data
+        self.balance_line.set_data(days, balances)
+        self.balance_ax.set_xlim(first, last)
+        
+        # Fit the y axis to the balances in view
+        shown = balances[(days >= first) & (days <= last)]
+        if not len(shown):
+            shown = balances
+        low, high = float(shown.min()), float(shown.max())
+        margin = (high - low) * 0.05 or max(abs(high) * 0.05, 1)
+        self.balance_ax.set_ylim(low - margin, high + margin)
     
-    def update_charts(self, transactions):
-        """Update the charts with current data"""
-        # Calculate totals from transactions
-        total_income = 0
-        total_expenses = 0
+    def on_balance_scroll(self, event):
+        """Zoom the running balance around the mouse with the wheel"""
+        if event.inaxes is not self.balance_ax or event.xdata is None:
+            return
+        view = self.balance_range()
+        if view is None:
+            return
+        bounds = self.timeline.bounds()
         
-        for transaction in transactions:
-            if transaction['type'] == 'Income':
-                total_income += transaction['amount']
-            else:
-                total_expenses += transaction['amount']
+        factor = self.ZOOM_STEP if event.button == 'up' else 1 / self.ZOOM_STEP
+        first = event.xdata - (event.xdata - view[0]) * factor
+        last = event.xdata + (view[1] - event.xdata) * factor
+        
+        # Zooming out past the data shows all of it again; zooming in stops at a week
+        if first <= bounds[0] and last >= bounds[1]:
+            self.balance_view = None
+        elif last - first >= 7:
+            self.balance_view = (max(first, bounds[0]), min(last, bounds[1]))
+        
+        self.draw_balance()
+        self.request_render()
+    
+    def recent_data(self):
+        """Get bar labels and signed amounts for the most recent transactions"""
+        ledger = self.ledger
+        recent_dates = []
+        recent_amounts = []
+        
+        for index in range(max(len(ledger) - self.RECENT_COUNT, 0), len(ledger)):
+            recent_dates.append(short_date(ledger.dates[index]))
+            amount = ledger.amounts[index]
+            if ledger.types[index] == ledger.EXPENSE:
+                amount = -amount
+            recent_amounts.append(amount)
+        
+        return recent_dates, recent_amounts
+    
+    def rebuild_charts(self):
+        """Rebuild both charts from scratch"""
+        ledger = self.ledger
+        
+        # Read totals maintained by the ledger
+        totals = ledger.indexes["totals"]
+        total_income = totals.income
+        total_expenses = totals.expenses
         
         # Clear previous charts
         self.pie_ax.clear()
@@ -112,34 +388,8 @@ class FinancialCharts:
                              color=self.colors['text'],
                              fontweight='bold')
         
-        # Bar chart for recent transactions
-        recent_dates = []
-        recent_amounts = []
-        
-        # Get the 5 most recent transactions
-        recent_transactions = transactions[-5:] if len(transactions) > 0 else []
-        
-        for transaction in recent_transactions:
-            # Handle both datetime objects and string dates
-            if hasattr(transaction['date'], 'strftime'):
-                date_str = transaction['date'].strftime("%b %d")
-            else:
-                # If date is already a string (e.g., from loaded data)
-                date_str = transaction['date']
-                if len(date_str) > 6:  # If it's a full date string, try to shorten it
-                    try:
-                        from datetime import datetime
-                        date_obj = datetime.strptime(date_str, "%Y-%m-%d")
-                        date_str = date_obj.strftime("%b %d")
-                    except:
-                        # If parsing fails, just use the first 6 chars
-                        date_str = date_str[:6]
-            
-            recent_dates.append(date_str)
-            amount = transaction['amount']
-            if transaction['type'] == 'Expense':
-                amount = -amount
-            recent_amounts.append(amount)
+        # Bar chart for the 5 most recent transactions
+        recent_dates, recent_amounts = self.recent_data()
         
         if recent_dates:
             bars = self.bar_ax.bar(recent_dates, recent_amounts,
@@ -193,6 +443,314 @@ class FinancialCharts:
         self.bar_ax.tick_params(axis='x', rotation=0)
         self.bar_ax.tick_params(axis='both', length=0)
         
+        # Expense categories as horizontal bars, largest at the top
+        self.category_ax.clear()
+        self.style_category_axes()
+        labels, amounts = self.category_data()
+        if labels:
+            bars = self.category_ax.barh(range(len(labels)), amounts, height=0.7,
+                                         color=self.colors['warning'], alpha=0.9)
+            self.category_ax.set_yticks(range(len(labels)), labels)
+            self.category_ax.set_xlim(0, max(amounts) * 1.2 or 1)
+            for bar, amount in zip(bars, amounts):
+                self.category_ax.text(
+                    bar.get_width(), bar.get_y() + bar.get_height() / 2,
+                    f' ${amount:,.0f}',
+                    va='center',
+                    color=self.colors['text'],
+                    fontsize=10,
+                    fontweight='bold'
+                )
+        else:
+            self.category_ax.text(0.5, 0.5, 'No expense data available',
+                                  horizontalalignment='center',
+                                  verticalalignment='center',
+                                  transform=self.category_ax.transAxes,
+                                  fontsize=12,
+                                  color=self.colors['text_secondary'],
+                                  style='italic')
+        
+        # Trend chart drawn from the rollup buckets
+        self.trend_ax.clear()
+        self.style_trend_axes()
+        keys, income, expenses = self.trend_data()
+        if keys:
+            positions = range(len(keys))
+            self.trend_ax.plot(positions, income, color=self.colors['success'],
+                               linewidth=2, marker='o', markersize=3, label='Income')
+            self.trend_ax.plot(positions, expenses, color=self.colors['warning'],
+                               linewidth=2, marker='o', markersize=3, label='Expenses')
+            self.trend_ax.set_xticks(*self.trend_ticks(keys))
+            self.trend_ax.legend(loc='upper left', frameon=False)
+        else:
+            self.trend_ax.text(0.5, 0.5, 'No transaction data available',
+                               horizontalalignment='center',
+                               verticalalignment='center',
+                               transform=self.trend_ax.transAxes,
+                               fontsize=12,
+                               color=self.colors['text_secondary'],
+                               style='italic')
+        
+        self.trend_ax.set_title(self.trend_title(),
+                                pad=20,
+                                fontsize=14,
+                                color=self.colors['text'],
+                                fontweight='bold')
+        
+        # Running balance, downsampled to the chart width
+        self.balance_ax.clear()
+        self.style_balance_axes()
+        self.create_balance_artists()
+        self.draw_balance()
+        
         # Update the canvas with proper spacing
         self.fig.set_constrained_layout(True)
-        self.canvas.draw() 
\ No newline at end of file
+        self.request_render()
+    
+    def create_artists(self):
+        """Create every chart artist once, for later in-place updates"""
+        artists = {}
+        
+        # Set background color
+        self.pie_ax.set_facecolor(self.colors['card_bg'])
+        self.bar_ax.set_facecolor(self.colors['card_bg'])
+        
+        # Pie chart for Income vs Expenses, created with placeholder sizes
+        wedges, texts, autotexts = self.pie_ax.pie(
+            [1, 1],
+            labels=['Income', 'Expenses'],
+            colors=[self.colors['success'], self.colors['warning']],
+            autopct='%1.1f%%',
+            startangle=90,
+            textprops={'color': self.colors['text'], 'fontsize': 11},
+            wedgeprops={'edgecolor': self.colors['card_bg'], 
+                       'linewidth': 2,
+                       'antialiased': True}
+        )
+        
+        # Enhance percentage labels
+        plt.setp(autotexts, color=self.colors['text'], 
+                weight='bold', fontsize=11)
+        plt.setp(texts, fontsize=12)
+        artists['wedges'] = wedges
+        artists['labels'] = texts
+        artists['percentages'] = autotexts
+        
+        artists['pie_empty'] = self.pie_ax.text(
+            0.5, 0.5, 'No transaction data available',
+            horizontalalignment='center',
+            verticalalignment='center',
+            transform=self.pie_ax.transAxes,
+            fontsize=12,
+            color=self.colors['text_secondary'],
+            style='italic'
+        )
+        
+        self.pie_ax.set_title('Income vs Expenses Distribution',
+                             pad=20,
+                             fontsize=14,
+                             color=self.colors['text'],
+                             fontweight='bold')
+        
+        # One bar and value label per recent transaction slot
+        positions = range(self.RECENT_COUNT)
+        artists['bars'] = self.bar_ax.bar(positions, [0] * self.RECENT_COUNT,
+                                          width=0.7,  # Slightly thinner bars
+                                          alpha=0.9)  # More solid bars
+        artists['values'] = [
+            self.bar_ax.text(
+                position, 0, '',
+                ha='center',
+                va='bottom',
+                color=self.colors['text'],
+                fontsize=10,
+                fontweight='bold'
+            )
+            for position in positions
+        ]
+        
+        artists['bar_empty'] = self.bar_ax.text(
+            0.5, 0.5, 'No recent transaction data available',
+            horizontalalignment='center',
+            verticalalignment='center',
+            transform=self.bar_ax.transAxes,
+            fontsize=12,
+            color=self.colors['text_secondary'],
+            style='italic'
+        )
+        
+        self.bar_ax.set_title('Recent Transaction History',
+                             pad=20,
+                             fontsize=14,
+                             color=self.colors['text'],
+                             fontweight='bold')
+        
+        # Enhanced bar chart styling
+        self.bar_ax.spines['top'].set_visible(False)
+        self.bar_ax.spines['right'].set_visible(False)
+        self.bar_ax.spines['bottom'].set_color(self.colors['border'])
+        self.bar_ax.spines['left'].set_color(self.colors['border'])
+        
+        # Refined grid
+        self.bar_ax.grid(True, axis='y', linestyle='--', 
+                        alpha=0.15, color=self.colors['chart_grid'])
+        
+        # Adjust tick labels
+        self.bar_ax.tick_params(axis='x', rotation=0)
+        self.bar_ax.tick_params(axis='both', length=0)
+        
+        # Category chart: one bar and value label per slot, "Other" included
+        self.style_category_axes()
+        positions = range(self.CATEGORY_COUNT + 1)
+        artists['category_bars'] = self.category_ax.barh(positions, [0] * len(positions), height=0.7,
+                                                         color=self.colors['warning'], alpha=0.9)
+        artists['category_values'] = [
+            self.category_ax.text(
+                0, position, '',
+                va='center',
+                color=self.colors['text'],
+                fontsize=10,
+                fontweight='bold'
+            )
+            for position in positions
+        ]
+        artists['category_empty'] = self.category_ax.text(
+            0.5, 0.5, 'No expense data available',
+            horizontalalignment='center',
+            verticalalignment='center',
+            transform=self.category_ax.transAxes,
+            fontsize=12,
+            color=self.colors['text_secondary'],
+            style='italic'
+        )
+        
+        # Trend chart: one line each for income and expenses per period bucket
+        self.style_trend_axes()
+        artists['trend_income'], = self.trend_ax.plot(
+            [], [], color=self.colors['success'], linewidth=2, marker='o', markersize=3, label='Income'
+        )
+        artists['trend_expenses'], = self.trend_ax.plot(
+            [], [], color=self.colors['warning'], linewidth=2, marker='o', markersize=3, label='Expenses'
+        )
+        self.trend_ax.legend(loc='upper left', frameon=False)
+        
+        artists['trend_empty'] = self.trend_ax.text(
+            0.5, 0.5, 'No transaction data available',
+            horizontalalignment='center',
+            verticalalignment='center',
+            transform=self.trend_ax.transAxes,
+            fontsize=12,
+            color=self.colors['text_secondary'],
+            style='italic'
+        )
+        
+        artists['trend_title'] = self.trend_ax.set_title(self.trend_title(),
+                                                         pad=20,
+                                                         fontsize=14,
+                                                         color=self.colors['text'],
+                                                         fontweight='bold')
+        
+        # Running balance line, resampled on every update, zoom and resize
+        self.style_balance_axes()
+        self.create_balance_artists()
+        
+        self.fig.set_constrained_layout(True)
+        self.artists = artists
+    
+    def update_artists(self):
+        """Update the existing chart artists in place and schedule a redraw"""
+        if self.artists is None:
+            self.create_artists()
+        artists = self.artists
+        
+        # Read totals maintained by the ledger
+        totals = self.ledger.indexes["totals"]
+        sizes = [totals.income, totals.expenses]
+        total = sum(sizes)
+        
+        # Pie chart: move wedge angles, labels and percentages
+        has_totals = total > 0
+        artists['pie_empty'].set_visible(not has_totals)
+        start_angle = 90
+        for wedge, label, percentage, size in zip(
+            artists['wedges'], artists['labels'], artists['percentages'], sizes
+        ):
+            fraction = size / total if has_totals else 0
+            end_angle = start_angle + 360 * fraction
+            wedge.set_theta1(start_angle)
+            wedge.set_theta2(end_angle)
+            
+            # Place texts the way pie() does, along the middle of the wedge
+            middle = math.radians((start_angle + end_angle) / 2)
+            x, y = math.cos(middle), math.sin(middle)
+            label.set_position((1.1 * x, 1.1 * y))
+            label.set_horizontalalignment('left' if x > 0 else 'right')
+            percentage.set_position((0.6 * x, 0.6 * y))
+            percentage.set_text(f'{100 * fraction:1.1f}%')
+            
+            # Empty wedges are hidden, as pie() would not draw them
+            visible = has_totals and size > 0
+            wedge.set_visible(visible)
+            label.set_visible(visible)
+            percentage.set_visible(visible)
+            start_angle = end_angle
+        
+        # Bar chart: update heights, colors and value labels
+        recent_dates, recent_amounts = self.recent_data()
+        artists['bar_empty'].set_visible(not recent_dates)
+        for position, (bar, value) in enumerate(zip(artists['bars'], artists['values'])):
+            visible = position < len(recent_amounts)
+            bar.set_visible(visible)
+            value.set_visible(visible)
+            if not visible:
+                continue
+            
+            height = recent_amounts[position]
+            bar.set_height(height)
+            bar.set_color(self.colors['success'] if height >= 0 else self.colors['warning'])
+            value.set_position((position, height))
+            value.set_text(f'${abs(height):,.0f}')  # Added thousands separator
+            value.set_verticalalignment('bottom' if height >= 0 else 'top')
+        
+        # Fit the axes to the bars in use
+        self.bar_ax.set_xticks(range(len(recent_dates)), recent_dates)
+        if recent_dates:
+            self.bar_ax.set_xlim(-0.5, len(recent_dates) - 0.5)
+            self.bar_ax.relim(visible_only=True)
+            self.bar_ax.autoscale_view(scalex=False)
+        
+        # Category chart: update bar widths, names and value labels
+        labels, amounts = self.category_data()
+        artists['category_empty'].set_visible(not labels)
+        for position, (bar, value) in enumerate(zip(artists['category_bars'], artists['category_values'])):
+            visible = position < len(amounts)
+            bar.set_visible(visible)
+            value.set_visible(visible)
+            if visible:
+                bar.set_width(amounts[position])
+                value.set_position((amounts[position], position))
+                value.set_text(f' ${amounts[position]:,.0f}')
+        self.category_ax.set_yticks(range(len(labels)), labels)
+        if labels:
+            self.category_ax.set_ylim(-0.5, len(labels) - 0.5)
+            # Leave room for the value labels right of the longest bar
+            self.category_ax.set_xlim(0, max(amounts) * 1.2 or 1)
+        
+        # Trend chart: replace the line data with the current buckets
+        keys, income, expenses = self.trend_data()
+        positions = range(len(keys))
+        artists['trend_income'].set_data(positions, income)
+        artists['trend_expenses'].set_data(positions, expenses)
+        artists['trend_empty'].set_visible(not keys)
+        artists['trend_title'].set_text(self.trend_title())
+        self.trend_ax.set_xticks(*self.trend_ticks(keys))
+        if keys:
+            self.trend_ax.set_xlim(-0.5, len(keys) - 0.5)
+            self.trend_ax.relim()
+            self.trend_ax.autoscale_view(scalex=False)
+        
+        # Running balance: resample for the current data
+        self.draw_balance()
+        
+        # Merge the redraw with other pending renders
+        self.request_render()
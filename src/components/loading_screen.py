@@ -1,6 +1,5 @@
 import tkinter as tk
 from tkinter import ttk
-import time
 
 class LoadingScreen:
     def __init__(self, root):
@@ -54,21 +53,42 @@ class LoadingScreen:
         )
         self.progress.pack()
         
-        # Start progress animation
-        self.animate_progress()
+        # Startup stages still to run, and what to call after the last one
+        self.stages = []
+        self.on_complete = None
     
-    def animate_progress(self):
-        status_messages = [
-            "Loading components...",
-            "Preparing interface...",
-            "Setting up charts...",
-            "Almost ready..."
-        ]
+    def run(self, stages, on_complete=None):
+        """
+        Run startup stages from the event loop, advancing the progress bar as each one finishes
         
-        for i in range(101):
-            self.progress['value'] = i
-            if i % 25 == 0 and i//25 < len(status_messages):
-                self.status_label.config(text=status_messages[i//25])
-            self.loading_window.update()
-            time.sleep(0.02)
-        self.loading_window.destroy() 
\ No newline at end of file
+        Each stage runs in its own turn of the event loop, so the splash
+        repaints in between and the window opens as soon as the work is done.
+        
+        Args:
+            stages (list): (status message, callable, weight) tuples, in order
+            on_complete (callable): Called after the last stage, once the splash is closed
+        """
+        self.stages = list(stages)
+        self.on_complete = on_complete
+        self.progress.configure(maximum=max(sum(weight for _, _, weight in self.stages), 1), value=0)
+        self.loading_window.after(1, self.run_next_stage)
+    
+    def run_next_stage(self):
+        """Run one stage, then schedule the next or close the splash"""
+        if not self.stages:
+            self.loading_window.destroy()
+            if self.on_complete:
+                self.on_complete()
+            return
+        
+        message, stage, weight = self.stages.pop(0)
+        self.status_label.config(text=message)
+        self.loading_window.update_idletasks()
+        try:
+            stage()
+        except Exception:
+            # Don't leave the splash over a half-built window
+            self.loading_window.destroy()
+            raise
+        self.progress['value'] += weight
+        self.loading_window.after(1, self.run_next_stage)
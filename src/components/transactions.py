@@ -1,11 +1,17 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
+from bisect import bisect_left
 from datetime import datetime
+from src.utils.dates import display_date
+from src.utils.search_index import SearchIndex, SearchMatches
 
 class TransactionInput:
-    def __init__(self, parent, on_transaction_added):
+    def __init__(self, parent, on_transaction_added, category_names=None):
         self.parent = parent
         self.on_transaction_added = on_transaction_added
+        
+        # Callable giving the known categories, suggested in the category box
+        self.category_names = category_names
         self.setup_transaction_input()
     
     def setup_transaction_input(self):
@@ -102,7 +108,25 @@ class TransactionInput:
         )
         self.type_combo.grid(row=1, column=3, sticky="ew", pady=10)
         
-        # Add button - Row 2
+        # Category input - Row 2, free text with the known categories as suggestions
+        ttk.Label(
+            self.input_frame,
+            text="Category:",
+            style="TLabel",
+            font=("Inter", 11)
+        ).grid(row=2, column=0, sticky="w", padx=(0, 10), pady=10)
+        
+        self.category = tk.StringVar()
+        self.category_combo = ttk.Combobox(
+            self.input_frame,
+            textvariable=self.category,
+            style="Custom.TCombobox",
+            font=("Inter", 11),
+            postcommand=self.refresh_categories
+        )
+        self.category_combo.grid(row=2, column=1, columnspan=3, sticky="ew", pady=10)
+        
+        # Add button - Row 3
         self.add_button = tk.Button(
             self.input_frame,
             text="Add Transaction",
@@ -117,7 +141,7 @@ class TransactionInput:
             cursor="hand2",
             command=self.add_transaction
         )
-        self.add_button.grid(row=2, column=0, columnspan=4, sticky="e", pady=(10, 0))
+        self.add_button.grid(row=3, column=0, columnspan=4, sticky="e", pady=(10, 0))
         
         # Bind events for visual feedback
         self.description_entry.bind("<FocusIn>", self.on_entry_focus_in)
@@ -127,6 +151,24 @@ class TransactionInput:
         self.add_button.bind("<Enter>", self.on_button_hover)
         self.add_button.bind("<Leave>", self.on_button_leave)
     
+    def set_enabled(self, enabled, message="Please wait..."):
+        """
+        Accept new transactions or not
+        
+        Args:
+            enabled (bool): Whether the add button works
+            message (str): Text shown on the button while it doesn't
+        """
+        self.add_button.config(
+            state="normal" if enabled else "disabled",
+            text="Add Transaction" if enabled else message
+        )
+    
+    def refresh_categories(self):
+        """Fill the category suggestions just before the list opens"""
+        if self.category_names is not None:
+            self.category_combo.config(values=sorted(name for name in self.category_names() if name))
+    
     def on_entry_focus_in(self, event):
         """Handle entry focus in event"""
         widget = event.widget
@@ -151,6 +193,7 @@ class TransactionInput:
         description = self.description_entry.get().strip()
         amount_str = self.amount_entry.get().strip()
         transaction_type = self.transaction_type.get()
+        category = self.category.get().strip()
         
         # Validate inputs
         if not description:
@@ -174,7 +217,8 @@ class TransactionInput:
             'date': datetime.now(),
             'description': description,
             'amount': amount,
-            'type': transaction_type
+            'type': transaction_type,
+            'category': category
         }
         
         # Call the callback function
@@ -184,15 +228,49 @@ class TransactionInput:
         self.description_entry.delete(0, tk.END)
         self.amount_entry.delete(0, tk.END)
         self.transaction_type.set("Income")
+        self.category.set("")
         
         # Set focus back to description
         self.description_entry.focus_set()
 
 
 class TransactionList:
-    def __init__(self, parent):
+    PLACEHOLDER = "No transactions yet. Add a new transaction to get started."
+    NO_MATCHES = "No transactions match the search."
+    ROW_HEIGHT = 40
+    OVERSCAN = 2  # Extra rows kept below the visible window
+    SEARCH_DELAY = 150  # Milliseconds of typing pause before the list is filtered
+    INDEX_STEP = 20000  # Rows indexed per event loop turn before a search
+    HEADINGS = {"date": "Date", "description": "Description", "category": "Category", "type": "Type", "amount": "Amount"}
+    
+    def __init__(self, parent, ledger, virtual=True):
         self.parent = parent
-        self.transactions = []  # Store transactions for save/load functionality
+        self.ledger = ledger  # Shared ledger that backs save/load functionality
+        
+        # In virtual mode only the visible window of ledger rows exists as Treeview items
+        self.virtual = virtual
+        self.top_index = 0  # Position in the view of the first visible row
+        self.visible_rows = 10
+        self.row_items = []  # Reusable Treeview items for the visible window
+        
+        # State of a chunked bulk load
+        self.bulk_job = None
+        self.bulk_source = None
+        self.bulk_importer = None
+        self.bulk_deduplicator = None
+        self.bulk_position = 0
+        self.bulk_on_complete = None
+        
+        # Ledger rows to show, matching the search box in the sort order,
+        # or None when every row is shown in ledger order
+        self.search_index = ledger.indexes["search"]
+        self.sort_index = ledger.indexes["sort"]
+        self.view = None
+        self.ordering = None  # SortOrder of the view, when sorted
+        self.search_job = None
+        self.sort_column = None
+        self.sort_descending = False
+        
         self.setup_transaction_list()
     
     def setup_transaction_list(self):
@@ -200,10 +278,54 @@ class TransactionList:
         self.list_frame = ttk.LabelFrame(self.parent, text="Transaction History", padding="20")
         self.list_frame.pack(fill="both", expand=True)
         
+        # Search box filtering the list by description
+        search_frame = ttk.Frame(self.list_frame)
+        search_frame.pack(fill="x", padx=5, pady=(0, 5))
+        ttk.Label(
+            search_frame,
+            text="Search:",
+            style="TLabel",
+            font=("Inter", 11)
+        ).pack(side="left", padx=(0, 10))
+        
+        self.search_var = tk.StringVar()
+        self.search_entry = tk.Entry(
+            search_frame,
+            textvariable=self.search_var,
+            font=("Inter", 11),
+            bg="#1E293B",
+            fg="#F9FAFB",
+            insertbackground="#F9FAFB",
+            insertwidth=2,
+            relief="solid",
+            bd=1,
+            highlightthickness=1,
+            highlightcolor="#4F46E5",
+            highlightbackground="#374151"
+        )
+        self.search_entry.pack(side="left", fill="x", expand=True)
+        self.search_status = ttk.Label(search_frame, text="", font=("Inter", 10))
+        self.search_status.pack(side="right", padx=(10, 0))
+        
+        self.search_var.trace_add("write", self.on_search_changed)
+        self.search_entry.bind("<Escape>", lambda event: self.search_var.set(""))
+        
         # Create a container frame for the treeview and scrollbar
-        container = ttk.Frame(self.list_frame)
+        self.container = container = ttk.Frame(self.list_frame)
         container.pack(fill="both", expand=True, padx=5, pady=5)
         
+        # Progress bar and cancel button, shown only during bulk loads
+        self.progress_frame = ttk.Frame(self.list_frame)
+        self.progress_label = ttk.Label(self.progress_frame, text="", font=("Inter", 10))
+        self.progress_label.pack(side="left", padx=(0, 10))
+        self.progress_bar = ttk.Progressbar(self.progress_frame, mode="determinate")
+        self.progress_bar.pack(side="left", fill="x", expand=True)
+        ttk.Button(
+            self.progress_frame,
+            text="Cancel",
+            command=self.cancel_bulk_load
+        ).pack(side="right", padx=(10, 0))
+        
         # Create custom style for the treeview
         style = ttk.Style()
         
@@ -214,7 +336,7 @@ class TransactionList:
             foreground="#F9FAFB",
             fieldbackground="#1F2937",
             font=("Inter", 10),
-            rowheight=40,
+            rowheight=self.ROW_HEIGHT,
             borderwidth=0
         )
         
@@ -246,29 +368,28 @@ class TransactionList:
         # Create the treeview with custom style
         self.tree = ttk.Treeview(
             container,
-            columns=("date", "description", "type", "amount"),
+            columns=("date", "description", "category", "type", "amount"),
             show="headings",
             style="TransactionTree.Treeview",
             height=10
         )
         
-        # Configure column headings
-        self.tree.heading("date", text="Date")
-        self.tree.heading("description", text="Description")
-        self.tree.heading("type", text="Type")
-        self.tree.heading("amount", text="Amount")
+        # Configure column headings (click to sort)
+        for column, text in self.HEADINGS.items():
+            self.tree.heading(column, text=text, command=lambda column=column: self.sort_by(column))
         
         # Configure column widths and alignment
         self.tree.column("date", width=120, anchor="w")
         self.tree.column("description", width=300, anchor="w")
+        self.tree.column("category", width=120, anchor="w")
         self.tree.column("type", width=100, anchor="center")
         self.tree.column("amount", width=100, anchor="e")
         
-        # Create a scrollbar
-        scrollbar = ttk.Scrollbar(
+        # Create a scrollbar (driven by the ledger in virtual mode)
+        self.scrollbar = scrollbar = ttk.Scrollbar(
             container, 
             orient="vertical", 
-            command=self.tree.yview,
+            command=self.on_scroll if self.virtual else self.tree.yview,
             style="Vertical.TScrollbar"
         )
         
@@ -281,7 +402,8 @@ class TransactionList:
         )
         
         # Configure the treeview to use the scrollbar
-        self.tree.configure(yscrollcommand=scrollbar.set)
+        if not self.virtual:
+            self.tree.configure(yscrollcommand=scrollbar.set)
         
         # Pack the treeview and scrollbar
         self.tree.pack(side="left", fill="both", expand=True)
@@ -294,79 +416,420 @@ class TransactionList:
         # Bind resize event to adjust column widths
         self.tree.bind("<Configure>", self.on_list_resize)
         
+        # Mouse wheel scrolls the ledger window rather than the items
+        if self.virtual:
+            self.tree.bind("<MouseWheel>", self.on_mouse_wheel)
+            self.tree.bind("<Button-4>", self.on_mouse_wheel)
+            self.tree.bind("<Button-5>", self.on_mouse_wheel)
+        
         # Show placeholder if no transactions
         self.show_placeholder()
     
     def show_placeholder(self):
         """Show placeholder message if no transactions"""
         if len(self.tree.get_children()) == 0:
+            text = self.NO_MATCHES if self.search_var.get().strip() and self.ledger else self.PLACEHOLDER
             self.tree.insert(
                 "", 
                 "end", 
-                values=("", "No transactions yet. Add a new transaction to get started.", "", "")
+                values=("", text, "", "", "")
             )
     
     def on_list_resize(self, event):
         """Adjust column widths when the list is resized"""
         width = event.width
         self.tree.column("date", width=int(width * 0.15))
-        self.tree.column("description", width=int(width * 0.45))
-        self.tree.column("type", width=int(width * 0.15))
+        self.tree.column("description", width=int(width * 0.33))
+        self.tree.column("category", width=int(width * 0.15))
+        self.tree.column("type", width=int(width * 0.12))
         self.tree.column("amount", width=int(width * 0.15))
+        
+        if self.virtual:
+            # Fit the window to the rows that are actually visible
+            header_height = self.ROW_HEIGHT
+            children = self.tree.get_children()
+            if children:
+                bbox = self.tree.bbox(children[0])
+                if bbox:
+                    header_height = bbox[1]
+            self.visible_rows = max(1, (event.height - header_height) // self.ROW_HEIGHT)
+            self.render_window()
+    
+    def format_row(self, row):
+        """Build the Treeview values and tag for a ledger row"""
+        ledger = self.ledger
+        
+        # Format the amount with currency symbol
+        amount_str = f"${ledger.amounts[row]:.2f}"
+        
+        # Determine tag based on transaction type
+        tag = 'expense' if ledger.types[row] == ledger.EXPENSE else 'income'
+        
+        # Dates are timestamps; the formatter caches each day's text
+        values = (
+            display_date(ledger.dates[row]), ledger.descriptions[row],
+            ledger.category_label(ledger.categories[row]), ledger.type_name(row), amount_str
+        )
+        return values, tag
     
     def add_transaction(self, transaction, update_ui=True):
-        """Add a transaction to the list"""
-        # Add to internal list for save/load functionality
-        self.transactions.append(transaction)
+        """Add a transaction row to the list (the ledger already holds it)"""
+        # Place the row in an active search or sort; rows that don't match stay hidden
+        visible = True
+        position = self.row_count() - 1
+        if self.view is not None:
+            query = self.search_var.get().strip()
+            visible = not query or SearchIndex.matches(transaction['description'], query)
+            if visible:
+                self.update_view()
+                position = self.view_position(len(self.ledger) - 1)
+        
+        if self.virtual:
+            # The row is already in the ledger, only the window needs updating
+            if update_ui and visible and position is not None:
+                self.scroll_to(position)
+            else:
+                self.render_window()
+            return
+        
+        if not visible:
+            return
+        if self.view is not None:
+            # Sorted rows can land anywhere, so rebuild the items
+            self.show_rows()
+            return
         
         # Clear placeholder if this is the first transaction
         if len(self.tree.get_children()) == 1:
             item = self.tree.get_children()[0]
-            if self.tree.item(item, "values")[1] == "No transactions yet. Add a new transaction to get started.":
+            if self.tree.item(item, "values")[1] in (self.PLACEHOLDER, self.NO_MATCHES):
                 self.tree.delete(item)
         
-        # Format the amount with currency symbol
-        amount_str = f"${transaction['amount']:.2f}"
-        
-        # Determine tag based on transaction type
-        tag = 'income' if transaction['type'] == 'Income' else 'expense'
-        
-        # Format date for display
-        if isinstance(transaction['date'], datetime):
-            date_str = transaction['date'].strftime("%b %d, %Y")
-        else:
-            # If date is already a string (e.g., from loaded data)
-            date_str = transaction['date']
+        values, tag = self.format_row(len(self.ledger) - 1)
         
         # Insert with appropriate tag
-        item = self.tree.insert(
-            "", 
-            "end", 
-            values=(
-                date_str,
-                transaction['description'],
-                transaction['type'],
-                amount_str
-            ),
-            tags=(tag,)
-        )
+        item = self.tree.insert("", "end", values=values, tags=(tag,))
         
         # Scroll to show new transaction if update_ui is True
         if update_ui:
             self.tree.see(item)
     
+    def view_position(self, row):
+        """Find a ledger row in the view by binary search, or None if it can't be located cheaply"""
+        view = self.view
+        if isinstance(view, SearchMatches):
+            # Broad matches are only found as far as they are read
+            return None
+        if self.ordering is not None:
+            return self.ordering.position(row, view)
+        
+        # Search results in ledger order
+        position = bisect_left(view, row)
+        return position if position < len(view) and view[position] == row else None
+    
     def clear_transactions(self):
-        """Clear all transactions"""
-        # Clear internal list
-        self.transactions = []
-        
+        """Clear all transaction rows"""
         # Clear treeview
         for item in self.tree.get_children():
             self.tree.delete(item)
+        self.row_items = []
+        self.top_index = 0
+        
+        # Cleared rows can't be shown until the view is worked out again
+        if self.view is not None:
+            self.view = []
+            if self.search_var.get().strip():
+                self.search_status.config(text="0 matches")
         
         # Show placeholder
         self.show_placeholder()
     
+    def refresh(self):
+        """Rebuild the list from the ledger, filtered by the search text and sorted"""
+        self.apply_view()
+    
+    def show_rows(self):
+        """Show the rows of the current view from the top"""
+        self.top_index = 0
+        self.tree.selection_remove(self.tree.selection())
+        if self.virtual:
+            self.render_window()
+            return
+        
+        for item in self.tree.get_children():
+            self.tree.delete(item)
+        for position in range(self.row_count()):
+            values, tag = self.format_row(self.row_at(position))
+            self.tree.insert("", "end", values=values, tags=(tag,))
+        self.show_placeholder()
+    
+    def row_count(self):
+        """Number of rows in the view"""
+        return len(self.ledger) if self.view is None else len(self.view)
+    
+    def row_at(self, position):
+        """Get the ledger row shown at a view position"""
+        return position if self.view is None else self.view[position]
+    
+    def on_search_changed(self, *args):
+        """Filter the list once the search text stops changing"""
+        if self.search_job is not None:
+            self.tree.after_cancel(self.search_job)
+        self.search_job = self.tree.after(self.SEARCH_DELAY, self.apply_view)
+    
+    def sort_by(self, column):
+        """Cycle a column through ascending, descending and ledger order"""
+        if self.sort_column != column:
+            self.sort_column = column
+            self.sort_descending = False
+        elif not self.sort_descending:
+            self.sort_descending = True
+        else:
+            self.sort_column = None
+        
+        # Mark the sorted column in its heading
+        for name, text in self.HEADINGS.items():
+            if name == self.sort_column:
+                text += " \u25BC" if self.sort_descending else " \u25B2"
+            self.tree.heading(name, text=text)
+        
+        self.apply_view()
+    
+    def apply_view(self):
+        """Show the rows for the search text and sort column, indexing pending rows first"""
+        if self.search_job is not None:
+            self.tree.after_cancel(self.search_job)
+        self.search_job = None
+        
+        # Index rows that arrived in bulk a step at a time, keeping the window responsive
+        if self.search_var.get().strip() and not self.search_index.catch_up(self.INDEX_STEP):
+            self.search_status.config(
+                text=f"Indexing {self.search_index.indexed:,} of {len(self.ledger):,}..."
+            )
+            self.search_job = self.tree.after(1, self.apply_view)
+            return
+        
+        self.update_view()
+        self.show_rows()
+    
+    def update_view(self):
+        """Work out the rows to show from the search text and the sort column"""
+        ordering = None
+        if self.sort_column is not None:
+            ordering = self.sort_index.ordering(self.sort_column, self.sort_descending)
+        self.ordering = ordering
+        
+        query = self.search_var.get().strip()
+        if query:
+            self.view = self.search_index.search(query, ordering)
+            self.search_status.config(text=f"{len(self.view):,} matches")
+        else:
+            self.view = ordering.rows if ordering is not None else None
+            self.search_status.config(text="")
+    
+    def bulk_load(self, transactions, on_complete=None, chunk_size=5000):
+        """
+        Append transactions to the ledger in chunks scheduled with after()
+        
+        Args:
+            transactions (Ledger): Transactions to load
+            on_complete (callable): Called with (loaded_count, cancelled) when done
+            chunk_size (int): Number of rows loaded per event loop turn
+        """
+        # Only one bulk load runs at a time
+        if self.bulk_job is not None:
+            self.cancel_bulk_load()
+        
+        self.bulk_source = transactions
+        self.bulk_position = 0
+        self.bulk_on_complete = on_complete
+        
+        # Show progress above the list
+        self.progress_bar.configure(maximum=max(len(transactions), 1), value=0)
+        self.progress_frame.pack(fill="x", padx=5, pady=(0, 10), before=self.container)
+        
+        self.bulk_job = self.tree.after(1, self.load_next_chunk, chunk_size)
+    
+    def load_next_chunk(self, chunk_size):
+        """Load one chunk of a bulk load and schedule the next one"""
+        source = self.bulk_source
+        start = self.bulk_position
+        stop = min(start + chunk_size, len(source))
+        first_row = len(self.ledger)
+        
+        # Copy the chunk column by column into the shared ledger
+        self.ledger.extend_ledger(source, start, stop)
+        self.bulk_position = stop
+        
+        if self.virtual:
+            self.render_window()
+        else:
+            # Insert items directly, without rescanning the tree per row
+            if first_row == 0 and stop > start:
+                for item in self.tree.get_children():
+                    self.tree.delete(item)
+            for row in range(first_row, len(self.ledger)):
+                values, tag = self.format_row(row)
+                self.tree.insert("", "end", values=values, tags=(tag,))
+        
+        # Update progress
+        self.progress_bar.configure(value=stop)
+        self.progress_label.config(text=f"Loading {stop:,} of {len(source):,} transactions...")
+        
+        if stop < len(source):
+            self.bulk_job = self.tree.after(1, self.load_next_chunk, chunk_size)
+        else:
+            self.finish_bulk_load(cancelled=False)
+    
+    def stream_load(self, importer, on_complete=None, poll_interval=50, deduplicator=None):
+        """
+        Append batches from a running BatchLoader (e.g. CsvImporter) as they arrive
+        
+        Args:
+            importer (BatchLoader): Loader producing batches on its worker thread
+            on_complete (callable): Called with (loaded_count, cancelled) when done
+            poll_interval (int): Milliseconds between checks of the importer queue
+            deduplicator (Deduplicator): Drops rows the ledger already has, if given
+        """
+        # Only one bulk load runs at a time
+        if self.bulk_job is not None:
+            self.cancel_bulk_load()
+        
+        self.bulk_importer = importer
+        self.bulk_deduplicator = deduplicator
+        self.bulk_position = 0
+        self.bulk_on_complete = on_complete
+        
+        # Progress is measured in the loader's own units (e.g. bytes of a file)
+        self.progress_bar.configure(maximum=max(importer.progress()[1], 1), value=0)
+        self.progress_frame.pack(fill="x", padx=5, pady=(0, 10), before=self.container)
+        
+        self.bulk_job = self.tree.after(poll_interval, self.poll_importer, poll_interval)
+    
+    def poll_importer(self, poll_interval):
+        """Take the batches the importer has ready and schedule the next poll"""
+        importer = self.bulk_importer
+        batches = importer.get_batches()
+        if self.bulk_deduplicator is not None:
+            batches = [self.bulk_deduplicator.filter(batch) for batch in batches]
+        
+        for batch in batches:
+            self.ledger.extend_ledger(batch)
+            self.bulk_position += len(batch)
+        if batches:
+            if self.virtual:
+                self.render_window()
+            else:
+                first_row = len(self.ledger) - sum(len(batch) for batch in batches)
+                if first_row == 0:
+                    for item in self.tree.get_children():
+                        self.tree.delete(item)
+                for row in range(first_row, len(self.ledger)):
+                    values, tag = self.format_row(row)
+                    self.tree.insert("", "end", values=values, tags=(tag,))
+        
+        # Update progress
+        work_done, total_work = importer.progress()
+        self.progress_bar.configure(maximum=max(total_work, 1), value=work_done)
+        self.progress_label.config(text=importer.progress_text(self.bulk_position))
+        
+        if importer.done():
+            self.finish_bulk_load(cancelled=False)
+        else:
+            self.bulk_job = self.tree.after(poll_interval, self.poll_importer, poll_interval)
+    
+    def cancel_bulk_load(self):
+        """Stop a running bulk load, keeping the rows loaded so far"""
+        if self.bulk_job is None:
+            return
+        self.tree.after_cancel(self.bulk_job)
+        if self.bulk_importer is not None:
+            self.bulk_importer.cancel()
+        self.finish_bulk_load(cancelled=True)
+    
+    def finish_bulk_load(self, cancelled):
+        """Hide the progress bar and report the bulk load result"""
+        on_complete = self.bulk_on_complete
+        loaded = self.bulk_position
+        
+        self.bulk_job = None
+        self.bulk_source = None
+        self.bulk_importer = None
+        self.bulk_deduplicator = None
+        self.bulk_on_complete = None
+        self.progress_frame.pack_forget()
+        
+        # Search and sort the loaded rows
+        if self.view is not None:
+            self.apply_view()
+        
+        if on_complete:
+            on_complete(loaded, cancelled)
+    
+    def render_window(self):
+        """Show the view rows from top_index in the reusable Treeview items"""
+        total = self.row_count()
+        window = self.visible_rows + self.OVERSCAN
+        
+        # Keep the window inside the ledger
+        self.top_index = max(0, min(self.top_index, total - self.visible_rows))
+        count = max(0, min(window, total - self.top_index))
+        
+        # Swap between the placeholder and real rows
+        if total == 0:
+            if self.row_items:
+                self.clear_transactions()
+            self.scrollbar.set(0.0, 1.0)
+            return
+        if not self.row_items:
+            for item in self.tree.get_children():
+                self.tree.delete(item)
+        
+        # Grow or shrink the item pool to the window size
+        while len(self.row_items) < count:
+            self.row_items.append(self.tree.insert("", "end"))
+        while len(self.row_items) > count:
+            self.tree.delete(self.row_items.pop())
+        
+        # Fill the items with the rows currently in view
+        for offset, item in enumerate(self.row_items):
+            values, tag = self.format_row(self.row_at(self.top_index + offset))
+            self.tree.item(item, values=values, tags=(tag,))
+        
+        # Map the window position onto the scrollbar
+        first = self.top_index / total
+        last = min(1.0, (self.top_index + self.visible_rows) / total)
+        self.scrollbar.set(first, last)
+    
+    def scroll_to(self, index):
+        """Move the window so that a view position is visible"""
+        if index < self.top_index:
+            self.top_index = index
+        elif index >= self.top_index + self.visible_rows:
+            self.top_index = index - self.visible_rows + 1
+        self.render_window()
+    
+    def on_scroll(self, *args):
+        """Handle scrollbar commands in virtual mode"""
+        total = self.row_count()
+        if args[0] == "moveto":
+            self.top_index = int(float(args[1]) * total)
+        elif args[0] == "scroll":
+            step = self.visible_rows if args[2] == "pages" else 1
+            self.top_index += int(args[1]) * step
+        
+        # Rows move under the items, so drop the stale selection
+        self.tree.selection_remove(self.tree.selection())
+        self.render_window()
+    
+    def on_mouse_wheel(self, event):
+        """Scroll the virtual window with the mouse wheel"""
+        if event.num == 4 or event.delta > 0:
+            self.on_scroll("scroll", -3, "units")
+        else:
+            self.on_scroll("scroll", 3, "units")
+        return "break"
+    
     def get_all_transactions(self):
         """Get all transactions"""
-        return self.transactions
\ No newline at end of file
+        return self.ledger
\ No newline at end of file
@@ -0,0 +1,229 @@
+import heapq
+from array import array
+from src.utils.dates import SECONDS_PER_DAY, iso_day
+
+# Rollup periods, finest first
+PERIODS = ("day", "week", "month", "year")
+
+def period_keys(day_number):
+    """
+    Get the rollup bucket keys of a day
+
+    Args:
+        day_number (int): Days since 1970-01-01
+
+    Returns:
+        tuple: (YYYY-MM-DD day, YYYY-MM-DD Monday of its week, YYYY-MM month, YYYY year)
+    """
+    day = iso_day(day_number)
+    # 1970-01-01 was a Thursday, three days after a Monday
+    monday = iso_day(day_number - (day_number + 3) % 7)
+    return day, monday, day[:7], day[:4]
+
+
+class LedgerTotals:
+    """
+    Running income/expense sums per type and per day, week, month and year
+
+    Each row updates one bucket per period in O(1), so the rollups are
+    always current and charts read them without scanning the ledger.
+    """
+
+    def __init__(self):
+        self.on_reset(None)
+
+    def on_reset(self, ledger):
+        """Rebuild every sum from scratch"""
+        # Sums are kept in integer cents so that removals cancel exactly
+        self.type_cents = [0, 0]
+        self.day_cents = {}
+        self.week_cents = {}
+        self.month_cents = {}
+        self.year_cents = {}
+        self.sorted_keys = {}  # Period -> (bucket count, sorted keys), see series()
+        if ledger is not None:
+            self.on_append(ledger, 0, len(ledger))
+
+    def on_append(self, ledger, start, stop):
+        """Add rows start..stop to the sums"""
+        # Walk column slices rather than indexing row by row, which also
+        # reads memory-mapped columns in bulk
+        type_cents = self.type_cents
+        buckets = {}  # Day number -> its cents pair in every period
+        for type_code, amount, stamp in zip(
+            ledger.types[start:stop], ledger.amounts[start:stop], ledger.dates[start:stop]
+        ):
+            cents = round(amount * 100)
+            day_number = stamp // SECONDS_PER_DAY
+            pairs = buckets.get(day_number)
+            if pairs is None:
+                pairs = buckets[day_number] = self.pairs(day_number)
+            # Unrolled over the periods; this loop runs once per row
+            day, week, month, year = pairs
+            type_cents[type_code] += cents
+            day[type_code] += cents
+            week[type_code] += cents
+            month[type_code] += cents
+            year[type_code] += cents
+
+    def on_remove(self, ledger, index):
+        """Subtract a row that is about to be removed"""
+        self.apply(ledger, index, -1)
+
+    def apply(self, ledger, index, sign):
+        """Add (sign=1) or subtract (sign=-1) a single row"""
+        type_code = ledger.types[index]
+        cents = sign * round(ledger.amounts[index] * 100)
+
+        self.type_cents[type_code] += cents
+        for pair in self.pairs(ledger.dates[index] // SECONDS_PER_DAY):
+            pair[type_code] += cents
+
+    def pairs(self, day_number):
+        """Get the cents pairs of a day's bucket in every period, finest first"""
+        day, week, month, year = period_keys(day_number)
+        bucket = self.bucket
+        return (
+            bucket(self.day_cents, day), bucket(self.week_cents, week),
+            bucket(self.month_cents, month), bucket(self.year_cents, year)
+        )
+
+    def period_cents(self, period):
+        """Get the bucket dictionary of a period: key -> [income, expense] cents"""
+        if period not in PERIODS:
+            raise ValueError(f"Unknown rollup period: {period}")
+        return getattr(self, f"{period}_cents")
+
+    @staticmethod
+    def bucket(buckets, key):
+        """Get the [income, expense] cents pair for a key, creating it if needed"""
+        pair = buckets.get(key)
+        if pair is None:
+            pair = buckets[key] = [0, 0]
+        return pair
+
+    @property
+    def income(self):
+        return self.type_cents[0] / 100
+
+    @property
+    def expenses(self):
+        return self.type_cents[1] / 100
+
+    @property
+    def balance(self):
+        return (self.type_cents[0] - self.type_cents[1]) / 100
+
+    def day_totals(self, day):
+        """Get (income, expenses) for a YYYY-MM-DD day"""
+        income, expenses = self.day_cents.get(day, (0, 0))
+        return income / 100, expenses / 100
+
+    def month_totals(self, month):
+        """Get (income, expenses) for a YYYY-MM month"""
+        income, expenses = self.month_cents.get(month, (0, 0))
+        return income / 100, expenses / 100
+
+    def series(self, period, limit=None):
+        """
+        Get income and expenses per bucket of a period, oldest first
+
+        The cost follows the number of buckets, never the number of rows.
+        Buckets are never dropped, so the sorted keys are reused until a
+        new bucket appears.
+
+        Args:
+            period (str): One of PERIODS
+            limit (int): Only return the most recent buckets, or None for all
+
+        Returns:
+            tuple: (bucket keys, income per bucket, expenses per bucket)
+        """
+        buckets = self.period_cents(period)
+        count, keys = self.sorted_keys.get(period, (-1, None))
+        if count != len(buckets):
+            keys = sorted(buckets)
+            self.sorted_keys[period] = (len(buckets), keys)
+        if limit is not None:
+            keys = keys[-limit:]
+        pairs = [buckets[key] for key in keys]
+        return (
+            keys,
+            [income / 100 for income, _ in pairs],
+            [expenses / 100 for _, expenses in pairs]
+        )
+
+
+class CategoryTotals:
+    """
+    Running income/expense sums per category code
+
+    The sums are arrays indexed by the ledger's category codes, so each
+    row is one array update, and a breakdown reads one sum per category
+    without scanning the ledger.
+    """
+
+    def __init__(self):
+        self.on_reset(None)
+
+    def on_reset(self, ledger):
+        """Rebuild every sum from scratch"""
+        self.ledger = ledger
+        self.cents = [array('q'), array('q')]  # Type -> cents per category code
+        if ledger is not None:
+            self.on_append(ledger, 0, len(ledger))
+
+    def on_append(self, ledger, start, stop):
+        """Add rows start..stop to the sums"""
+        self.ledger = ledger
+        self.grow(len(ledger.category_names))
+        cents = self.cents
+        for category, type_code, amount in zip(
+            ledger.categories[start:stop], ledger.types[start:stop], ledger.amounts[start:stop]
+        ):
+            cents[type_code][category] += round(amount * 100)
+
+    def on_remove(self, ledger, index):
+        """Subtract a row that is about to be removed"""
+        self.cents[ledger.types[index]][ledger.categories[index]] -= round(ledger.amounts[index] * 100)
+
+    def grow(self, size):
+        """Make room for every category code below size"""
+        for cents in self.cents:
+            if len(cents) < size:
+                cents.extend(array('q', [0]) * (size - len(cents)))
+
+    def totals(self, category):
+        """Get (income, expenses) for a category name"""
+        code = self.ledger.category_ids.get(category) if self.ledger is not None else None
+        if code is None or code >= len(self.cents[0]):
+            return 0.0, 0.0
+        return self.cents[0][code] / 100, self.cents[1][code] / 100
+
+    def top(self, type_code, count):
+        """
+        Get the largest categories of a type, with the rest summed as "Other"
+
+        Only the top count are selected (heapq.nlargest keeps a heap of that
+        size), so thousands of categories are never fully sorted.
+
+        Args:
+            type_code (int): Ledger.INCOME or Ledger.EXPENSE
+            count (int): Number of categories before "Other"
+
+        Returns:
+            list: (label, amount) pairs, largest first, with ("Other", rest)
+            last when more categories have amounts
+        """
+        cents = self.cents[type_code]
+        used = [code for code, value in enumerate(cents) if value > 0]
+        if not used:
+            return []
+        top = heapq.nlargest(count, used, key=cents.__getitem__)
+
+        label = self.ledger.category_label
+        pairs = [(label(code), cents[code] / 100) for code in top]
+        if len(used) > count:
+            rest = sum(cents[code] for code in used) - sum(cents[code] for code in top)
+            pairs.append(("Other", rest / 100))
+        return pairs
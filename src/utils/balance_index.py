@@ -0,0 +1,169 @@
+from array import array
+from itertools import accumulate
+from src.utils.dates import SECONDS_PER_DAY, check_day, parse_date
+
+# Appends larger than this fraction of the day range rebuild the trees instead
+# of updating them row by row
+BULK_FRACTION = 8
+
+# Smallest number of days the trees cover
+MIN_CAPACITY = 64
+
+
+class BalanceIndex:
+    """
+    Prefix sums of income and expenses by day, for balance-as-of and range queries
+
+    Each type has a Fenwick (binary indexed) tree over a contiguous range of
+    day numbers, so adding a row on any date, including back-dated ones,
+    and summing any range of days both take O(log days). The range grows,
+    with headroom, when a date falls outside it; bulk loads fill the plain
+    per-day sums and rebuild the trees in linear time. Dates are limited to
+    the supported range in dates.py, so the trees stay a few megabytes.
+    """
+
+    def __init__(self):
+        # Counts every change, so views built from the sums know when to rebuild
+        self.changes = 0
+        self.on_reset(None)
+
+    def on_reset(self, ledger):
+        """Rebuild the trees from scratch"""
+        self.changes += 1
+        self.base = 0  # Day number of position 0
+        self.capacity = 0
+        self.values = [array('q'), array('q')]  # Type -> cents per day position
+        self.trees = [array('q'), array('q')]  # Type -> Fenwick tree, 1-based
+        if ledger is not None and len(ledger):
+            self.on_append(ledger, 0, len(ledger))
+
+    def on_append(self, ledger, start, stop):
+        """Add rows start..stop"""
+        if stop <= start:
+            return
+        self.changes += 1
+        days = [stamp // SECONDS_PER_DAY for stamp in ledger.dates[start:stop]]
+        grown = self.cover(min(days), max(days))
+
+        rows = zip(days, ledger.types[start:stop], ledger.amounts[start:stop])
+        if not grown and (stop - start) * BULK_FRACTION < self.capacity:
+            for day, type_code, amount in rows:
+                self.add(day, type_code, round(amount * 100))
+            return
+
+        # The trees are rebuilt anyway, so only the per-day sums are updated first
+        base, values = self.base, self.values
+        for day, type_code, amount in rows:
+            values[type_code][day - base] += round(amount * 100)
+        self.rebuild()
+
+    def on_remove(self, ledger, index):
+        """Subtract a row that is about to be removed"""
+        self.changes += 1
+        self.add(ledger.dates[index] // SECONDS_PER_DAY, ledger.types[index],
+                 -round(ledger.amounts[index] * 100))
+
+    def cover(self, first, last):
+        """
+        Grow the day range, if needed, so it includes days first..last
+
+        Returns:
+            bool: True if the range grew, which leaves the trees to be rebuilt
+
+        Raises:
+            ValueError: If a day is outside the supported dates (a bad import or file)
+        """
+        check_day(first)
+        check_day(last)
+        if self.capacity and self.base <= first and last < self.base + self.capacity:
+            return False
+        if self.capacity:
+            first = min(first, self.base)
+            last = max(last, self.base + self.capacity - 1)
+
+        # Double the span and leave a quarter of the room before the first day
+        span = last - first + 1
+        capacity = MIN_CAPACITY
+        while capacity < 2 * span:
+            capacity *= 2
+        base = first - (capacity - span) // 4
+
+        offset = self.base - base
+        for type_code, old in enumerate(self.values):
+            values = array('q', bytes(8 * capacity))
+            values[offset:offset + len(old)] = old
+            self.values[type_code] = values
+        self.base = base
+        self.capacity = capacity
+        return True
+
+    def rebuild(self):
+        """Build both trees from the per-day sums in linear time"""
+        # Node i sums the days after i - lowbit(i) up to i, a difference of prefix sums
+        for type_code, values in enumerate(self.values):
+            prefix = [0]
+            prefix.extend(accumulate(values))
+            tree = array('q', [0])
+            tree.extend([
+                prefix[position] - prefix[position - (position & -position)]
+                for position in range(1, self.capacity + 1)
+            ])
+            self.trees[type_code] = tree
+
+    def add(self, day, type_code, cents):
+        """Add cents to one day, which must be in the range"""
+        position = day - self.base
+        self.values[type_code][position] += cents
+        tree = self.trees[type_code]
+        position += 1
+        while position <= self.capacity:
+            tree[position] += cents
+            position += position & -position
+
+    def prefix(self, type_code, day):
+        """Sum the cents of a type on every day up to and including a day"""
+        position = min(day - self.base + 1, self.capacity)
+        tree = self.trees[type_code]
+        total = 0
+        while position > 0:
+            total += tree[position]
+            position -= position & -position
+        return total
+
+    @staticmethod
+    def day_number(value):
+        """Convert a datetime, date, timestamp or date string to a day number"""
+        return parse_date(value) // SECONDS_PER_DAY
+
+    def balance_at(self, value):
+        """
+        Get the balance at the end of a day
+
+        Args:
+            value: datetime, date, timestamp or date string
+
+        Returns:
+            float: Income minus expenses of every transaction up to that day
+        """
+        day = self.day_number(value)
+        return (self.prefix(0, day) - self.prefix(1, day)) / 100
+
+    def totals_between(self, start, end):
+        """
+        Get income and expenses over a range of days, both ends included
+
+        Args:
+            start: First day (datetime, date, timestamp or date string)
+            end: Last day
+
+        Returns:
+            tuple: (income, expenses)
+        """
+        first = self.day_number(start) - 1
+        last = self.day_number(end)
+        if last <= first:
+            return 0.0, 0.0
+        return tuple(
+            (self.prefix(type_code, last) - self.prefix(type_code, first)) / 100
+            for type_code in (0, 1)
+        )
@@ -0,0 +1,216 @@
+"""
+Batch command line for ledger files, run without starting Tk
+
+    python main.py --headless convert a.json b.json --to csv --output-dir out
+    python main.py --headless merge jan.csv feb.csv mar.json --output q1.json
+    python main.py --headless merge old.csv overlapping.csv --skip-duplicates -o all.json
+    python main.py --headless summarize *.json --json
+"""
+import argparse
+import datetime
+import json
+import os
+import sys
+from src.utils.aggregates import CategoryTotals, LedgerTotals
+from src.utils.analytics import LedgerArrays
+from src.utils.balance_index import BalanceIndex
+from src.utils.dates import parse_date
+from src.utils.duplicates import DATE_TOLERANCE, drop_overlaps
+from src.utils.ledger import Ledger
+from src.utils.ledger_io import LedgerIO, describe_skipped
+
+def ledger_data(ledger):
+    """Build the saved data dictionary for a ledger, with fresh totals"""
+    totals = LedgerTotals()
+    totals.on_reset(ledger)
+    return {
+        "transactions": ledger,
+        "total_income": totals.income,
+        "total_expenses": totals.expenses,
+        "saved_date": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    }
+
+def load_ledger(path):
+    """Load a ledger file, warning on stderr about rows that couldn't be read"""
+    skipped = []
+    data = LedgerIO.load(path, skipped)
+    if skipped:
+        print(f"{path}: {describe_skipped(skipped)}", file=sys.stderr)
+    return data
+
+def day(value):
+    """Validate a date argument, keeping its text"""
+    parse_date(value)
+    return value
+
+def summarize_ledger(ledger, since=None, until=None):
+    """
+    Summarize a ledger as a JSON-friendly dictionary
+
+    Args:
+        ledger (Ledger): Transactions to summarize
+        since (str): First day of a period to report on, or None for the first transaction
+        until (str): Last day of the period, or None for the last transaction
+    """
+    totals = LedgerTotals()
+    totals.on_reset(ledger)
+    summary = {
+        "transactions": len(ledger),
+        "total_income": totals.income,
+        "total_expenses": totals.expenses,
+        "net_balance": totals.balance,
+        "months": len(totals.month_cents),
+        "first_day": min(totals.day_cents) if totals.day_cents else None,
+        "last_day": max(totals.day_cents) if totals.day_cents else None
+    }
+
+    # Amount statistics come from the columns as NumPy arrays
+    arrays = LedgerArrays()
+    arrays.on_reset(ledger)
+    summary["amounts"] = arrays.summary()
+
+    categories = CategoryTotals()
+    categories.on_reset(ledger)
+    summary["top_expense_categories"] = [
+        {"category": label, "amount": amount}
+        for label, amount in categories.top(Ledger.EXPENSE, 5)
+    ]
+
+    # Period figures come from prefix sums by date
+    if (since or until) and ledger:
+        balance = BalanceIndex()
+        balance.on_reset(ledger)
+        since = since or summary["first_day"]
+        until = until or summary["last_day"]
+        income, expenses = balance.totals_between(since, until)
+        summary["period"] = {
+            "from": since,
+            "until": until,
+            "income": income,
+            "expenses": expenses,
+            "closing_balance": balance.balance_at(until)
+        }
+    return summary
+
+def command_convert(args):
+    """Convert every input file to another format"""
+    failures = 0
+    for path in args.inputs:
+        base = os.path.splitext(os.path.basename(path))[0]
+        output_dir = args.output_dir or os.path.dirname(path)
+        output = os.path.join(output_dir, f"{base}.{args.to}")
+        try:
+            data = load_ledger(path)
+            LedgerIO.save(ledger_data(data["transactions"]), output, args.compact)
+            print(f"{path} -> {output} ({len(data['transactions'])} transactions)")
+        except Exception as e:
+            print(f"{path}: {e}", file=sys.stderr)
+            failures += 1
+    return 1 if failures else 0
+
+def command_merge(args):
+    """Merge every input file into one ledger file"""
+    ledgers = []
+    for path in args.inputs:
+        try:
+            ledgers.append(load_ledger(path)["transactions"])
+        except Exception as e:
+            print(f"{path}: {e}", file=sys.stderr)
+            return 1
+
+    # Rows a file repeats from an earlier one are dropped, if asked
+    skipped = 0
+    if args.skip_duplicates:
+        ledgers, skipped = drop_overlaps(ledgers, args.date_tolerance)
+
+    merged = Ledger()
+    for ledger in ledgers:
+        merged.extend_ledger(ledger)
+
+    LedgerIO.save(ledger_data(merged), args.output, args.compact)
+    skipped_text = f", {skipped} duplicates skipped" if args.skip_duplicates else ""
+    print(f"Merged {len(args.inputs)} files into {args.output} ({len(merged)} transactions{skipped_text})")
+    return 0
+
+def command_summarize(args):
+    """Print totals for every input file and for all of them combined"""
+    summaries = {}
+    combined = Ledger()
+    failures = 0
+    for path in args.inputs:
+        try:
+            ledger = load_ledger(path)["transactions"]
+        except Exception as e:
+            print(f"{path}: {e}", file=sys.stderr)
+            failures += 1
+            continue
+        summaries[path] = summarize_ledger(ledger, args.since, args.until)
+        combined.extend_ledger(ledger)
+
+    if len(summaries) > 1:
+        summaries["(all files)"] = summarize_ledger(combined, args.since, args.until)
+
+    if args.json:
+        print(json.dumps(summaries, indent=2))
+    else:
+        for name, summary in summaries.items():
+            print(f"{name}: {summary['transactions']} transactions, "
+                  f"income ${summary['total_income']:,.2f}, "
+                  f"expenses ${summary['total_expenses']:,.2f}, "
+                  f"net ${summary['net_balance']:,.2f}")
+            for name, stats in summary["amounts"].items():
+                if stats:
+                    print(f"  {name}: median ${stats['median']:,.2f}, "
+                          f"90th percentile ${stats['p90']:,.2f}, "
+                          f"largest ${stats['largest']:,.2f}")
+            if summary["top_expense_categories"]:
+                print("  top expense categories: " + ", ".join(
+                    f"{entry['category']} ${entry['amount']:,.2f}"
+                    for entry in summary["top_expense_categories"]
+                ))
+            period = summary.get("period")
+            if period:
+                print(f"  {period['from']} to {period['until']}: "
+                      f"income ${period['income']:,.2f}, "
+                      f"expenses ${period['expenses']:,.2f}, "
+                      f"closing balance ${period['closing_balance']:,.2f}")
+    return 1 if failures else 0
+
+def build_parser():
+    """Create the argument parser for the batch commands"""
+    parser = argparse.ArgumentParser(
+        prog="main.py --headless",
+        description="Convert, merge and summarize ledger files (.json, .csv, .db, .ledger) without the GUI"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    convert = commands.add_parser("convert", help="convert ledger files to another format")
+    convert.add_argument("inputs", nargs="+", help="ledger files to convert")
+    convert.add_argument("--to", choices=["json", "csv", "db", "ledger"], required=True, help="output format")
+    convert.add_argument("--output-dir", help="directory for the converted files (default: next to each input)")
+    convert.add_argument("--compact", action="store_true", help="write JSON without indentation")
+    convert.set_defaults(handler=command_convert)
+
+    merge = commands.add_parser("merge", help="merge ledger files into one")
+    merge.add_argument("inputs", nargs="+", help="ledger files to merge, in order")
+    merge.add_argument("-o", "--output", required=True, help="merged ledger file")
+    merge.add_argument("--compact", action="store_true", help="write JSON without indentation")
+    merge.add_argument("--skip-duplicates", action="store_true",
+                       help="drop transactions an earlier file already has (same amount and description, close dates)")
+    merge.add_argument("--date-tolerance", type=int, default=DATE_TOLERANCE,
+                       help=f"most days apart a duplicate's date may be (default: {DATE_TOLERANCE})")
+    merge.set_defaults(handler=command_merge)
+
+    summarize = commands.add_parser("summarize", help="print totals for ledger files")
+    summarize.add_argument("inputs", nargs="+", help="ledger files to summarize")
+    summarize.add_argument("--json", action="store_true", help="print the summary as JSON")
+    summarize.add_argument("--from", dest="since", type=day, help="also report on the period from this date")
+    summarize.add_argument("--until", type=day, help="also report on the period up to this date")
+    summarize.set_defaults(handler=command_summarize)
+
+    return parser
+
+def run(argv):
+    """Run a batch command and return the process exit code"""
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
@@ -0,0 +1,77 @@
+import queue
+import threading
+
+class BatchLoader:
+    """Base class for loaders that produce ledger batches on a worker thread
+
+    Subclasses implement run(), calling put() with each Ledger batch, and
+    update work_done/total_work so the UI can show progress.
+    """
+
+    def __init__(self, max_pending=4):
+        # Bounded so that loading never runs far ahead of the UI
+        self.batches = queue.Queue(maxsize=max_pending)
+        self.cancelled = threading.Event()
+        self.finished = False
+        self.error = None
+
+        # Progress counters, written by the worker and read by the UI
+        self.total_work = 0
+        self.work_done = 0
+        self.rows_read = 0
+
+        self.thread = threading.Thread(target=self.work, daemon=True)
+
+    def start(self):
+        """Start loading on the worker thread"""
+        self.thread.start()
+        return self
+
+    def cancel(self):
+        """Ask the worker to stop as soon as possible"""
+        self.cancelled.set()
+
+    def work(self):
+        """Run the loader and record how it ended (runs on the worker thread)"""
+        try:
+            self.run()
+        except Exception as e:
+            self.error = str(e)
+        finally:
+            self.finished = True
+
+    def run(self):
+        """Produce batches; implemented by subclasses"""
+        raise NotImplementedError
+
+    def put(self, batch):
+        """Queue a batch for the UI, giving up if loading is cancelled"""
+        while not self.cancelled.is_set():
+            try:
+                self.batches.put(batch, timeout=0.1)
+                self.rows_read += len(batch)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def get_batches(self):
+        """Drain the batches that are ready without blocking"""
+        ready = []
+        while True:
+            try:
+                ready.append(self.batches.get_nowait())
+            except queue.Empty:
+                return ready
+
+    def done(self):
+        """Check whether the worker has finished and every batch was taken"""
+        return self.finished and self.batches.empty()
+
+    def progress(self):
+        """Get (work_done, total_work) for a progress bar"""
+        return self.work_done, self.total_work
+
+    def progress_text(self, loaded):
+        """Describe the progress for a status label"""
+        return f"Loaded {loaded:,} rows..."
@@ -0,0 +1,460 @@
+"""
+Versioned binary ledger snapshots (.ledger files)
+
+Layout, all little-endian:
+
+    header        magic, version, row count, string table sizes (HEADER)
+    metadata      JSON object with the non-transaction fields, padded to 8 bytes
+    amounts       float64 per row
+    dates         int64 per row, timestamp (see dates.py)
+    description   uint32 per row, index into the description table
+    codes
+    category      uint32 per row, index into the category table
+    codes
+    description   uint32 per distinct description, in UTF-8 bytes (characters in version 1)
+    lengths
+    category      uint32 per distinct category, in UTF-8 bytes
+    lengths
+    types         int8 per row
+    description   the distinct descriptions concatenated, UTF-8
+    text
+    category      the distinct categories concatenated, UTF-8, the empty
+    text          (uncategorized) one first
+
+Versions 1 and 2 stored dates as text, like descriptions: a date code per
+row plus a table of distinct date strings, in the sections after the
+description codes, lengths and types respectively. They are still read,
+parsing each distinct date once. Versions before 4 have no categories;
+their header fields for the category table described the date table, and
+every row reads as uncategorized.
+
+Loading reads every column with array.frombytes and decodes the string
+table in one call, so no objects are built per row except list slots.
+Mapping instead leaves the columns in the file and decodes rows on demand.
+"""
+import json
+import mmap
+import struct
+import sys
+from array import array
+from functools import lru_cache
+from itertools import accumulate
+from src.utils.dates import check_stamp, parse_date
+from src.utils.ledger import Ledger
+
+MAGIC = b"PFTLEDGR"
+
+# Bump when the layout changes, and keep reading the older versions
+FORMAT_VERSION = 4
+
+# magic, version, flags, rows, categories (dates before version 3),
+# descriptions, category (date) text bytes, description text bytes,
+# metadata bytes, reserved; the fields were 0 in version 3
+HEADER = struct.Struct("<8sHHIIIIIII")
+
+# Typecode of a 4-byte unsigned array item on this platform
+CODE_TYPE = 'I' if array('I').itemsize == 4 else 'L'
+
+def padding(size, alignment=8):
+    """Number of bytes needed to pad size up to the alignment"""
+    return -size % alignment
+
+def encode_column(values):
+    """
+    Dictionary-encode a string column
+
+    Returns:
+        tuple: (codes array, list of distinct strings in code order)
+    """
+    table = {}
+    codes = array(CODE_TYPE, [table.setdefault(value, len(table)) for value in values])
+    return codes, list(table)
+
+def decode_table(lengths, view, version=FORMAT_VERSION):
+    """Rebuild a string table from its lengths and UTF-8 text"""
+    text = str(view, 'utf-8')
+    ends = list(accumulate(lengths))
+    starts = [0] + ends[:-1]
+
+    # Byte lengths index the decoded text directly when it is all ASCII
+    if version >= 2 and len(text) != len(view):
+        return [sys.intern(str(view[start:end], 'utf-8')) for start, end in zip(starts, ends)]
+    return [sys.intern(text[start:end]) for start, end in zip(starts, ends)]
+
+def little_endian(column, typecode):
+    """Get the bytes of a column in file byte order"""
+    if not isinstance(column, array) or column.typecode != typecode or sys.byteorder == "big":
+        column = array(typecode, column)
+    if sys.byteorder == "big":
+        column.byteswap()
+    return column.tobytes()
+
+def write_ledger(data, file):
+    """
+    Write financial data as a binary ledger snapshot
+
+    Args:
+        data (dict): The financial data, with a Ledger under "transactions"
+        file: Writable binary stream
+    """
+    ledger = data["transactions"]
+    metadata = json.dumps(
+        {key: value for key, value in data.items() if key != "transactions"}
+    ).encode('utf-8')
+
+    description_codes, descriptions = encode_column(ledger.descriptions)
+    descriptions = [description.encode('utf-8') for description in descriptions]
+    description_text = b"".join(descriptions)
+
+    # The ledger's categories are already codes into its own table
+    categories = [category.encode('utf-8') for category in ledger.category_names]
+    category_text = b"".join(categories)
+
+    file.write(HEADER.pack(
+        MAGIC, FORMAT_VERSION, 0, len(ledger), len(categories), len(descriptions),
+        len(category_text), len(description_text), len(metadata), 0
+    ))
+    file.write(metadata + b"\0" * padding(len(metadata)))
+    file.write(little_endian(ledger.amounts, 'd'))
+    file.write(little_endian(ledger.dates, 'q'))
+    file.write(little_endian(description_codes, CODE_TYPE))
+    file.write(little_endian(ledger.categories, CODE_TYPE))
+    file.write(little_endian(map(len, descriptions), CODE_TYPE))
+    file.write(little_endian(map(len, categories), CODE_TYPE))
+    file.write(little_endian(ledger.types, 'b'))
+    file.write(description_text)
+    file.write(category_text)
+
+def read_layout(view):
+    """
+    Parse the header and find where every section starts
+
+    Args:
+        view (memoryview): The whole file
+
+    Returns:
+        dict: The header fields, the metadata and the offset of every section
+
+    Raises:
+        ValueError: If the file is not a ledger snapshot or uses a newer format version
+    """
+    if len(view) < HEADER.size or view[:len(MAGIC)] != MAGIC:
+        raise ValueError("Not a binary ledger file")
+    (_, version, _, rows, table_count, description_count,
+     table_text_size, description_text_size, metadata_size, _) = HEADER.unpack_from(view)
+    if version > FORMAT_VERSION:
+        raise ValueError(
+            f"Ledger file format version {version} is newer than this "
+            f"version of the application supports ({FORMAT_VERSION})"
+        )
+
+    # Each version has either the date column or the date codes and table,
+    # and from version 4 a category table in the date table's header fields
+    code_size = array(CODE_TYPE).itemsize
+    date_column = version >= 3
+    category_count, category_text_size = (table_count, table_text_size) if version >= 4 else (0, 0)
+    date_count, date_text_size = (0, 0) if date_column else (table_count, table_text_size)
+    layout = {"version": version, "rows": rows, "date_count": date_count,
+              "description_count": description_count, "category_count": category_count}
+    position = HEADER.size
+    for name, size in (
+        ("metadata", metadata_size + padding(metadata_size)),
+        ("amounts", rows * 8),
+        ("dates", rows * 8 if date_column else 0),
+        ("date_codes", 0 if date_column else rows * code_size),
+        ("description_codes", rows * code_size),
+        ("category_codes", rows * code_size if category_count else 0),
+        ("date_lengths", date_count * code_size),
+        ("description_lengths", description_count * code_size),
+        ("category_lengths", category_count * code_size),
+        ("types", rows),
+        ("date_text", date_text_size),
+        ("description_text", description_text_size),
+        ("category_text", category_text_size),
+    ):
+        layout[name] = (position, position + size)
+        position += size
+    if position > len(view):
+        raise ValueError("Truncated binary ledger file")
+
+    start = layout["metadata"][0]
+    layout["data"] = json.loads(str(view[start:start + metadata_size], 'utf-8'))
+    return layout
+
+def section(view, layout, name, typecode=None):
+    """Get a section of the file as a memoryview, cast to a column type if given"""
+    start, stop = layout[name]
+    view = view[start:stop]
+    return view.cast(typecode) if typecode else view
+
+def take(view, layout, name, typecode):
+    """Copy a section of the file into an array"""
+    column = array(typecode)
+    column.frombytes(section(view, layout, name))
+    if sys.byteorder == "big" and column.itemsize > 1:
+        column.byteswap()
+    return column
+
+def date_table(view, layout):
+    """Parse the date table of a version 1 or 2 file into timestamps"""
+    dates = decode_table(section(view, layout, "date_lengths", CODE_TYPE),
+                         section(view, layout, "date_text"), layout["version"])
+    return [parse_date(date) for date in dates]
+
+def category_table(view, layout):
+    """Decode the category names of a file, or just the empty one before version 4"""
+    if not layout["category_count"]:
+        return [""]
+    return decode_table(section(view, layout, "category_lengths", CODE_TYPE),
+                        section(view, layout, "category_text"), layout["version"])
+
+def check_dates(stamps):
+    """
+    Check the stored timestamps of a version 3+ file
+
+    Timestamps are stored as is, so a damaged file can hold any number.
+
+    Raises:
+        ValueError: If the earliest or latest date is outside the supported dates
+    """
+    if len(stamps):
+        check_stamp(min(stamps))
+        check_stamp(max(stamps))
+
+def set_categories(ledger, names, codes):
+    """Give a ledger a category table and its code column"""
+    ledger.category_names = names
+    ledger.category_ids = {name: code for code, name in enumerate(names)}
+    ledger.categories = codes
+
+def read_ledger(file):
+    """
+    Read financial data from a binary ledger snapshot
+
+    Args:
+        file: Readable binary stream
+
+    Returns:
+        dict: The financial data, with the transactions as a Ledger
+
+    Raises:
+        ValueError: If the file is not a ledger snapshot or uses a newer format version
+    """
+    view = memoryview(file.read())
+    layout = read_layout(view)
+    version = layout["version"]
+
+    ledger = Ledger()
+    ledger.amounts = take(view, layout, "amounts", 'd')
+    ledger.types = take(view, layout, "types", 'b')
+    if version >= 3:
+        ledger.dates = take(view, layout, "dates", 'q')
+        check_dates(ledger.dates)
+    else:
+        dates = date_table(view, layout)
+        ledger.dates = array('q', map(dates.__getitem__, take(view, layout, "date_codes", CODE_TYPE)))
+    descriptions = decode_table(
+        take(view, layout, "description_lengths", CODE_TYPE), section(view, layout, "description_text"), version
+    )
+
+    # Expand the codes into the description column, sharing the table strings
+    ledger.descriptions = list(map(descriptions.__getitem__, take(view, layout, "description_codes", CODE_TYPE)))
+
+    if layout["category_count"]:
+        codes = take(view, layout, "category_codes", CODE_TYPE)
+    else:
+        codes = array(CODE_TYPE, [0]) * layout["rows"]
+    set_categories(ledger, category_table(view, layout), codes)
+
+    data = layout["data"]
+    data["transactions"] = ledger
+    return data
+
+def map_ledger(path, cache_size=65536):
+    """
+    Open a binary ledger snapshot lazily with a memory map
+
+    Only the description table offsets are built up front. Rows stay in the file
+    and are decoded when the list scrolls to them or a query reads them, so
+    resident memory follows what is actually used. New rows are kept in
+    memory after the mapped ones.
+
+    Args:
+        path (str): Ledger file path
+        cache_size (int): Number of decoded descriptions to keep
+
+    Returns:
+        dict: The financial data, with the transactions as a Ledger of mapped columns
+
+    Raises:
+        ValueError: If the file is not a ledger snapshot or uses a newer format version
+    """
+    # Columns are cast in place, which needs the file's byte order
+    if sys.byteorder == "big":
+        with open(path, 'rb') as file:
+            return read_ledger(file)
+
+    with open(path, 'rb') as file:
+        if not file.seek(0, 2):
+            raise ValueError("Not a binary ledger file")
+        # The map stays valid after the file is closed, and after the path is
+        # replaced (which Windows refuses while it is mapped, see LedgerIO.save_binary)
+        view = memoryview(mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ))
+    layout = read_layout(view)
+    version = layout["version"]
+
+    if version >= 2:
+        descriptions = StringTable(section(view, layout, "description_lengths", CODE_TYPE),
+                                   section(view, layout, "description_text"), cache_size)
+    else:
+        # Character lengths only locate strings in the decoded text
+        descriptions = decode_table(section(view, layout, "description_lengths", CODE_TYPE),
+                                    section(view, layout, "description_text"), version)
+
+    ledger = Ledger()
+    ledger.amounts = MappedColumn(section(view, layout, "amounts", 'd'), array('d'))
+    ledger.types = MappedColumn(section(view, layout, "types", 'b'), array('b'))
+    if version >= 3:
+        dates = section(view, layout, "dates", 'q')
+        check_dates(dates)
+        ledger.dates = MappedColumn(dates, array('q'))
+    else:
+        dates = MappedCodes(section(view, layout, "date_codes", CODE_TYPE), date_table(view, layout))
+        ledger.dates = MappedColumn(dates, array('q'))
+    ledger.descriptions = MappedColumn(
+        MappedCodes(section(view, layout, "description_codes", CODE_TYPE), descriptions), []
+    )
+
+    # Older files have no categories, so every mapped row is uncategorized
+    if layout["category_count"]:
+        codes = MappedColumn(section(view, layout, "category_codes", CODE_TYPE), array(CODE_TYPE))
+    else:
+        codes = array(CODE_TYPE, [0]) * layout["rows"]
+    set_categories(ledger, category_table(view, layout), codes)
+
+    data = layout["data"]
+    data["transactions"] = ledger
+    return data
+
+
+class StringTable:
+    """Distinct strings of a mapped file, decoded on demand through a bounded cache"""
+
+    def __init__(self, lengths, text, cache_size=65536):
+        """
+        Args:
+            lengths (memoryview): Byte length of every string
+            text (memoryview): The strings concatenated, UTF-8
+            cache_size (int): Number of decoded strings to keep
+        """
+        # The offset index: where every string starts in the text
+        self.offsets = array('q', [0])
+        self.offsets.extend(accumulate(lengths))
+        self.text = text
+        self.lookup = lru_cache(maxsize=cache_size)(self.decode)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, code):
+        return self.lookup(code)
+
+    def decode(self, code):
+        """Decode one string from the mapped text"""
+        return sys.intern(str(self.text[self.offsets[code]:self.offsets[code + 1]], 'utf-8'))
+
+
+class MappedCodes:
+    """Read-only column stored as codes into a table of distinct values"""
+
+    def __init__(self, codes, table):
+        """
+        Args:
+            codes (memoryview): Table code of every row
+            table: StringTable, or a list of already decoded values
+        """
+        self.codes = codes
+        self.table = table
+
+        # Call the table's cache directly in bulk reads
+        self.lookup = getattr(table, 'lookup', table.__getitem__)
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(map(self.lookup, self.codes[index]))
+        return self.lookup(self.codes[index])
+
+    def __iter__(self):
+        return map(self.lookup, self.codes)
+
+
+class MappedColumn:
+    """
+    Ledger column over read-only mapped data, with new rows kept in memory
+
+    Supports what Ledger does with its columns: indexing, slicing,
+    iteration, append, extend and deletion. Deleting a mapped row copies
+    the mapped part into memory first.
+    """
+
+    def __init__(self, base, tail):
+        """
+        Args:
+            base: Read-only sequence of the mapped rows
+            tail (list or array): Rows added after the mapped ones
+        """
+        self.base = base
+        self.tail = tail
+
+    def __len__(self):
+        return len(self.base) + len(self.tail)
+
+    def __getitem__(self, index):
+        mapped = len(self.base)
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return [self[position] for position in range(start, stop, step)]
+            rows = list(self.base[start:min(stop, mapped)]) if start < mapped else []
+            if stop > mapped:
+                rows.extend(self.tail[max(start - mapped, 0):stop - mapped])
+            return rows
+
+        if index < 0:
+            index += len(self)
+        if index < mapped:
+            return self.base[index]
+        return self.tail[index - mapped]
+
+    def __iter__(self):
+        yield from self.base
+        yield from self.tail
+
+    def __copy__(self):
+        # The mapped rows never change, so copies can share them
+        return MappedColumn(self.base, self.tail[:])
+
+    def append(self, value):
+        self.tail.append(value)
+
+    def extend(self, values):
+        self.tail.extend(values)
+
+    def __delitem__(self, index):
+        mapped = len(self.base)
+        if index < 0:
+            index += len(self)
+        if index >= mapped:
+            del self.tail[index - mapped]
+            return
+
+        # Copy the mapped rows into memory so they can change
+        tail = self.tail
+        self.tail = tail[:0]
+        self.tail.extend(self.base[0:mapped])
+        self.tail.extend(tail)
+        self.base = ()
+        del self.tail[index]
@@ -0,0 +1,102 @@
+import csv
+import operator
+import os
+from itertools import islice
+from src.utils.batch_loader import BatchLoader
+from src.utils.dates import slash_date_orders
+from src.utils.ledger import Ledger
+
+class CsvImporter(BatchLoader):
+    """
+    Streams a CSV file into ledger batches on a worker thread
+
+    Batches are handed over in file order as they are parsed. Whether the
+    rows came in date order is tracked in in_date_order, so the caller can
+    put them in date order afterwards, like statements imported together
+    by ParallelCsvImporter, only when they weren't.
+    """
+
+    def __init__(self, file_path, batch_size=10000, max_pending=4):
+        """
+        Args:
+            file_path (str): CSV file to import
+            batch_size (int): Number of rows parsed into each batch
+            max_pending (int): Batches allowed to wait in the queue before parsing pauses
+        """
+        super().__init__(max_pending)
+        self.file_path = file_path
+        self.batch_size = batch_size
+
+        # Progress is measured in bytes of the file
+        self.total_bytes = self.total_work = os.path.getsize(file_path)
+        self.bytes_read = 0
+
+        # (row number, reason) of every row that couldn't be read
+        self.skipped = []
+
+        # Whether every row so far is dated on or after the one before it
+        self.in_date_order = True
+        self.last_date = None
+        self.rows_parsed = 0
+
+    def read_lines(self, file):
+        """Yield decoded lines while counting the bytes consumed"""
+        for index, raw_line in enumerate(file):
+            self.bytes_read += len(raw_line)
+            self.work_done = self.bytes_read
+            yield raw_line.decode('utf-8-sig' if index == 0 else 'utf-8')
+
+    def read_rows(self, file):
+        """Yield the CSV rows, stopping early if the import is cancelled"""
+        for row in csv.DictReader(self.read_lines(file)):
+            if self.cancelled.is_set():
+                return
+            yield row
+
+    def run(self):
+        """Parse the file into batches (runs on the worker thread)"""
+        with open(self.file_path, 'rb') as file:
+            rows = self.read_rows(file)
+            held = []  # Batches of rows waiting for the file to show its date order
+            orders = [0, 0, 0]  # Day first, month first and ambiguous n/n/yyyy dates so far
+            for chunk in iter(lambda: list(islice(rows, self.batch_size)), []):
+                held.append(chunk)
+                texts = {str(row.get('date') or '').strip() for row in chunk}
+                for position, count in enumerate(slash_date_orders(texts)):
+                    orders[position] += count
+
+                # Ambiguous dates like 01/02/2024 wait until a later date shows the order
+                if orders[2] and not (orders[0] or orders[1]):
+                    continue
+                if not self.put_rows(held, orders[0] > orders[1]):
+                    return
+                held = []
+
+            if not self.cancelled.is_set():
+                # A file whose n/n/yyyy dates are all ambiguous is read month first
+                self.put_rows(held, False)
+
+    def put_rows(self, chunks, day_first):
+        """Parse chunks of rows into batches and queue them, tracking the date order"""
+        for chunk in chunks:
+            batch = Ledger.from_rows(chunk, self.skipped, day_first, self.rows_parsed + 1)
+            self.rows_parsed += len(chunk)
+            if not batch:
+                continue
+
+            dates = batch.dates
+            if self.in_date_order and (
+                (self.last_date is not None and dates[0] < self.last_date)
+                or not all(map(operator.le, dates, islice(dates, 1, None)))
+            ):
+                self.in_date_order = False
+            self.last_date = dates[-1]
+            if not self.put(batch):
+                return False
+        return True
+
+    def progress_text(self, loaded):
+        """Describe the progress in rows and megabytes"""
+        megabytes_read = self.bytes_read / 1048576
+        total_megabytes = self.total_bytes / 1048576
+        return f"Imported {loaded:,} rows ({megabytes_read:,.1f} of {total_megabytes:,.1f} MB)..."
@@ -0,0 +1,175 @@
+"""
+Transaction dates as integer timestamps
+
+A date is parsed once, when the transaction enters the ledger, into
+seconds since 1970-01-01 in naive local time (like the datetimes the
+input form creates). Everything displayed or saved is formatted back from
+that number through per-day caches, so no hot path parses dates.
+"""
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+
+EPOCH = datetime(1970, 1, 1)
+EPOCH_ORDINAL = EPOCH.toordinal()
+SECONDS_PER_DAY = 86400
+
+# Supported dates; a date far outside them is almost always a bad import,
+# and would make the day-indexed structures (BalanceIndex) huge
+FIRST_DATE = date(1900, 1, 1)
+LAST_DATE = date(2199, 12, 31)
+FIRST_DAY = FIRST_DATE.toordinal() - EPOCH_ORDINAL
+LAST_DAY = LAST_DATE.toordinal() - EPOCH_ORDINAL
+
+# Formats accepted for date strings that aren't ISO dates. Ambiguous
+# n/n/yyyy dates are read month first, unless a file's dates show that
+# they are day first (see slash_dates_day_first)
+DATE_FORMATS = ("%b %d, %Y", "%B %d, %Y", "%m/%d/%Y", "%d/%m/%Y", "%Y/%m/%d", "%d %b %Y")
+DAY_FIRST_FORMATS = ("%b %d, %Y", "%B %d, %Y", "%d/%m/%Y", "%m/%d/%Y", "%Y/%m/%d", "%d %b %Y")
+
+def datetime_stamp(value):
+    """Convert a datetime or date to a timestamp"""
+    seconds = (value.toordinal() - EPOCH_ORDINAL) * SECONDS_PER_DAY
+    if isinstance(value, datetime):
+        seconds += value.hour * 3600 + value.minute * 60 + value.second
+    return seconds
+
+def check_day(day):
+    """
+    Check that a day number is within the supported dates
+
+    Raises:
+        ValueError: If it is before FIRST_DATE or after LAST_DATE
+    """
+    if not FIRST_DAY <= day <= LAST_DAY:
+        ordinal = day + EPOCH_ORDINAL
+        shown = date.fromordinal(ordinal).isoformat() if 1 <= ordinal <= date.max.toordinal() else f"day {day}"
+        raise ValueError(
+            f"Date out of range: {shown} "
+            f"(supported dates are {FIRST_DATE.isoformat()} to {LAST_DATE.isoformat()})"
+        )
+    return day
+
+def check_stamp(stamp):
+    """Check that a timestamp is within the supported dates, see check_day()"""
+    check_day(stamp // SECONDS_PER_DAY)
+    return stamp
+
+def slash_date_orders(texts):
+    """
+    Count the n/n/yyyy dates that show day/month order, month/day order or neither
+
+    A date like 25/03/2024 can only be day first and 03/25/2024 only month
+    first, while 01/02/2024 could be either.
+
+    Args:
+        texts: Date strings (distinct ones are enough)
+
+    Returns:
+        tuple: (day first count, month first count, ambiguous count)
+    """
+    day_first = month_first = ambiguous = 0
+    for text in texts:
+        parts = text.split('/', 2)
+        if len(parts) != 3 or not (parts[0].strip().isdigit() and parts[1].isdigit()):
+            continue
+        first, second = int(parts[0]), int(parts[1])
+        if first > 12 >= second:
+            day_first += 1
+        elif second > 12 >= first:
+            month_first += 1
+        elif first <= 12 and second <= 12:
+            ambiguous += 1
+    return day_first, month_first, ambiguous
+
+def slash_dates_day_first(texts):
+    """
+    Tell whether a file's n/n/yyyy dates put the day first
+
+    Whichever order more of the dates show decides (see slash_date_orders).
+    Files whose dates are all ambiguous are read month first.
+
+    Args:
+        texts: Date strings of one file (distinct ones are enough)
+
+    Returns:
+        bool: True to read ambiguous dates as day/month/year
+    """
+    day_first, month_first, _ = slash_date_orders(texts)
+    return day_first > month_first
+
+@lru_cache(maxsize=65536)
+def parse_date_string(value, day_first=False):
+    """Parse a date string to a timestamp (cached per distinct string)"""
+    text = value.strip()
+    candidates = [text]
+    if len(text) > 10 and text[4] == '-' and text[7] == '-':
+        # Fall back to the ISO date prefix of longer strings
+        candidates.append(text[:10])
+
+    formats = DAY_FIRST_FORMATS if day_first else DATE_FORMATS
+    return check_stamp(datetime_stamp(parse_datetime(text, candidates, formats, value)))
+
+def parse_datetime(text, candidates, formats, value):
+    """Try the ISO candidates, then every format in order"""
+    for candidate in candidates:
+        try:
+            return datetime.fromisoformat(candidate)
+        except ValueError:
+            pass
+    for date_format in formats:
+        try:
+            return datetime.strptime(text, date_format)
+        except ValueError:
+            continue
+    raise ValueError(f"Unrecognized date: {value!r}")
+
+def parse_date(value, day_first=False):
+    """
+    Normalize a transaction date to a timestamp
+
+    Args:
+        value: datetime, date, timestamp or date string
+        day_first (bool): Read ambiguous n/n/yyyy dates as day/month/year
+
+    Returns:
+        int: Seconds since 1970-01-01
+
+    Raises:
+        ValueError: If a date string is in none of the known formats, or
+        the date is outside FIRST_DATE..LAST_DATE
+    """
+    if isinstance(value, int):
+        return check_stamp(value)
+    if isinstance(value, (datetime, date)):
+        return check_stamp(datetime_stamp(value))
+    return parse_date_string(str(value), day_first)
+
+@lru_cache(maxsize=65536)
+def format_day(day, pattern):
+    """Format a day number (days since 1970-01-01) with a strftime pattern"""
+    return (EPOCH + timedelta(days=day)).strftime(pattern)
+
+@lru_cache(maxsize=65536)
+def iso_day(day):
+    """Format a day number as YYYY-MM-DD (isoformat is much cheaper than strftime)"""
+    return date.fromordinal(day + EPOCH_ORDINAL).isoformat()
+
+def day_key(stamp):
+    """Get the YYYY-MM-DD key of a timestamp's day"""
+    return iso_day(stamp // SECONDS_PER_DAY)
+
+def format_date(stamp):
+    """Format a timestamp for saving: YYYY-MM-DD, plus HH:MM:SS unless it is midnight"""
+    day, seconds = divmod(stamp, SECONDS_PER_DAY)
+    text = iso_day(day)
+    if seconds:
+        text += f" {seconds // 3600:02d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+    return text
+
+def display_date(stamp):
+    """Format a timestamp for the transaction list"""
+    return format_day(stamp // SECONDS_PER_DAY, "%b %d, %Y")
+
+def short_date(stamp):
+    """Format a timestamp as a short chart label"""
+    return format_day(stamp // SECONDS_PER_DAY, "%b %d")
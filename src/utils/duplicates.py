@@ -0,0 +1,187 @@
+from src.utils.dates import SECONDS_PER_DAY
+
+# Days a duplicate's date may differ by (banks move posting dates by a day or two)
+DATE_TOLERANCE = 3
+
+def normalize_description(text):
+    """Fold a description for identity: case-insensitive, with runs of whitespace as one space"""
+    return " ".join(text.casefold().split())
+
+
+class DuplicateIndex:
+    """
+    Hash index of transaction identities, for finding duplicates in imports
+
+    A row's identity is its day, its signed amount in cents and its
+    normalized description. The index counts rows per identity (a
+    multiset), so two genuinely identical transactions need two matches.
+    It is built the first time it is used and then kept up to date, so
+    ledgers that never merge an import don't pay for it.
+    """
+
+    def __init__(self):
+        self.on_reset(None)
+
+    def on_reset(self, ledger):
+        """Forget every row; the index is built again on first use"""
+        self.ledger = ledger
+        self.counts = None  # (day, cents, description) -> rows, or None until built
+        self.first_day = None
+        self.last_day = None
+        self.folded = {}  # Description -> normalized description
+
+    def on_append(self, ledger, start, stop):
+        """Add appended rows, if the index is built"""
+        self.ledger = ledger
+        if self.counts is not None:
+            self.add_rows(ledger, start, stop)
+
+    def on_remove(self, ledger, index):
+        """Drop a row that is about to be removed, if the index is built"""
+        if self.counts is None:
+            return
+        for key in self.row_keys(ledger, index, index + 1):
+            count = self.counts[key] - 1
+            if count:
+                self.counts[key] = count
+            else:
+                del self.counts[key]
+
+    def build(self):
+        """Index every row of the ledger, unless already built"""
+        if self.counts is not None:
+            return
+        self.counts = {}
+        if self.ledger is not None:
+            self.add_rows(self.ledger, 0, len(self.ledger))
+
+    def add_rows(self, ledger, start, stop):
+        """Count the identities of rows start..stop"""
+        counts = self.counts
+        for key in self.row_keys(ledger, start, stop):
+            counts[key] = counts.get(key, 0) + 1
+            day = key[0]
+            # The span only grows; a removal never makes matching stricter
+            if self.first_day is None or day < self.first_day:
+                self.first_day = day
+            if self.last_day is None or day > self.last_day:
+                self.last_day = day
+
+    def row_keys(self, ledger, start, stop):
+        """Yield the (day, signed cents, normalized description) identity of rows start..stop"""
+        folded = self.folded
+        expense = ledger.EXPENSE
+        for stamp, description, amount, type_code in zip(
+            ledger.dates[start:stop], ledger.descriptions[start:stop],
+            ledger.amounts[start:stop], ledger.types[start:stop]
+        ):
+            text = folded.get(description)
+            if text is None:
+                text = folded[description] = normalize_description(description)
+            cents = round(amount * 100)
+            yield stamp // SECONDS_PER_DAY, -cents if type_code == expense else cents, text
+
+
+class Deduplicator:
+    """
+    Drops incoming rows that are already in a ledger, one import at a time
+
+    Each incoming row is looked up in the ledger's DuplicateIndex at its
+    own day, then up to DATE_TOLERANCE days either side, nearest first, so
+    every check is a few hash lookups. A matched existing row is used up,
+    and rows the import itself adds are never matched, so identical rows
+    within one import are all kept. Rows dated more than the tolerance
+    outside the days the ledger already covers are kept without lookups,
+    since overlapping statements only duplicate around that span.
+    """
+
+    def __init__(self, index, tolerance=DATE_TOLERANCE):
+        """
+        Args:
+            index (DuplicateIndex): Index of the rows to check against
+            tolerance (int): Most days a duplicate's date may differ by
+        """
+        index.build()
+        self.index = index
+
+        # Days a duplicate can fall on: the ledger's span, widened by the tolerance
+        self.first_day = self.last_day = None
+        if index.first_day is not None:
+            self.first_day = index.first_day - tolerance
+            self.last_day = index.last_day + tolerance
+        self.offsets = [0]
+        for days in range(1, tolerance + 1):
+            self.offsets.extend((-days, days))
+
+        # Identities matched by, or added by, this import
+        self.used = {}
+        self.added = {}
+        self.skipped = 0
+
+    def filter(self, batch):
+        """
+        Get the rows of an incoming batch that are not duplicates
+
+        The kept rows are counted as added by this import, so they must be
+        appended to the indexed ledger (or added to the index) afterwards.
+
+        Args:
+            batch (Ledger): Incoming rows
+
+        Returns:
+            Ledger: The rows to keep, in order; the batch itself when every row is kept
+        """
+        if self.first_day is None:
+            return batch
+
+        counts = self.index.counts
+        used = self.used
+        added = self.added
+        kept = []
+        for row, key in enumerate(self.index.row_keys(batch, 0, len(batch))):
+            day, cents, text = key
+            if self.first_day <= day <= self.last_day and self.match(day, cents, text, counts, used, added):
+                self.skipped += 1
+                continue
+            added[key] = added.get(key, 0) + 1
+            kept.append(row)
+
+        if len(kept) == len(batch):
+            return batch
+        return batch.take(kept)
+
+    def match(self, day, cents, text, counts, used, added):
+        """Use up an existing row with the identity, nearest day first; True if one is left"""
+        for offset in self.offsets:
+            candidate = (day + offset, cents, text)
+            if counts.get(candidate, 0) - added.get(candidate, 0) - used.get(candidate, 0) > 0:
+                used[candidate] = used.get(candidate, 0) + 1
+                return True
+        return False
+
+def drop_overlaps(ledgers, tolerance=DATE_TOLERANCE):
+    """
+    Remove from each ledger the rows that repeat rows of the ledgers before it
+
+    Used to merge overlapping statements: rows repeated within one
+    statement are all kept, while a statement's rows that an earlier one
+    already has are dropped.
+
+    Args:
+        ledgers (list): Ledgers in priority order
+        tolerance (int): Most days a duplicate's date may differ by
+
+    Returns:
+        tuple: (list of ledgers without the repeated rows, number of rows dropped)
+    """
+    index = DuplicateIndex()
+    index.build()
+    kept_ledgers = []
+    skipped = 0
+    for ledger in ledgers:
+        deduplicator = Deduplicator(index, tolerance)
+        kept = deduplicator.filter(ledger)
+        index.add_rows(kept, 0, len(kept))
+        kept_ledgers.append(kept)
+        skipped += deduplicator.skipped
+    return kept_ledgers, skipped
@@ -1,28 +1,39 @@
-import json
 import os
 from tkinter import filedialog, messagebox
-import pickle
+from src.utils.ledger_io import LedgerIO
+from src.utils.csv_importer import CsvImporter
+from src.utils.json_loader import JsonLoader
+from src.utils.json_writer import JsonWriter
+from src.utils.sqlite_store import SqliteStore
 
 class FileHandler:
-    """Utility class for handling file operations (save/load)"""
+    """Utility class for handling file operations (save/load) through Tk dialogs"""
     
     @staticmethod
-    def save_data(data, default_filename="finance_data.json"):
+    def save_data(data, default_filename="finance_data.json", compact=False):
         """
-        Save financial data to a JSON file
+        Save financial data to a JSON file, binary ledger or SQLite ledger database
+        
+        A JSON file is not written here: the returned JsonWriter streams it
+        to disk on a worker thread and reports how the save ended.
         
         Args:
-            data (dict): The financial data to save
+            data (dict): The financial data to save, with a Ledger under "transactions"
             default_filename (str): Default filename to suggest
+            compact (bool): Write JSON without indentation
         
         Returns:
-            bool: True if save was successful, False otherwise
+            str or JsonWriter: The saved file path, or the running writer for
+            a JSON file, if save was started successfully; False otherwise
         """
         try:
             # Ask user where to save the file
             file_path = filedialog.asksaveasfilename(
                 defaultextension=".json",
-                filetypes=[("JSON files", "*.json"), ("All files", "*.*")],
+                filetypes=[
+                    ("JSON files", "*.json"), ("Binary ledger", "*.ledger"),
+                    ("SQLite ledger", "*.db"), ("All files", "*.*")
+                ],
                 initialfile=default_filename
             )
             
@@ -30,11 +41,13 @@ class FileHandler:
             if not file_path:
                 return False
             
-            # Save data to the selected file
-            with open(file_path, 'w') as file:
-                json.dump(data, file, indent=4)
+            # Save data to the selected file in the format of its extension
+            if file_path.lower().endswith((".db", ".sqlite", ".ledger")):
+                LedgerIO.save(data, file_path)
+                return file_path
             
-            return True
+            # Stream JSON in the background so large ledgers don't freeze the UI
+            return JsonWriter(data, file_path, compact).start()
         
         except Exception as e:
             messagebox.showerror("Save Error", f"An error occurred while saving: {str(e)}")
@@ -43,30 +56,44 @@ class FileHandler:
     @staticmethod
     def load_data():
         """
-        Load financial data from a JSON file
+        Load financial data from a JSON file, binary ledger or SQLite ledger database
+        
+        Only a binary ledger is read here: it is memory-mapped and marked
+        with "mapped", with its path under "source". A JSON file or database is read in the background:
+        the returned data holds a running JsonLoader or SqliteReader under
+        "transactions" (plus the open SqliteStore under "store"), which
+        streams the rows as batches.
         
         Returns:
-            dict: The loaded financial data or None if loading failed
+            dict: The loaded financial data (transactions as a Ledger or BatchLoader) or None if loading failed
         """
         try:
             # Ask user which file to load
             file_path = filedialog.askopenfilename(
-                filetypes=[("JSON files", "*.json"), ("All files", "*.*")]
+                filetypes=[
+                    ("JSON files", "*.json"), ("Binary ledger", "*.ledger"),
+                    ("SQLite ledger", "*.db"), ("All files", "*.*")
+                ]
             )
             
             # If user cancels the open dialog
             if not file_path:
                 return None
             
-            # Load data from the selected file
-            with open(file_path, 'r') as file:
-                data = json.load(file)
+            if file_path.lower().endswith((".db", ".sqlite")):
+                store = SqliteStore(file_path)
+                return {
+                    "transactions": store.start_reader(),
+                    "store": store,
+                    "saved_date": store.get_metadata("saved_date", "Unknown")
+                }
             
-            return data
-        
-        except json.JSONDecodeError:
-            messagebox.showerror("Load Error", "The selected file is not a valid JSON file.")
-            return None
+            # A binary ledger is mapped, not read: rows are decoded as they are shown
+            if file_path.lower().endswith(".ledger"):
+                return dict(LedgerIO.map_binary(file_path), mapped=True, source=file_path)
+            
+            # JSON is parsed on a worker thread; the rest of the saved data arrives with it
+            return {"transactions": JsonLoader(file_path).start()}
         
         except Exception as e:
             messagebox.showerror("Load Error", f"An error occurred while loading: {str(e)}")
@@ -78,15 +105,13 @@ class FileHandler:
         Export financial data to a CSV file
         
         Args:
-            data (list): List of transaction dictionaries
+            data (Ledger): Ledger of transactions to export
             default_filename (str): Default filename to suggest
         
         Returns:
             bool: True if export was successful, False otherwise
         """
         try:
-            import csv
-            
             # Ask user where to save the CSV file
             file_path = filedialog.asksaveasfilename(
                 defaultextension=".csv",
@@ -98,15 +123,8 @@ class FileHandler:
             if not file_path:
                 return False
             
-            # Define CSV headers based on transaction data structure
-            headers = ["date", "description", "amount", "type"]
-            
             # Write data to CSV file
-            with open(file_path, 'w', newline='') as file:
-                writer = csv.DictWriter(file, fieldnames=headers)
-                writer.writeheader()
-                for transaction in data:
-                    writer.writerow(transaction)
+            LedgerIO.export_csv(data, file_path)
             
             return True
             
@@ -115,37 +133,38 @@ class FileHandler:
             return False
     
     @staticmethod
-    def import_from_csv():
+    def start_csv_import(batch_size=10000):
         """
-        Import financial data from a CSV file
+        Ask for one or more CSV files and start parsing them in the background
+        
+        A single file is parsed on a worker thread. Several files are
+        parsed in parallel worker processes and merged. Either way the
+        rows arrive in date order.
+        
+        Args:
+            batch_size (int): Number of rows handed to the UI per batch (single file)
         
         Returns:
-            list: List of transaction dictionaries or None if import failed
+            BatchLoader: The running CsvImporter or ParallelCsvImporter, or
+            None if import was cancelled or failed
         """
         try:
-            import csv
-            
-            # Ask user which CSV file to import
-            file_path = filedialog.askopenfilename(
+            # Ask user which CSV files to import
+            file_paths = filedialog.askopenfilenames(
                 filetypes=[("CSV files", "*.csv"), ("All files", "*.*")]
             )
             
             # If user cancels the open dialog
-            if not file_path:
+            if not file_paths:
                 return None
             
-            transactions = []
+            if len(file_paths) == 1:
+                return CsvImporter(file_paths[0], batch_size=batch_size).start()
             
-            # Read data from CSV file
-            with open(file_path, 'r', newline='') as file:
-                reader = csv.DictReader(file)
-                for row in reader:
-                    # Convert amount to float
-                    row['amount'] = float(row['amount'])
-                    transactions.append(row)
-            
-            return transactions
+            # Imported here: multiprocessing isn't needed to start the app
+            from src.utils.parallel_import import ParallelCsvImporter
+            return ParallelCsvImporter(file_paths).start()
             
         except Exception as e:
             messagebox.showerror("Import Error", f"An error occurred while importing: {str(e)}")
-            return None 
\ No newline at end of file
+            return None
@@ -0,0 +1,278 @@
+import glob
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from src.utils import binary_ledger
+from src.utils.batch_loader import BatchLoader
+from src.utils.json_writer import fsync_directory, write_json
+from src.utils.ledger import Ledger
+
+DEFAULT_DIRECTORY = os.path.join(os.path.expanduser("~"), ".personal_finance_tracker", "autosave")
+JOURNAL_NAME = "journal.jsonl"
+SNAPSHOT_NAME = "snapshot.json"
+# Version 2 snapshots may refer to a saved .ledger file instead of holding the rows
+SNAPSHOT_VERSION = 2
+
+def journal_default(value):
+    """Encode values json.dumps can't handle (datetime dates)"""
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class Journal:
+    """Append-only autosave journal with periodic compaction into a snapshot
+
+    Every added transaction is appended to journal.jsonl as one numbered
+    record. Compaction rotates the journal and writes the whole ledger to
+    snapshot.json on a background thread; the snapshot remembers the last
+    record it contains, so recovery loads it and replays only later records.
+    When the ledger is exactly a saved binary ledger, the snapshot just
+    refers to that file.
+    """
+
+    def __init__(self, directory, sync_interval=1.0, compact_every=10000):
+        """
+        Args:
+            directory (str): Directory holding the journal and snapshot files
+            sync_interval (float): Longest time in seconds an appended record waits for fsync
+            compact_every (int): Number of appended records after which to compact
+        """
+        self.directory = directory
+        self.sync_interval = sync_interval
+        self.compact_every = compact_every
+        os.makedirs(directory, exist_ok=True)
+
+        self.sequence = 0  # Number of the last record written
+        self.warning = None  # What recover() couldn't restore, if anything
+        self.appended = 0  # Records appended since the last compaction
+        self.dirty = False
+        self.last_sync = time.monotonic()
+        self.file = None
+
+        # Snapshot writers run on background threads, one at a time
+        self.snapshot_lock = threading.Lock()
+        self.snapshot_sequence = 0
+        self.compaction = None
+
+    def path(self, name):
+        return os.path.join(self.directory, name)
+
+    def recover(self):
+        """
+        Rebuild the last session from the snapshot and the journal tail
+
+        If the snapshot refers to a .ledger file that can no longer be read,
+        the journal tail is still replayed, without the file's rows, and
+        self.warning says why; the next compaction replaces the snapshot.
+
+        Returns:
+            Ledger: The recovered transactions
+        """
+        ledger = Ledger()
+        self.warning = None
+        snapshot_path = self.path(SNAPSHOT_NAME)
+        if os.path.exists(snapshot_path):
+            with open(snapshot_path, 'r') as file:
+                snapshot = json.load(file)
+            if snapshot.get("source"):
+                try:
+                    ledger.extend_ledger(self.read_source(snapshot["source"]))
+                except (OSError, ValueError) as e:
+                    self.warning = str(e)
+            else:
+                ledger.extend(snapshot.get("transactions", []))
+            self.snapshot_sequence = snapshot.get("sequence", 0)
+        self.sequence = self.snapshot_sequence
+
+        # Replay records newer than the snapshot, from rotated and current journals
+        tail = []
+        journal_paths = glob.glob(self.path("journal-*.jsonl")) + [self.path(JOURNAL_NAME)]
+        for journal_path in journal_paths:
+            if not os.path.exists(journal_path):
+                continue
+            with open(journal_path, 'r') as file:
+                for line in file:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # A torn final write from a crash
+                        continue
+                    if record["sequence"] > self.snapshot_sequence:
+                        tail.append(record)
+
+        tail.sort(key=lambda record: record["sequence"])
+        ledger.extend(tail)
+        if tail:
+            self.sequence = tail[-1]["sequence"]
+        self.appended = len(tail)
+        return ledger
+
+    @staticmethod
+    def file_identity(path):
+        """Describe a saved file well enough to tell whether it changed later"""
+        status = os.stat(path)
+        return {"path": os.path.abspath(path), "size": status.st_size, "mtime_ns": status.st_mtime_ns}
+
+    @staticmethod
+    def read_source(source):
+        """
+        Read the binary ledger a snapshot refers to
+
+        Raises:
+            ValueError: If the file was changed or removed after the snapshot, or is damaged
+            OSError: If the file can't be read
+        """
+        path = source["path"]
+        try:
+            unchanged = Journal.file_identity(path) == source
+        except OSError:
+            unchanged = False
+        if not unchanged:
+            raise ValueError(f"The last session was {path}, which has been changed or removed since")
+        with open(path, 'rb') as file:
+            return binary_ledger.read_ledger(file)["transactions"]
+
+    def open(self):
+        """Open the current journal file for appending"""
+        if self.file is None:
+            journal_path = self.path(JOURNAL_NAME)
+            torn = False
+            if os.path.exists(journal_path) and os.path.getsize(journal_path) > 0:
+                with open(journal_path, 'rb') as file:
+                    file.seek(-1, os.SEEK_END)
+                    torn = file.read(1) != b"\n"
+
+            self.file = open(journal_path, 'a')
+
+            # Start on a fresh line after a torn final write
+            if torn:
+                self.file.write("\n")
+
+    def append(self, transaction):
+        """Append one transaction record, flushed now and fsynced in batches"""
+        self.open()
+        self.sequence += 1
+        record = dict(transaction, sequence=self.sequence)
+        self.file.write(json.dumps(record, default=journal_default) + "\n")
+        self.file.flush()
+        self.dirty = True
+        self.appended += 1
+
+        if time.monotonic() - self.last_sync >= self.sync_interval:
+            self.sync()
+
+    def sync(self):
+        """Force appended records to disk"""
+        if self.dirty and self.file is not None:
+            os.fsync(self.file.fileno())
+            self.dirty = False
+        self.last_sync = time.monotonic()
+
+    def needs_compaction(self):
+        """Check whether enough records were appended to compact"""
+        return self.appended >= self.compact_every
+
+    def compact(self, ledger, source=None):
+        """
+        Fold everything so far into a new snapshot of the ledger
+
+        The journal is rotated right away, so appends continue into a fresh
+        file while the snapshot is written on a background thread.
+
+        Args:
+            ledger (Ledger): The current transactions
+            source (str): A binary ledger file holding exactly these rows,
+                which the snapshot refers to instead of copying them
+        """
+        source = self.file_identity(source) if source else None
+
+        # Rotate the journal; records up to here are covered by the snapshot
+        self.sync()
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+        # Each compaction takes its own sequence number, so snapshots are ordered
+        self.sequence += 1
+        sequence = self.sequence
+        if os.path.exists(self.path(JOURNAL_NAME)):
+            os.replace(self.path(JOURNAL_NAME), self.path(f"journal-{sequence}.jsonl"))
+        self.appended = 0
+
+        # Copy the columns so the UI can keep changing the ledger meanwhile
+        self.compaction = threading.Thread(
+            target=self.write_snapshot, args=(None if source else ledger.copy(), sequence, source), daemon=True
+        )
+        self.compaction.start()
+
+    def write_snapshot(self, ledger, sequence, source=None):
+        """Write a snapshot atomically, then drop the journals it covers"""
+        with self.snapshot_lock:
+            # A newer snapshot may already have been written
+            if sequence <= self.snapshot_sequence:
+                return
+
+            temp_path = self.path(SNAPSHOT_NAME + ".tmp")
+            with open(temp_path, 'w') as file:
+                # Stream the records compactly instead of building them all first
+                if source:
+                    json.dump({"version": SNAPSHOT_VERSION, "sequence": sequence, "source": source}, file)
+                else:
+                    write_json({
+                        "version": SNAPSHOT_VERSION,
+                        "sequence": sequence,
+                        "transactions": ledger
+                    }, file, compact=True)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temp_path, self.path(SNAPSHOT_NAME))
+            fsync_directory(self.directory)
+            self.snapshot_sequence = sequence
+
+            # Rotated journals up to this sequence are now redundant
+            for journal_path in glob.glob(self.path("journal-*.jsonl")):
+                name = os.path.basename(journal_path)
+                if int(name[len("journal-"):-len(".jsonl")]) <= sequence:
+                    os.remove(journal_path)
+
+    def close(self):
+        """Sync the journal and wait for a running compaction"""
+        self.sync()
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+        if self.compaction is not None:
+            self.compaction.join()
+
+
+class JournalRecovery(BatchLoader):
+    """Recovers the last session from a journal on a worker thread
+
+    The recovered ledger is handed to the UI as one batch, so the window
+    is usable while the snapshot is read and the journal tail replayed.
+    The journal must not be appended to until recovery has finished.
+    """
+
+    def __init__(self, journal):
+        """
+        Args:
+            journal (Journal): Journal to recover
+        """
+        super().__init__(max_pending=1)
+        self.journal = journal
+        self.total_work = 1
+
+    def run(self):
+        """Recover the ledger and queue it (runs on the worker thread)"""
+        ledger = self.journal.recover()
+        self.work_done = 1
+        if ledger:
+            self.put(ledger)
+
+    def progress_text(self, loaded):
+        """Describe the progress for a status label"""
+        if loaded:
+            return f"Restored {loaded:,} rows from the last session..."
+        return "Restoring the last session..."
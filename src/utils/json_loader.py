@@ -0,0 +1,76 @@
+import json
+import os
+from src.utils.batch_loader import BatchLoader
+from src.utils.ledger import Ledger
+
+class JsonLoader(BatchLoader):
+    """
+    Reads a saved JSON file on a worker thread and hands it over in batches
+
+    The file is read, parsed and packed into ledger columns off the Tk
+    thread, which is the slow part of loading a large file. Everything
+    saved next to the transactions (e.g. saved_date) is kept in metadata
+    once the file is parsed.
+    """
+
+    def __init__(self, file_path, batch_size=20000, max_pending=4, chunk_size=1048576):
+        """
+        Args:
+            file_path (str): JSON file to load
+            batch_size (int): Number of rows in each batch
+            max_pending (int): Batches allowed to wait in the queue before loading pauses
+            chunk_size (int): Bytes read at a time, between progress updates
+        """
+        super().__init__(max_pending)
+        self.file_path = file_path
+        self.batch_size = batch_size
+        self.chunk_size = chunk_size
+
+        # Progress is measured in bytes of the file
+        self.total_work = os.path.getsize(file_path)
+
+        # The saved data other than the transactions
+        self.metadata = {}
+
+        # (row number, reason) of every transaction that couldn't be read
+        self.skipped = []
+
+    def read_text(self):
+        """Read the file a chunk at a time, or None if cancelled"""
+        chunks = []
+        with open(self.file_path, 'rb') as file:
+            for chunk in iter(lambda: file.read(self.chunk_size), b""):
+                if self.cancelled.is_set():
+                    return None
+                chunks.append(chunk)
+                self.work_done += len(chunk)
+        return b"".join(chunks).decode('utf-8-sig')
+
+    def run(self):
+        """Parse the file, then queue the transactions in batches (runs on the worker thread)"""
+        text = self.read_text()
+        if text is None:
+            return
+        try:
+            data = json.loads(text)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"The selected file is not a valid JSON file ({e})") from e
+        del text
+
+        records = data.pop("transactions", [])
+        self.metadata = data
+        ledger = Ledger.from_rows(records, self.skipped)
+        del records
+        for start in range(0, len(ledger), self.batch_size):
+            batch = Ledger()
+            batch.extend_ledger(ledger, start, start + self.batch_size)
+            if not self.put(batch):
+                return
+
+    def progress_text(self, loaded):
+        """Describe the progress in megabytes read, then in rows"""
+        if loaded:
+            return f"Loaded {loaded:,} transactions..."
+        megabytes_read = self.work_done / 1048576
+        total_megabytes = self.total_work / 1048576
+        return f"Read {megabytes_read:,.1f} of {total_megabytes:,.1f} MB..."
@@ -0,0 +1,210 @@
+"""
+Streaming JSON writer for financial data
+
+The output is the same as json.dump(data, file, indent=4), or with compact
+separators and no indentation, but the transactions are encoded straight
+from the ledger columns a chunk at a time. A large ledger is never held as
+one list of dicts or one string, and a background save can report
+progress and be cancelled between chunks.
+"""
+import json
+import math
+import os
+import threading
+from json.encoder import encode_basestring_ascii
+from src.utils.dates import format_date
+
+INDENT = 4
+
+# Fields of a transaction record, in the order Ledger.record() gives them
+RECORD_FIELDS = ("date", "description", "amount", "type", "category")
+
+def fsync_directory(directory):
+    """Make a rename inside a directory durable (no-op where unsupported)"""
+    if hasattr(os, 'O_DIRECTORY'):
+        descriptor = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(descriptor)
+        finally:
+            os.close(descriptor)
+
+def encode_float(value):
+    """Encode an amount the way json.dumps does"""
+    if math.isfinite(value):
+        return float.__repr__(value)
+    return json.dumps(value)
+
+def write_json(data, file, compact=False, chunk_size=5000, progress=None, cancelled=None):
+    """
+    Stream financial data to a text stream as JSON
+
+    Args:
+        data (dict): The financial data, with a Ledger under "transactions"
+        file: Writable text stream
+        compact (bool): Leave out indentation and the spaces after separators
+        chunk_size (int): Number of transactions encoded per write
+        progress (callable): Called with the number of transactions written so far
+        cancelled (threading.Event): Stops writing between chunks when set
+
+    Returns:
+        bool: False if writing was cancelled
+    """
+    if compact:
+        encoder = json.JSONEncoder(separators=(',', ':'))
+        key_separator = ':'
+        newlines = ("", "", "", "")
+    else:
+        encoder = json.JSONEncoder(indent=INDENT)
+        key_separator = ': '
+        newlines = tuple("\n" + " " * (INDENT * level) for level in range(4))
+
+    # Records all have the same shape, so fill in one template per row
+    template = "{" + ",".join(
+        f"{newlines[3]}\"{field}\"{key_separator}%s" for field in RECORD_FIELDS
+    ) + newlines[2] + "}"
+    row_separator = "," + newlines[2]
+
+    if not data:
+        file.write("{}")
+        return True
+
+    file.write("{")
+    for position, (key, value) in enumerate(data.items()):
+        file.write(("," if position else "") + newlines[1] + encode_basestring_ascii(key) + key_separator)
+        if key != "transactions":
+            # Nested values only need their lines indented one level
+            file.write(encoder.encode(value).replace("\n", newlines[1]))
+            continue
+
+        ledger = value
+        if not len(ledger):
+            file.write("[]")
+            continue
+
+        type_names = [encode_basestring_ascii(name) for name in ledger.TYPES]
+        category_names = [encode_basestring_ascii(name) for name in ledger.category_names]
+        file.write("[" + newlines[2])
+        for start in range(0, len(ledger), chunk_size):
+            if cancelled is not None and cancelled.is_set():
+                return False
+            stop = min(start + chunk_size, len(ledger))
+            rows = zip(
+                ledger.dates[start:stop], ledger.descriptions[start:stop],
+                ledger.amounts[start:stop], ledger.types[start:stop],
+                ledger.categories[start:stop]
+            )
+            chunk = row_separator.join([
+                template % (
+                    encode_basestring_ascii(format_date(date)), encode_basestring_ascii(description),
+                    encode_float(amount), type_names[type_code], category_names[category]
+                )
+                for date, description, amount, type_code, category in rows
+            ])
+            file.write((row_separator if start else "") + chunk)
+            if progress is not None:
+                progress(stop)
+        file.write(newlines[1] + "]")
+
+    file.write(newlines[0] + "}")
+    return True
+
+def save_json_file(data, path, compact=False, chunk_size=5000, progress=None, cancelled=None):
+    """
+    Write financial data to a JSON file atomically
+
+    The data is streamed into a temporary file next to the target, which is
+    fsynced and then renamed over it, so a crash or error leaves either the
+    old file or the complete new one.
+
+    Args:
+        data (dict): The financial data, with a Ledger under "transactions"
+        path (str): JSON file path
+        compact (bool): Leave out indentation and the spaces after separators
+        chunk_size (int): Number of transactions encoded per write
+        progress (callable): Called with the number of transactions written so far
+        cancelled (threading.Event): Stops writing when set, keeping the old file
+
+    Returns:
+        bool: False if writing was cancelled
+    """
+    temp_path = f"{path}.tmp"
+    try:
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            complete = write_json(data, file, compact, chunk_size, progress, cancelled)
+            if complete:
+                file.flush()
+                os.fsync(file.fileno())
+        if not complete:
+            os.remove(temp_path)
+            return False
+        os.replace(temp_path, path)
+        fsync_directory(os.path.dirname(os.path.abspath(path)))
+        return True
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+class JsonWriter:
+    """
+    Saves financial data to a JSON file on a worker thread
+
+    The ledger is copied when the writer is created, so the UI can keep
+    changing it while the file is written. Like BatchLoader, the UI polls
+    finished, error and progress() instead of being called back from the
+    worker thread.
+    """
+
+    def __init__(self, data, path, compact=False, chunk_size=5000):
+        """
+        Args:
+            data (dict): The financial data, with a Ledger under "transactions"
+            path (str): JSON file path
+            compact (bool): Leave out indentation and the spaces after separators
+            chunk_size (int): Number of transactions encoded per write
+        """
+        self.data = dict(data, transactions=data["transactions"].copy())
+        self.path = path
+        self.compact = compact
+        self.chunk_size = chunk_size
+        self.cancelled = threading.Event()
+        self.finished = False
+        self.error = None
+
+        # Progress counters, written by the worker and read by the UI
+        self.total_rows = len(self.data["transactions"])
+        self.rows_written = 0
+
+        self.thread = threading.Thread(target=self.work, daemon=True)
+
+    def start(self):
+        """Start writing on the worker thread"""
+        self.thread.start()
+        return self
+
+    def cancel(self):
+        """Stop writing as soon as possible, keeping the existing file"""
+        self.cancelled.set()
+
+    def wait(self):
+        """Block until the file is written"""
+        self.thread.join()
+
+    def work(self):
+        """Write the file and record how it ended (runs on the worker thread)"""
+        try:
+            save_json_file(self.data, self.path, self.compact, self.chunk_size,
+                           self.set_progress, self.cancelled)
+        except Exception as e:
+            self.error = str(e)
+        finally:
+            self.finished = True
+
+    def set_progress(self, rows_written):
+        """Record how many transactions are written (runs on the worker thread)"""
+        self.rows_written = rows_written
+
+    def progress(self):
+        """Get (rows_written, total_rows) for a progress display"""
+        return self.rows_written, self.total_rows
@@ -0,0 +1,381 @@
+import copy
+import operator
+import sys
+from array import array
+from itertools import islice
+from src.utils.dates import format_date, parse_date, slash_dates_day_first
+
+class Ledger:
+    """Column-oriented transaction store shared by the GUI, charts and file I/O"""
+
+    # Transaction types are stored as small integer codes
+    TYPES = ("Income", "Expense")
+    INCOME = 0
+    EXPENSE = 1
+
+    # Label of the empty category, which is always code 0
+    UNCATEGORIZED = "Uncategorized"
+
+    def __init__(self, transactions=None):
+        # One column per transaction field; dates are timestamps (see dates.py)
+        self.dates = array('q')
+        self.descriptions = []
+        self.amounts = array('d')
+        self.types = array('b')
+
+        # Categories are dictionary-encoded: a code per row into the distinct names
+        self.categories = array('I')
+        self.category_names = [""]
+        self.category_ids = {"": 0}
+
+        # Derived structures kept up to date on every change, by name
+        self.indexes = {}
+
+        # Indexes still owed rows after replace(): name -> first row not yet
+        # passed on, up to deferred_stop (see catch_up())
+        self.deferred = {}
+        self.deferred_stop = 0
+
+        if transactions:
+            self.extend(transactions)
+
+    def __len__(self):
+        return len(self.amounts)
+
+    def __iter__(self):
+        return self.records()
+
+    @classmethod
+    def type_code(cls, type_name):
+        """Map a transaction type name to its column code"""
+        # Anything that isn't income counts as an expense, as before
+        return cls.INCOME if type_name == "Income" else cls.EXPENSE
+
+    def category_code(self, name):
+        """Get the code of a category name, adding it to the dictionary if it is new"""
+        name = str(name or "").strip()
+        code = self.category_ids.get(name)
+        if code is None:
+            code = self.category_ids[name] = len(self.category_names)
+            self.category_names.append(sys.intern(name))
+        return code
+
+    def category_label(self, code):
+        """Get the display name of a category code"""
+        return self.category_names[code] or self.UNCATEGORIZED
+
+    def attach(self, name, index):
+        """
+        Attach a derived index that is updated on every change
+
+        Indexes implement on_append(ledger, start, stop), on_remove(ledger, index)
+        (called before the row is removed) and on_reset(ledger).
+
+        Args:
+            name (str): Name the index is stored under in ledger.indexes
+            index: The index object
+
+        Returns:
+            The attached index, already built for the current rows
+        """
+        self.indexes[name] = index
+        index.on_reset(self)
+        return index
+
+    def notify_append(self, start, stop):
+        """Tell every index about newly appended rows"""
+        if stop > start:
+            for index in self.indexes.values():
+                index.on_append(self, start, stop)
+
+    def notify_reset(self):
+        """Tell every index that the rows were replaced wholesale"""
+        self.deferred = {}
+        for index in self.indexes.values():
+            index.on_reset(self)
+
+    def catch_up(self, limit=None):
+        """
+        Pass the rows taken over by replace() to the indexes it deferred
+
+        Args:
+            limit (int): Most rows to pass on in this step, or None for all
+
+        Returns:
+            bool: True once every index has every row
+        """
+        if not self.deferred:
+            return True
+        stop = self.deferred_stop
+
+        # Each index keeps its own position, so a step that raises can be
+        # retried without passing rows twice to the indexes that took them
+        for name, start in list(self.deferred.items()):
+            end = stop if limit is None else min(stop, start + limit)
+            self.indexes[name].on_append(self, start, end)
+            if end == stop:
+                del self.deferred[name]
+            else:
+                self.deferred[name] = end
+        return not self.deferred
+
+    def append_row(self, transaction, date=None):
+        """
+        Append a transaction to the columns without notifying indexes
+
+        Every value is converted before any column changes, so a bad value
+        raises with the ledger left as it was.
+
+        Args:
+            transaction (dict): Transaction with date, description, amount and type
+            date (int): Timestamp to store instead of parsing transaction['date']
+        """
+        stamp = parse_date(transaction['date']) if date is None else date
+        description = sys.intern(str(transaction['description']))
+        amount = float(transaction['amount'])
+        type_code = self.type_code(transaction['type'])
+        self.dates.append(stamp)
+        self.descriptions.append(description)
+        self.amounts.append(amount)
+        self.types.append(type_code)
+        self.categories.append(self.category_code(transaction.get('category')))
+
+    @classmethod
+    def from_rows(cls, rows, skipped=None, day_first=None, first_number=1):
+        """
+        Build a ledger from the rows of one file, leaving out rows that can't be read
+
+        Dates are kept as text until every row is read, then each distinct
+        one is parsed once, so ambiguous n/n/yyyy dates follow the order the
+        rest of the rows show (see dates.slash_dates_day_first).
+
+        Args:
+            rows: Iterable of dicts with date, description, amount, type and category
+            skipped (list): Collects a (row number, reason) pair for each row left out
+            day_first (bool): Read ambiguous dates day first or month first, or None to follow the rows
+            first_number (int): Row number of the first row, for rows from the middle of a file
+
+        Returns:
+            Ledger: The rows that could be read, in order
+        """
+        ledger = cls()
+        first_skipped = len(skipped) if skipped is not None else 0
+        texts = []  # Date text of every row kept so far
+        numbers = []  # Row number of every row kept so far
+        for number, row in enumerate(rows, first_number):
+            try:
+                text = sys.intern(str(row['date']).strip())
+                ledger.append_row(row, date=0)
+            except KeyError as e:
+                cls.skip_row(skipped, number, f"Missing field {e}")
+                continue
+            except (TypeError, ValueError) as e:
+                cls.skip_row(skipped, number, str(e))
+                continue
+            texts.append(text)
+            numbers.append(number)
+
+        # Parse each distinct date once, in the order the file uses
+        distinct = set(texts)
+        if day_first is None:
+            day_first = slash_dates_day_first(distinct)
+        stamps = {}
+        errors = {}
+        for text in distinct:
+            try:
+                stamps[text] = parse_date(text, day_first)
+            except ValueError as e:
+                errors[text] = str(e)
+
+        if not errors:
+            ledger.dates = array('q', map(stamps.__getitem__, texts))
+            return ledger
+
+        kept = []
+        for row, text in enumerate(texts):
+            if text in errors:
+                cls.skip_row(skipped, numbers[row], errors[text])
+            else:
+                kept.append(row)
+
+        # Report this file's rows in file order, bad dates among the rest
+        if skipped is not None:
+            skipped[first_skipped:] = sorted(skipped[first_skipped:], key=operator.itemgetter(0))
+        ledger.dates = array('q', [stamps.get(text, 0) for text in texts])
+        return ledger.take(kept)
+
+    @staticmethod
+    def skip_row(skipped, number, reason):
+        """Record a row left out of a ledger, if the caller collects them"""
+        if skipped is not None:
+            skipped.append((number, reason))
+
+    def append(self, transaction):
+        """
+        Append a transaction to the ledger
+
+        Args:
+            transaction (dict): Transaction with date, description, amount and type
+
+        Returns:
+            int: Row index of the new transaction
+        """
+        self.catch_up()
+        self.append_row(transaction)
+        index = len(self.amounts) - 1
+        self.notify_append(index, index + 1)
+        return index
+
+    def extend(self, transactions):
+        """Append every transaction from an iterable"""
+        self.catch_up()
+        start = len(self)
+        for transaction in transactions:
+            self.append_row(transaction)
+        self.notify_append(start, len(self))
+
+    def extend_ledger(self, other, start=0, stop=None):
+        """Append a slice of rows from another ledger column by column"""
+        if stop is None or stop > len(other):
+            stop = len(other)
+        self.catch_up()
+        first_row = len(self)
+        self.dates.extend(other.dates[start:stop])
+        self.descriptions.extend(other.descriptions[start:stop])
+        self.amounts.extend(other.amounts[start:stop])
+        self.types.extend(other.types[start:stop])
+
+        # Translate the other ledger's category codes into this dictionary
+        mapping = [self.category_code(name) for name in other.category_names]
+        if mapping == list(range(len(mapping))):
+            self.categories.extend(other.categories[start:stop])
+        else:
+            self.categories.extend(map(mapping.__getitem__, other.categories[start:stop]))
+        self.notify_append(first_row, len(self))
+
+    def remove(self, index):
+        """Remove a single row"""
+        self.catch_up()
+        for derived in self.indexes.values():
+            derived.on_remove(self, index)
+
+        del self.dates[index]
+        del self.descriptions[index]
+        del self.amounts[index]
+        del self.types[index]
+        del self.categories[index]
+
+    def clear(self):
+        """Remove all transactions"""
+        self.dates = array('q')
+        self.descriptions = []
+        self.amounts = array('d')
+        self.types = array('b')
+        self.categories = array('I')
+        self.category_names = [""]
+        self.category_ids = {"": 0}
+        self.notify_reset()
+
+    def replace(self, other, deferred=()):
+        """
+        Take over the columns of another ledger without copying them
+
+        Indexes named in deferred start out empty instead of being rebuilt
+        now: catch_up() passes them the rows in steps, and any change to
+        the ledger finishes it first, so they are exact before they move on.
+
+        Args:
+            other (Ledger): Ledger whose columns to take over
+            deferred (tuple): Names of attached indexes to build later
+        """
+        self.dates = other.dates
+        self.descriptions = other.descriptions
+        self.amounts = other.amounts
+        self.types = other.types
+        self.categories = other.categories
+        self.category_names = other.category_names
+        self.category_ids = other.category_ids
+        self.deferred = {}
+        for name, index in self.indexes.items():
+            index.on_reset(None if name in deferred else self)
+        self.deferred = {name: 0 for name in deferred if name in self.indexes}
+        self.deferred_stop = len(self)
+
+    def copy(self):
+        """Copy the rows into a new ledger, without its indexes"""
+        other = Ledger()
+        other.dates = copy.copy(self.dates)
+        other.descriptions = copy.copy(self.descriptions)
+        other.amounts = copy.copy(self.amounts)
+        other.types = copy.copy(self.types)
+        other.categories = copy.copy(self.categories)
+        other.category_names = list(self.category_names)
+        other.category_ids = dict(self.category_ids)
+        return other
+
+    def take(self, rows):
+        """Build a ledger with some of the rows, in the given order, without indexes"""
+        other = Ledger()
+        other.dates = array('q', map(self.dates.__getitem__, rows))
+        other.descriptions = list(map(self.descriptions.__getitem__, rows))
+        other.amounts = array('d', map(self.amounts.__getitem__, rows))
+        other.types = array('b', map(self.types.__getitem__, rows))
+        other.categories = array('I', map(self.categories.__getitem__, rows))
+        other.category_names = list(self.category_names)
+        other.category_ids = dict(self.category_ids)
+        return other
+
+    def sort_by_date(self, start=0, deferred=()):
+        """
+        Put rows start.. in date order, equal dates keeping their order
+
+        If any row moves, the indexes are rebuilt as by replace(), so the
+        ones named in deferred take the rows through catch_up().
+
+        Args:
+            start (int): First row to sort; the rows before it stay in place
+            deferred (tuple): Names of attached indexes to build later
+
+        Returns:
+            bool: True if any row moved
+        """
+        self.catch_up()
+        dates = self.dates
+        if all(map(operator.le, islice(dates, start, None), islice(dates, start + 1, None))):
+            return False
+        rows = list(range(start))
+        rows.extend(sorted(range(start, len(dates)), key=dates.__getitem__))
+        self.replace(self.take(rows), deferred)
+        return True
+
+    def sorted_by_date(self):
+        """Get the rows in date order (equal dates keep their order), or this ledger if already sorted"""
+        dates = self.dates
+        if all(map(operator.le, dates, islice(dates, 1, None))):
+            return self
+        return self.take(sorted(range(len(dates)), key=dates.__getitem__))
+
+    def type_name(self, index):
+        """Get the type name of a row"""
+        return self.TYPES[self.types[index]]
+
+    def category_name(self, index):
+        """Get the category of a row, empty when uncategorized"""
+        return self.category_names[self.categories[index]]
+
+    def record(self, index):
+        """Build a transaction dictionary for a single row"""
+        return {
+            'date': format_date(self.dates[index]),
+            'description': self.descriptions[index],
+            'amount': self.amounts[index],
+            'type': self.TYPES[self.types[index]],
+            'category': self.category_names[self.categories[index]]
+        }
+
+    def records(self, start=0, stop=None):
+        """Yield transaction dictionaries for a range of rows"""
+        if stop is None or stop > len(self):
+            stop = len(self)
+        for index in range(max(start, 0), stop):
+            yield self.record(index)
@@ -0,0 +1,225 @@
+import csv
+import json
+import os
+from contextlib import contextmanager
+from src.utils import binary_ledger
+from src.utils.json_writer import save_json_file, write_json
+from src.utils.ledger import Ledger
+from src.utils.sqlite_store import SqliteStore
+
+CSV_HEADERS = ["date", "description", "amount", "type", "category"]
+
+def describe_skipped(skipped, limit=3):
+    """
+    Describe the rows left out of a load for a message
+
+    Args:
+        skipped (list): (row number or location, reason) pairs
+        limit (int): Most rows to list
+
+    Returns:
+        str: A summary naming the first rows, or "" when nothing was skipped
+    """
+    if not skipped:
+        return ""
+    listed = "; ".join(
+        f"{f'row {where}' if isinstance(where, int) else where}: {reason}" for where, reason in skipped[:limit]
+    )
+    more = f"; and {len(skipped) - limit:,} more" if len(skipped) > limit else ""
+    return f"{len(skipped):,} rows could not be read and were skipped ({listed}{more})"
+
+@contextmanager
+def open_target(target, mode, **options):
+    """Open a path, or pass an already open stream through without closing it"""
+    if hasattr(target, 'read') or hasattr(target, 'write'):
+        yield target
+    else:
+        with open(target, mode, **options) as file:
+            yield file
+
+
+class LedgerIO:
+    """Dialog-free ledger I/O on paths and streams; errors are raised to the caller"""
+
+    @staticmethod
+    def save_json(data, target, compact=False):
+        """
+        Write financial data as JSON, streaming the transactions
+
+        Args:
+            data (dict): The financial data, with a Ledger under "transactions"
+            target: Path or writable text stream
+            compact (bool): Leave out indentation and the spaces after separators
+        """
+        if hasattr(target, 'write'):
+            write_json(data, target, compact)
+            return
+
+        # A path is replaced atomically once the new file is complete
+        save_json_file(data, target, compact)
+
+    @staticmethod
+    def load_json(source, skipped=None):
+        """
+        Read financial data from JSON
+
+        Args:
+            source: Path or readable text stream
+            skipped (list): Collects (row number, reason) for transactions that can't be read
+
+        Returns:
+            dict: The financial data, with the transactions as a Ledger
+        """
+        with open_target(source, 'r') as file:
+            data = json.load(file)
+
+        # Pack the transaction records into columns
+        data["transactions"] = Ledger.from_rows(data.get("transactions", []), skipped)
+        return data
+
+    @staticmethod
+    def save_binary(data, target):
+        """
+        Write financial data as a binary ledger snapshot (.ledger)
+
+        A path is written to a temporary file that then replaces it. Windows
+        won't replace a file that is memory-mapped, and a mapped ledger keeps
+        its file mapped while it is in use, so there saving over the file
+        that is open fails with PermissionError and the file is left as it was.
+
+        Args:
+            data (dict): The financial data, with a Ledger under "transactions"
+            target: Path or writable binary stream
+        """
+        if hasattr(target, 'write'):
+            binary_ledger.write_ledger(data, target)
+            return
+
+        # Replace the file in one step, since it may be memory-mapped by a lazy load
+        temp_path = f"{target}.tmp"
+        with open(temp_path, 'wb') as file:
+            binary_ledger.write_ledger(data, file)
+        try:
+            os.replace(temp_path, target)
+        except PermissionError as e:
+            os.remove(temp_path)
+            raise PermissionError(
+                f"{target} is in use, possibly as the open ledger; save it under another name"
+            ) from e
+
+    @staticmethod
+    def load_binary(source):
+        """
+        Read financial data from a binary ledger snapshot (.ledger)
+
+        Args:
+            source: Path or readable binary stream
+
+        Returns:
+            dict: The financial data, with the transactions as a Ledger
+        """
+        with open_target(source, 'rb') as file:
+            return binary_ledger.read_ledger(file)
+
+    @staticmethod
+    def map_binary(path):
+        """
+        Open a binary ledger snapshot (.ledger) lazily, decoding rows on demand
+
+        Args:
+            path (str): Ledger file path
+
+        Returns:
+            dict: The financial data, with the transactions as a Ledger of memory-mapped columns
+        """
+        return binary_ledger.map_ledger(path)
+
+    @staticmethod
+    def export_csv(ledger, target):
+        """
+        Write a ledger as CSV
+
+        Args:
+            ledger (Ledger): Transactions to write
+            target: Path or writable text stream
+        """
+        with open_target(target, 'w', newline='') as file:
+            writer = csv.DictWriter(file, fieldnames=CSV_HEADERS)
+            writer.writeheader()
+            for transaction in ledger.records():
+                writer.writerow(transaction)
+
+    @staticmethod
+    def import_csv(source, skipped=None):
+        """
+        Read a ledger from CSV
+
+        Args:
+            source: Path or readable text stream
+            skipped (list): Collects (row number, reason) for rows that can't be read
+
+        Returns:
+            Ledger: The imported transactions
+        """
+        # Read data straight into the ledger columns
+        with open_target(source, 'r', newline='', encoding='utf-8-sig') as file:
+            return Ledger.from_rows(csv.DictReader(file), skipped)
+
+    @staticmethod
+    def file_format(path):
+        """Get the ledger format of a path from its extension"""
+        extension = os.path.splitext(str(path))[1].lower()
+        if extension == ".csv":
+            return "csv"
+        if extension == ".json":
+            return "json"
+        if extension in (".db", ".sqlite"):
+            return "sqlite"
+        if extension == ".ledger":
+            return "binary"
+        raise ValueError(f"Unsupported ledger file type: {path}")
+
+    @staticmethod
+    def load(path, skipped=None):
+        """
+        Load any supported ledger file, chosen by extension
+
+        Args:
+            path (str): Ledger file path
+            skipped (list): Collects (row number, reason) for CSV and JSON rows that can't be read
+
+        Returns:
+            dict: The financial data, with the transactions as a Ledger
+        """
+        file_format = LedgerIO.file_format(path)
+        if file_format == "csv":
+            return {"transactions": LedgerIO.import_csv(path, skipped)}
+        if file_format == "sqlite":
+            store = SqliteStore(path)
+            try:
+                return {
+                    "transactions": store.read_ledger(),
+                    "saved_date": store.get_metadata("saved_date")
+                }
+            finally:
+                store.close()
+        if file_format == "binary":
+            return LedgerIO.load_binary(path)
+        return LedgerIO.load_json(path, skipped)
+
+    @staticmethod
+    def save(data, path, compact=False):
+        """Save financial data to any supported ledger file, chosen by extension (compact applies to JSON)"""
+        file_format = LedgerIO.file_format(path)
+        if file_format == "csv":
+            LedgerIO.export_csv(data["transactions"], path)
+        elif file_format == "sqlite":
+            store = SqliteStore(path)
+            try:
+                store.replace_all(data["transactions"], data.get("saved_date"))
+            finally:
+                store.close()
+        elif file_format == "binary":
+            LedgerIO.save_binary(data, path)
+        else:
+            LedgerIO.save_json(data, path, compact)
@@ -0,0 +1,155 @@
+import csv
+import heapq
+import multiprocessing
+import os
+import sys
+from array import array
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import repeat
+from src.utils.batch_loader import BatchLoader
+from src.utils.duplicates import drop_overlaps
+from src.utils.ledger import Ledger
+
+def parse_statement(path):
+    """
+    Parse one CSV statement into a ledger sorted by date (runs in a worker process)
+
+    Statements are often listed newest first, so the rows are put in date
+    order here, in parallel, and the merge only has to interleave them.
+
+    Args:
+        path (str): CSV file to parse
+
+    Returns:
+        tuple: (Ledger of the file's transactions in date order, ties in file
+        order; list of (row number, reason) for the rows that couldn't be read)
+    """
+    skipped = []
+    with open(path, 'r', newline='', encoding='utf-8-sig') as file:
+        ledger = Ledger.from_rows(csv.DictReader(file), skipped)
+    return ledger.sorted_by_date(), skipped
+
+def merge_by_date(ledgers):
+    """
+    K-way merge ledgers that are each in date order into one
+
+    Statements covering separate periods (the usual case) don't overlap,
+    so they are concatenated column by column in date order. Otherwise the
+    rows are interleaved through a heap of one cursor per ledger; equal
+    dates keep the order of the ledgers, then of their rows.
+
+    Args:
+        ledgers (list): Ledgers sorted by date
+
+    Returns:
+        Ledger: Every row, in date order
+    """
+    merged = Ledger()
+    ledgers = [ledger for ledger in ledgers if len(ledger)]
+    if not ledgers:
+        return merged
+
+    # Ordered by first date, so separate periods line up end to start
+    by_start = sorted(ledgers, key=lambda ledger: ledger.dates[0])
+    if all(earlier.dates[-1] <= later.dates[0] for earlier, later in zip(by_start, by_start[1:])):
+        for ledger in by_start:
+            merged.extend_ledger(ledger)
+        merged.descriptions[:] = map(sys.intern, merged.descriptions)
+        return merged
+
+    runs = [zip(ledger.dates, repeat(number), range(len(ledger))) for number, ledger in enumerate(ledgers)]
+    order = list(heapq.merge(*runs))
+
+    # Each ledger has its own category codes; translate them while gathering
+    mappings = [[merged.category_code(name) for name in ledger.category_names] for ledger in ledgers]
+    merged.dates = array('q', [stamp for stamp, _, _ in order])
+    merged.descriptions = [sys.intern(ledgers[number].descriptions[row]) for _, number, row in order]
+    merged.amounts = array('d', [ledgers[number].amounts[row] for _, number, row in order])
+    merged.types = array('b', [ledgers[number].types[row] for _, number, row in order])
+    merged.categories = array('I', [
+        mappings[number][ledgers[number].categories[row]] for _, number, row in order
+    ])
+    return merged
+
+
+class ParallelCsvImporter(BatchLoader):
+    """
+    Imports several CSV statements at once, one worker process per file
+
+    Files are parsed in a process pool, so parsing scales with the number
+    of cores. Rows a file repeats from an earlier one (overlapping
+    statements) are dropped, then the ledgers are merged by date and handed
+    to the UI as a single batch, which it loads in one bulk operation.
+    """
+
+    def __init__(self, file_paths, max_workers=None, skip_duplicates=True):
+        """
+        Args:
+            file_paths (list): CSV files to import
+            max_workers (int): Most worker processes, or None for one per core
+            skip_duplicates (bool): Drop rows an earlier file already has
+        """
+        super().__init__(max_pending=1)
+        self.file_paths = list(file_paths)
+        self.max_workers = max_workers or min(len(self.file_paths), os.cpu_count() or 1)
+
+        # Progress is measured in bytes of the files parsed so far
+        self.file_sizes = [os.path.getsize(path) for path in self.file_paths]
+        self.total_work = sum(self.file_sizes)
+        self.files_parsed = 0
+        self.merging = False
+        self.skip_duplicates = skip_duplicates
+        self.duplicates_skipped = 0
+
+        # ("file row number", reason) of every row that couldn't be read
+        self.skipped = []
+
+    def run(self):
+        """Parse the files in worker processes, then merge them (runs on the worker thread)"""
+        # A fresh interpreter per worker; forking would copy the Tk process and its threads
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+        ledgers = [None] * len(self.file_paths)
+        executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context)
+        pending = {}
+        try:
+            pending = {
+                executor.submit(parse_statement, path): number
+                for number, path in enumerate(self.file_paths)
+            }
+            while pending:
+                done, _ = wait(pending, timeout=0.1, return_when=FIRST_COMPLETED)
+                if self.cancelled.is_set():
+                    return
+                for future in done:
+                    number = pending.pop(future)
+                    name = os.path.basename(self.file_paths[number])
+                    try:
+                        ledgers[number], skipped = future.result()
+                    except Exception as e:
+                        raise ValueError(f"{name}: {e}") from e
+                    self.skipped.extend((f"{name} row {row}", reason) for row, reason in skipped)
+                    self.files_parsed += 1
+                    self.work_done += self.file_sizes[number]
+        finally:
+            # Drop files not started yet (shutdown's cancel_futures needs Python 3.9)
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=False)
+
+        self.merging = True
+        if self.skip_duplicates:
+            ledgers, self.duplicates_skipped = drop_overlaps(ledgers)
+        self.put(merge_by_date(ledgers))
+
+    def progress_text(self, loaded):
+        """Describe the progress in files, megabytes and rows"""
+        if loaded:
+            return f"Imported {loaded:,} rows from {len(self.file_paths)} files..."
+        if self.merging:
+            return f"Merging {len(self.file_paths)} files by date..."
+        megabytes_read = self.work_done / 1048576
+        total_megabytes = self.total_work / 1048576
+        return (f"Parsed {self.files_parsed} of {len(self.file_paths)} files "
+                f"({megabytes_read:,.1f} of {total_megabytes:,.1f} MB)...")
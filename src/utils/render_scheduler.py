@@ -0,0 +1,73 @@
+import time
+
+class RenderScheduler:
+    """Coalesces render requests into at most one render per frame budget"""
+
+    def __init__(self, widget, render, frame_ms=33, settle_ms=150):
+        """
+        Args:
+            widget: Tk widget used to schedule callbacks with after()
+            render (callable): Performs the actual render
+            frame_ms (int): Minimum time between two renders
+            settle_ms (int): Quiet time required after a settle request (e.g. resizing)
+        """
+        self.widget = widget
+        self.render = render
+        self.frame_ms = frame_ms
+        self.settle_ms = settle_ms
+
+        self.job = None
+        self.not_before = 0.0  # No render may start before this perf_counter time
+        self.last_render = None
+
+        # Counters for requested vs. performed renders
+        self.requested = 0
+        self.performed = 0
+
+    def request(self, settle=False):
+        """
+        Ask for a render, merging it with any render already pending
+
+        Args:
+            settle (bool): Postpone the render until requests stop for settle_ms
+        """
+        self.requested += 1
+        now = time.perf_counter()
+        if settle:
+            self.not_before = max(self.not_before, now + self.settle_ms / 1000)
+        if self.job is None:
+            self.schedule(now)
+
+    def schedule(self, now):
+        """Schedule the pending render for the earliest allowed time"""
+        due = self.not_before
+        if self.last_render is not None:
+            due = max(due, self.last_render + self.frame_ms / 1000)
+        delay = max(0, int((due - now) * 1000))
+        self.job = self.widget.after(delay, self.run)
+
+    def run(self):
+        """Perform the pending render, unless it was postponed meanwhile"""
+        self.job = None
+        now = time.perf_counter()
+        if now < self.not_before:
+            self.schedule(now)
+            return
+
+        self.last_render = now
+        self.performed += 1
+        self.render()
+
+    def cancel(self):
+        """Drop the pending render, if any"""
+        if self.job is not None:
+            self.widget.after_cancel(self.job)
+            self.job = None
+
+    def stats(self):
+        """Get the render counters"""
+        return {
+            "requested": self.requested,
+            "performed": self.performed,
+            "coalesced": self.requested - self.performed
+        }
@@ -0,0 +1,219 @@
+from array import array
+from bisect import bisect_left
+from itertools import compress
+
+# Queries at least this long are answered from the trigram postings
+TRIGRAM = 3
+
+# Results with more rows than this are found by scanning, as they are viewed
+BROAD_RESULT = 20000
+
+def normalize(text):
+    """Fold a description or query for case-insensitive matching"""
+    return text.casefold()
+
+
+class SearchIndex:
+    """
+    Trigram index over transaction descriptions, maintained as the ledger changes
+
+    Each distinct (case-folded) description is a key with a posting list of
+    the rows that use it, in row order. Every trigram of a key points back
+    to it, so a query only verifies the keys that contain all of its
+    trigrams instead of scanning every description.
+
+    Appended rows are indexed as they arrive. After a wholesale reset the
+    index is rebuilt on demand, in steps with catch_up, so opening a large
+    ledger doesn't wait for it.
+    """
+
+    def __init__(self):
+        self.on_reset(None)
+
+    def on_reset(self, ledger):
+        """Forget every row; they are indexed again by catch_up"""
+        self.ledger = ledger
+        self.indexed = 0  # Rows 0..indexed are in the index
+        self.key_ids = {}  # Case-folded description -> key id
+        self.keys = []  # Key id -> case-folded description
+        self.postings = []  # Key id -> ascending rows
+        self.trigrams = {}  # Trigram -> ascending key ids
+        self.row_keys = array('I')  # Row -> key id
+
+    def on_append(self, ledger, start, stop):
+        """Index appended rows, unless earlier rows are still waiting for catch_up"""
+        self.ledger = ledger
+        if start == self.indexed:
+            self.index_rows(start, stop)
+
+    def on_remove(self, ledger, index):
+        """Drop a row that is about to be removed and shift the rows after it"""
+        if index >= self.indexed:
+            return
+        key_id = self.row_keys[index]
+        posting = self.postings[key_id]
+        del posting[bisect_left(posting, index)]
+        del self.row_keys[index]
+        self.indexed -= 1
+
+        # Rows after the removed one move up by one (O(rows), like the removal itself)
+        for posting in self.postings:
+            position = bisect_left(posting, index)
+            if position < len(posting):
+                posting[position:] = array('I', [row - 1 for row in posting[position:]])
+
+    def pending(self):
+        """Number of ledger rows not indexed yet"""
+        return len(self.ledger) - self.indexed if self.ledger is not None else 0
+
+    def catch_up(self, limit=None):
+        """
+        Index rows that arrived while the index was behind
+
+        Args:
+            limit (int): Most rows to index in this step, or None for all
+
+        Returns:
+            bool: True if every row is indexed
+        """
+        stop = len(self.ledger) if self.ledger is not None else 0
+        if limit is not None:
+            stop = min(stop, self.indexed + limit)
+        self.index_rows(self.indexed, stop)
+        return self.pending() == 0
+
+    def index_rows(self, start, stop):
+        """Add rows start..stop, which follow the indexed rows"""
+        # Descriptions are interned, so fold each distinct one once per call
+        seen = {}
+        postings = self.postings
+        row_keys = []
+        for row, description in enumerate(self.ledger.descriptions[start:stop], start):
+            key_id = seen.get(description)
+            if key_id is None:
+                key_id = seen[description] = self.key_id(normalize(description))
+            postings[key_id].append(row)
+            row_keys.append(key_id)
+        self.row_keys.extend(row_keys)
+        self.indexed = max(self.indexed, stop)
+
+    def key_id(self, key):
+        """Get the id of a description key, adding it to the index if it is new"""
+        key_id = self.key_ids.get(key)
+        if key_id is None:
+            key_id = self.key_ids[key] = len(self.keys)
+            self.keys.append(key)
+            self.postings.append(array('I'))
+            for trigram in {key[i:i + TRIGRAM] for i in range(len(key) - TRIGRAM + 1)}:
+                posting = self.trigrams.get(trigram)
+                if posting is None:
+                    posting = self.trigrams[trigram] = array('I')
+                posting.append(key_id)
+        return key_id
+
+    def matching_keys(self, query):
+        """Get the ids of every key containing a normalized query"""
+        if len(query) < TRIGRAM:
+            # Too short for trigrams; distinct keys are still far fewer than rows
+            candidates = range(len(self.keys))
+        else:
+            postings = sorted(
+                (self.trigrams.get(query[i:i + TRIGRAM], ()) for i in range(len(query) - TRIGRAM + 1)),
+                key=len
+            )
+            candidates = set(postings[0])
+            for posting in postings[1:]:
+                if not candidates:
+                    break
+                candidates.intersection_update(posting)
+
+        # Trigrams can match out of order, so confirm the substring
+        keys = self.keys
+        return [key_id for key_id in candidates if query in keys[key_id]]
+
+    def search(self, query, ordering=None):
+        """
+        Find the rows whose description contains a query, ignoring case
+
+        Args:
+            query (str): Text to look for
+            ordering (SortOrder): Order to return the rows in, or None for ledger order
+
+        Returns:
+            Sequence of matching row indexes: a list, or a SearchMatches
+            that finds broad results as they are read
+        """
+        self.catch_up()
+        matched = self.matching_keys(normalize(query))
+        count = sum(len(self.postings[key_id]) for key_id in matched)
+        if count > BROAD_RESULT:
+            return SearchMatches(self, matched, count, ordering.rows if ordering else None)
+
+        rows = []
+        for key_id in matched:
+            rows.extend(self.postings[key_id])
+
+        # Each posting is already sorted, which the sort merges quickly
+        if len(matched) > 1:
+            rows.sort()
+        if ordering is not None:
+            ordering.sort(rows)
+        return rows
+
+    @staticmethod
+    def matches(description, query):
+        """Check a single description against a query, ignoring case"""
+        return normalize(query) in normalize(description)
+
+
+class SearchMatches:
+    """
+    Rows matching a broad search, found block by block as they are read
+
+    Sorting most of the ledger's rows on every keystroke would be slower
+    than scanning the row keys in the wanted order, so only the rows up to
+    the position read are materialized.
+    """
+
+    BLOCK = 16384
+
+    def __init__(self, index, key_ids, count, order=None):
+        """
+        Args:
+            index (SearchIndex): The index that was searched
+            key_ids (list): Ids of the matching keys
+            count (int): Number of matching rows
+            order (array): Every row in the order to scan, or None for ledger order
+        """
+        self.flags = bytearray(len(index.keys))
+        for key_id in key_ids:
+            self.flags[key_id] = 1
+        self.row_keys = index.row_keys
+        self.order = order
+        self.stop = index.indexed if order is None else len(order)
+        self.count = count
+        self.rows = []
+        self.scanned = 0
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, position):
+        if position < 0:
+            position += self.count
+        while len(self.rows) <= position and self.scanned < self.stop:
+            self.scan()
+        return self.rows[position]
+
+    def scan(self):
+        """Find the matches in the next block of rows"""
+        start = self.scanned
+        stop = min(start + self.BLOCK, self.stop)
+        if self.order is None:
+            rows = range(start, stop)
+            keys = self.row_keys[start:stop]
+        else:
+            rows = self.order[start:stop]
+            keys = map(self.row_keys.__getitem__, rows)
+        self.rows.extend(compress(rows, bytes(map(self.flags.__getitem__, keys))))
+        self.scanned = stop
@@ -0,0 +1,204 @@
+from array import array
+from src.utils.search_index import normalize
+
+# Appends larger than this drop the sort orders instead of inserting row by row
+INSERT_LIMIT = 64
+
+def insert_row(rows, row, key):
+    """
+    Insert a row after every row whose sort value is not larger (insort_right with a key)
+
+    bisect only takes a key from Python 3.10, so the search is done here.
+
+    Args:
+        rows (array): Rows in ascending order of key
+        row (int): Row to insert
+        key (callable): Sort value of a row
+    """
+    value = key(row)
+    low, high = 0, len(rows)
+    while low < high:
+        middle = (low + high) // 2
+        if value < key(rows[middle]):
+            high = middle
+        else:
+            low = middle + 1
+    rows.insert(low, row)
+
+
+class SortIndex:
+    """
+    Row permutations that sort the ledger by each transaction list column
+
+    A column's permutation is built the first time the list sorts by it
+    and then kept up to date: single appended rows are inserted in place
+    (ties keep ledger order), so switching the sort is immediate. Bulk
+    loads and removals drop the permutations until they are needed again.
+    """
+
+    COLUMNS = ("date", "description", "category", "type", "amount")
+
+    def __init__(self):
+        self.on_reset(None)
+
+    def on_reset(self, ledger):
+        """Forget every permutation; they are rebuilt on demand"""
+        self.ledger = ledger
+        self.orders = {}  # Column -> rows in ascending order
+
+    def on_append(self, ledger, start, stop):
+        """Insert appended rows into the permutations that are built"""
+        self.ledger = ledger
+        if stop - start > INSERT_LIMIT:
+            # One sort is much cheaper than many list insertions
+            self.orders.clear()
+            return
+        for column, rows in self.orders.items():
+            key = self.key(column)
+            for row in range(start, stop):
+                insert_row(rows, row, key)
+
+    def on_remove(self, ledger, index):
+        """Drop the permutations, since every later row is about to shift"""
+        self.orders.clear()
+
+    def key(self, column):
+        """Get a function giving the sort value of a row in a column"""
+        ledger = self.ledger
+        if column == "date":
+            return ledger.dates.__getitem__
+        if column == "description":
+            return lambda row: normalize(ledger.descriptions[row])
+        if column == "category":
+            return lambda row: normalize(ledger.category_label(ledger.categories[row]))
+        if column == "type":
+            return lambda row: ledger.TYPES[ledger.types[row]]
+        if column == "amount":
+            return lambda row: ledger.amounts[row]
+        raise ValueError(f"Unknown sort column: {column}")
+
+    def values(self, column):
+        """Get the sort value of every row in a column, in bulk"""
+        ledger = self.ledger
+        if column == "date":
+            return ledger.dates[0:len(ledger)]
+        if column == "amount":
+            return ledger.amounts[0:len(ledger)]
+        if column == "type":
+            names = ledger.TYPES
+            return [names[code] for code in ledger.types[0:len(ledger)]]
+        if column == "category":
+            # Fold each distinct category once, then look rows up by code
+            folded = [normalize(ledger.category_label(code)) for code in range(len(ledger.category_names))]
+            return [folded[code] for code in ledger.categories[0:len(ledger)]]
+
+        if column != "description":
+            raise ValueError(f"Unknown sort column: {column}")
+
+        # Rows share description strings, so fold each distinct one once
+        folded = {}
+        values = []
+        for description in ledger.descriptions[0:len(ledger)]:
+            value = folded.get(description)
+            if value is None:
+                value = folded[description] = normalize(description)
+            values.append(value)
+        return values
+
+    def rows(self, column):
+        """Get the rows sorted ascending by a column, building the permutation if needed"""
+        rows = self.orders.get(column)
+        if rows is None:
+            values = self.values(column)
+            # sorted is stable, so rows with equal values stay in ledger order
+            rows = self.orders[column] = array('I', sorted(range(len(values)), key=values.__getitem__))
+        return rows
+
+    def ordering(self, column, descending=False):
+        """
+        Get the sort of the ledger by a column
+
+        Args:
+            column (str): One of COLUMNS
+            descending (bool): Sort from the largest value down
+
+        Returns:
+            SortOrder: Every row in order, plus a way to sort any subset the same way
+        """
+        rows = self.rows(column)
+        return SortOrder(DescendingRows(rows) if descending else rows, self.key(column), descending)
+
+
+class DescendingRows:
+    """An ascending permutation read from the end, without copying it"""
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __getitem__(self, position):
+        size = len(self.rows)
+        if isinstance(position, slice):
+            start, stop, step = position.indices(size)
+            if step == 1:
+                return self.rows[size - max(stop, start):size - start][::-1]
+            return [self.rows[size - 1 - index] for index in range(start, stop, step)]
+        if position < 0:
+            position += size
+        if not 0 <= position < size:
+            raise IndexError("row position out of range")
+        return self.rows[size - 1 - position]
+
+
+class SortOrder:
+    """A sort of the ledger rows by one column"""
+
+    def __init__(self, rows, key, descending):
+        """
+        Args:
+            rows (array): Every ledger row in sorted order
+            key (callable): Sort value of a row
+            descending (bool): Whether rows runs from the largest value down
+        """
+        self.rows = rows
+        self.key = key
+        self.descending = descending
+
+    def sort(self, rows):
+        """Sort a list of ledger rows (in ledger order) the same way, in place"""
+        rows.sort(key=self.key)
+        if self.descending:
+            # Reversing also reverses ties, exactly like the full order
+            rows.reverse()
+        return rows
+
+    def position(self, row, rows=None):
+        """
+        Find a row by binary search
+
+        Rows are ordered by (value, row), from the largest when descending,
+        so the search compares both.
+
+        Args:
+            row (int): Ledger row to find
+            rows (sequence): Rows sorted this way, or None for every row
+
+        Returns:
+            int: Position of the row in rows, or None if it isn't there
+        """
+        rows = self.rows if rows is None else rows
+        key = self.key
+        target = (key(row), row)
+        low, high = 0, len(rows)
+        while low < high:
+            middle = (low + high) // 2
+            value = (key(rows[middle]), rows[middle])
+            if (value > target) if self.descending else (value < target):
+                low = middle + 1
+            else:
+                high = middle
+        if low < len(rows) and rows[low] == row:
+            return low
+        return None
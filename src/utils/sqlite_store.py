@@ -0,0 +1,235 @@
+import sqlite3
+import sys
+from src.utils.batch_loader import BatchLoader
+from src.utils.dates import format_date, parse_date
+from src.utils.ledger import Ledger
+
+# Bump when the schema changes, and add a migration step to SqliteStore.migrate
+SCHEMA_VERSION = 2
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS transactions (
+    id INTEGER PRIMARY KEY,
+    date TEXT NOT NULL,
+    description TEXT NOT NULL,
+    amount REAL NOT NULL,
+    type INTEGER NOT NULL,
+    category TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS idx_transactions_date ON transactions (date);
+CREATE INDEX IF NOT EXISTS idx_transactions_type ON transactions (type);
+CREATE INDEX IF NOT EXISTS idx_transactions_category ON transactions (category);
+CREATE TABLE IF NOT EXISTS metadata (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# Run one at a time, since executescript would commit the migration halfway
+SCHEMA_STATEMENTS = [statement.strip() for statement in SCHEMA.split(";") if statement.strip()]
+
+def storage_date(value):
+    """Convert a transaction date to the ISO text stored in the date column"""
+    return format_date(parse_date(value))
+
+
+class SqliteStore:
+    """
+    SQLite ledger storage with per-row inserts instead of whole-file rewrites
+
+    The database is the saved copy, not the working set: the application
+    reads every row into its in-memory Ledger (a page at a time, see
+    read_batches), since sorting, search and the totals all run on the
+    ledger's columns and indexes. Queries are not run against the file.
+    """
+
+    def __init__(self, path):
+        """
+        Open (or create) a ledger database
+
+        Args:
+            path (str): Database file path
+
+        Raises:
+            ValueError: If the file was written by a newer schema version
+        """
+        self.path = path
+        self.connection = sqlite3.connect(path)
+
+        # WAL lets the loader read on its own connection while rows are added
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.migrate()
+
+    def migrate(self):
+        """Create the schema or check that the existing one is supported"""
+        version = self.connection.execute("PRAGMA user_version").fetchone()[0]
+        if version > SCHEMA_VERSION:
+            raise ValueError(
+                f"{self.path} uses ledger schema version {version}, "
+                f"this version of the application supports up to {SCHEMA_VERSION}"
+            )
+        if version < SCHEMA_VERSION:
+            # DDL isn't wrapped in a transaction implicitly, so open one: the
+            # schema changes and the version bump are committed together or not at all
+            self.connection.execute("BEGIN IMMEDIATE")
+            try:
+                columns = {row[1] for row in self.connection.execute("PRAGMA table_info(transactions)")}
+                if columns and "category" not in columns:
+                    # Version 2 added the category column
+                    self.connection.execute(
+                        "ALTER TABLE transactions ADD COLUMN category TEXT NOT NULL DEFAULT ''"
+                    )
+                for statement in SCHEMA_STATEMENTS:
+                    self.connection.execute(statement)
+                self.connection.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+            except BaseException:
+                self.connection.rollback()
+                raise
+            self.connection.commit()
+
+    def close(self):
+        """Close the database"""
+        self.connection.close()
+
+    def insert(self, transaction):
+        """Insert a single transaction"""
+        with self.connection:
+            self.connection.execute(
+                "INSERT INTO transactions (date, description, amount, type, category) VALUES (?, ?, ?, ?, ?)",
+                (
+                    storage_date(transaction['date']),
+                    str(transaction['description']),
+                    float(transaction['amount']),
+                    Ledger.type_code(transaction['type']),
+                    str(transaction.get('category') or "").strip()
+                )
+            )
+
+    def rows(self, ledger, start=0, stop=None):
+        """Yield parameter tuples for a range of ledger rows"""
+        if stop is None or stop > len(ledger):
+            stop = len(ledger)
+        names = ledger.category_names
+        for index in range(start, stop):
+            yield (
+                format_date(ledger.dates[index]),
+                ledger.descriptions[index],
+                ledger.amounts[index],
+                ledger.types[index],
+                names[ledger.categories[index]]
+            )
+
+    def replace_all(self, ledger, saved_date=None):
+        """Replace the stored transactions with the contents of a ledger"""
+        with self.connection:
+            self.connection.execute("DELETE FROM transactions")
+            self.connection.executemany(
+                "INSERT INTO transactions (date, description, amount, type, category) VALUES (?, ?, ?, ?, ?)",
+                self.rows(ledger)
+            )
+            if saved_date:
+                self.set_metadata("saved_date", saved_date)
+
+    def set_metadata(self, key, value):
+        """Store a metadata value"""
+        self.connection.execute(
+            "INSERT OR REPLACE INTO metadata (key, value) VALUES (?, ?)", (key, value)
+        )
+
+    def get_metadata(self, key, default=None):
+        """Read a metadata value"""
+        row = self.connection.execute("SELECT value FROM metadata WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def count(self):
+        """Number of stored transactions"""
+        return self.connection.execute("SELECT COUNT(*) FROM transactions").fetchone()[0]
+
+    def read_ledger(self):
+        """Read every transaction into a new Ledger"""
+        ledger = Ledger()
+        for batch in read_batches(self.connection, 50000):
+            ledger.extend_ledger(batch)
+        return ledger
+
+    def last_id(self):
+        """Id of the newest stored transaction, or 0 if there are none"""
+        return self.connection.execute("SELECT MAX(id) FROM transactions").fetchone()[0] or 0
+
+    def start_reader(self, batch_size=20000):
+        """Start reading the transactions stored so far on a worker thread"""
+        return SqliteReader(self.path, self.count(), batch_size, stop_id=self.last_id()).start()
+
+
+def read_batches(connection, batch_size, cancelled=None, stop_id=None):
+    """
+    Yield the stored transactions as Ledger batches, in insertion order
+
+    Each batch is its own query for the rows after the last id read (keyset
+    paging), so no read stays open across batches to hold up the rows
+    being added through the write-ahead log. Rows inserted after stop_id
+    (while the load runs) are already in the ledger and are not read back.
+
+    Args:
+        connection (sqlite3.Connection): Connection to read on
+        batch_size (int): Rows per batch
+        cancelled (threading.Event): Stops reading once set
+        stop_id (int): Id of the last row to read, or None for the newest row when reading starts
+    """
+    if stop_id is None:
+        stop_id = connection.execute("SELECT MAX(id) FROM transactions").fetchone()[0] or 0
+    last_id = 0
+    while cancelled is None or not cancelled.is_set():
+        rows = connection.execute(
+            "SELECT id, date, description, amount, type, category FROM transactions "
+            "WHERE id > ? AND id <= ? ORDER BY id LIMIT ?",
+            (last_id, stop_id, batch_size)
+        ).fetchall()
+        if not rows:
+            return
+        last_id = rows[-1][0]
+
+        # Fill the batch column by column, without building per-row dicts
+        batch = Ledger()
+        _, dates, descriptions, amounts, types, categories = zip(*rows)
+        batch.dates.extend(map(parse_date, dates))
+        batch.descriptions.extend(sys.intern(description) for description in descriptions)
+        batch.amounts.extend(amounts)
+        batch.types.extend(types)
+        batch.categories.extend(map(batch.category_code, categories))
+        yield batch
+
+
+class SqliteReader(BatchLoader):
+    """Reads a ledger database into batches on a worker thread"""
+
+    def __init__(self, path, total_rows, batch_size=20000, max_pending=4, stop_id=None):
+        """
+        Args:
+            path (str): Database path
+            total_rows (int): Number of rows to read, for progress
+            batch_size (int): Rows per batch
+            max_pending (int): Batches allowed to wait in the queue before reading pauses
+            stop_id (int): Id of the last row to read, see read_batches()
+        """
+        super().__init__(max_pending)
+        self.path = path
+        self.batch_size = batch_size
+        self.total_work = total_rows
+        self.stop_id = stop_id
+
+    def run(self):
+        """Read the rows on the worker's own connection (runs on the worker thread)"""
+        connection = sqlite3.connect(self.path)
+        try:
+            for batch in read_batches(connection, self.batch_size, self.cancelled, self.stop_id):
+                if not self.put(batch):
+                    return
+                self.work_done = self.rows_read
+        finally:
+            connection.close()
+
+    def progress_text(self, loaded):
+        """Describe the progress in rows"""
+        return f"Loaded {loaded:,} of {self.total_work:,} transactions..."
@@ -0,0 +1,88 @@
+"""
+Running-balance timeline, downsampled to the pixels it is drawn on
+
+The balance is built from the per-day sums of the BalanceIndex, in one
+vectorized pass over the days rather than the transactions. Before
+plotting, the days in view are reduced to the first, lowest, highest and
+last balance of every pixel column (M4 downsampling): the drawn line
+looks the same as plotting every point, with at most four points per
+pixel.
+"""
+import numpy as np
+
+
+def downsample(x, y, x_min, x_max, width):
+    """
+    Reduce a line to the points that matter at a pixel width
+
+    Args:
+        x (ndarray): Ascending x values
+        y (ndarray): y value at each x
+        x_min (float): Left edge of the view
+        x_max (float): Right edge of the view
+        width (int): Width of the view in pixels
+
+    Returns:
+        tuple: (x, y) arrays with at most four points per pixel column, plus
+        the nearest point outside each edge so the line runs off the view
+    """
+    start = max(int(np.searchsorted(x, x_min, 'left')) - 1, 0)
+    stop = min(int(np.searchsorted(x, x_max, 'right')) + 1, len(x))
+    x, y = x[start:stop], y[start:stop]
+    width = max(int(width), 1)
+    if len(x) <= 4 * width:
+        return x, y
+
+    # Pixel column of every point; a column starts wherever it changes
+    span = max(x_max - x_min, 1e-9)
+    columns = np.floor((x - x_min) * (width / span)).astype(np.int64)
+    starts = np.flatnonzero(np.concatenate(([True], columns[1:] != columns[:-1])))
+    ends = np.concatenate((starts[1:], [len(x)])) - 1
+
+    # First, min, max and last of each column, min and max in its middle
+    middle = (x[starts] + x[ends]) / 2
+    sampled_x = np.column_stack((x[starts], middle, middle, x[ends])).ravel()
+    sampled_y = np.column_stack((
+        y[starts], np.minimum.reduceat(y, starts), np.maximum.reduceat(y, starts), y[ends]
+    )).ravel()
+    return sampled_x, sampled_y
+
+
+class BalanceTimeline:
+    """Balance at the end of every day with transactions, rebuilt when the balance index changes"""
+
+    def __init__(self, balance_index):
+        """
+        Args:
+            balance_index (BalanceIndex): Index whose per-day sums are used
+        """
+        self.balance_index = balance_index
+        self.changes = None  # balance_index.changes when last rebuilt
+        self.days = np.zeros(0, dtype=np.int64)  # Days since 1970-01-01
+        self.balances = np.zeros(0)
+
+    def refresh(self):
+        """Rebuild the balances if transactions changed since the last call"""
+        index = self.balance_index
+        if self.changes == index.changes:
+            return
+        self.changes = index.changes
+
+        # Cents per day of the index's day range; days without transactions are left out
+        income = np.frombuffer(index.values[0], dtype=np.int64)
+        expenses = np.frombuffer(index.values[1], dtype=np.int64)
+        active = np.flatnonzero(income | expenses)
+        self.days = active + index.base
+        self.balances = np.cumsum(income - expenses)[active] / 100
+
+    def bounds(self):
+        """Get the (first, last) day, or None without data"""
+        self.refresh()
+        if not len(self.days):
+            return None
+        return int(self.days[0]), int(self.days[-1])
+
+    def sample(self, x_min, x_max, width):
+        """Get the (days, balances) to plot for a view, see downsample()"""
+        self.refresh()
+        return downsample(self.days, self.balances, x_min, x_max, width)
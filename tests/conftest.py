@@ -0,0 +1,35 @@
+import os
+import random
+import sys
+
+import pytest
+
+# The application is imported as src.*, as main.py does
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.utils.ledger import Ledger
+
+DESCRIPTIONS = ["Coffee Shop", "coffee beans", "Salary", "Rent", "Café Crème", "Grocery Store", "Refund #12"]
+CATEGORIES = ["", "Dining", "Housing", "Salary", "Groceries"]
+
+def random_records(count, seed=7):
+    """Build transaction records spread over a few years, out of date order"""
+    generator = random.Random(seed)
+    return [
+        {
+            "date": f"{generator.randint(2019, 2024)}-{generator.randint(1, 12):02d}-{generator.randint(1, 28):02d}",
+            "description": generator.choice(DESCRIPTIONS),
+            "amount": round(generator.uniform(0.5, 2500), 2),
+            "type": generator.choice(("Income", "Expense")),
+            "category": generator.choice(CATEGORIES)
+        }
+        for _ in range(count)
+    ]
+
+@pytest.fixture
+def records():
+    return random_records(2000)
+
+@pytest.fixture
+def ledger(records):
+    return Ledger(records)
@@ -0,0 +1,93 @@
+"""Running totals kept by the ledger, checked against brute force over the rows"""
+from src.utils.aggregates import PERIODS, CategoryTotals, LedgerTotals, period_keys
+from src.utils.dates import SECONDS_PER_DAY
+from src.utils.ledger import Ledger
+
+def cents(ledger, rows=None):
+    """Income and expense cents of some rows, summed row by row"""
+    totals = [0, 0]
+    for row in range(len(ledger)) if rows is None else rows:
+        totals[ledger.types[row]] += round(ledger.amounts[row] * 100)
+    return totals
+
+def test_totals_after_bulk_load(ledger):
+    totals = LedgerTotals()
+    totals.on_reset(ledger)
+    assert totals.type_cents == cents(ledger)
+    assert round(totals.balance * 100) == cents(ledger)[0] - cents(ledger)[1]
+
+def test_totals_follow_appends_and_removals(ledger, records):
+    totals = ledger.attach("totals", LedgerTotals())
+    for record in records[:50]:
+        ledger.append(record)
+    for row in (0, 250, -1, 42):
+        ledger.remove(row % len(ledger))
+    assert totals.type_cents == cents(ledger)
+
+    # Removing every row cancels exactly, with no rounding left over
+    while ledger:
+        ledger.remove(len(ledger) - 1)
+    assert totals.type_cents == [0, 0]
+
+def period_cents(ledger, position):
+    """Cents per bucket of the period at a position in PERIODS, summed row by row"""
+    buckets = {}
+    for row in range(len(ledger)):
+        key = period_keys(ledger.dates[row] // SECONDS_PER_DAY)[position]
+        pair = buckets.setdefault(key, [0, 0])
+        pair[ledger.types[row]] += round(ledger.amounts[row] * 100)
+    return buckets
+
+def test_rollups_follow_changes(ledger, records):
+    totals = ledger.attach("totals", LedgerTotals())
+    for record in records[:50]:
+        ledger.append(record)
+    ledger.remove(7)
+
+    for position, period in enumerate(PERIODS):
+        expected = period_cents(ledger, position)
+        keys, income, expenses = totals.series(period)
+        assert keys == sorted(expected)
+        assert [round(value * 100) for value in income] == [expected[key][0] for key in keys]
+        assert [round(value * 100) for value in expenses] == [expected[key][1] for key in keys]
+        assert totals.series(period, limit=3)[0] == keys[-3:]
+
+        if period == "month":
+            for key in keys[::10]:
+                assert totals.month_totals(key) == (expected[key][0] / 100, expected[key][1] / 100)
+
+def test_weeks_start_on_monday():
+    # 2024-01-01 was a Monday, and 2023-12-31 the Sunday before
+    assert period_keys(19723) == ("2024-01-01", "2024-01-01", "2024-01", "2024")
+    assert period_keys(19722)[1] == "2023-12-25"
+
+def category_cents(ledger):
+    """Income and expense cents per category name, summed row by row"""
+    buckets = {}
+    for row in range(len(ledger)):
+        pair = buckets.setdefault(ledger.category_name(row), [0, 0])
+        pair[ledger.types[row]] += round(ledger.amounts[row] * 100)
+    return buckets
+
+def test_category_totals_follow_changes(ledger, records):
+    categories = ledger.attach("categories", CategoryTotals())
+    for record in records[:50] + [dict(records[0], category="New Category")]:
+        ledger.append(record)
+    for row in (0, 250, -1, 42):
+        ledger.remove(row % len(ledger))
+
+    expected = category_cents(ledger)
+    for name, (income, expenses) in expected.items():
+        assert categories.totals(name) == (income / 100, expenses / 100)
+    assert categories.totals("Never Used") == (0.0, 0.0)
+
+def test_top_categories_sum_the_rest_as_other(ledger):
+    categories = ledger.attach("categories", CategoryTotals())
+    expenses = sorted(
+        ((ledger.category_label(ledger.category_ids[name]), pair[1]) for name, pair in category_cents(ledger).items()),
+        key=lambda pair: -pair[1]
+    )
+    top = categories.top(Ledger.EXPENSE, 2)
+    assert top[:2] == [(label, value / 100) for label, value in expenses[:2]]
+    assert top[2] == ("Other", sum(value for _, value in expenses[2:]) / 100)
+    assert categories.top(Ledger.EXPENSE, len(expenses)) == [(label, value / 100) for label, value in expenses]
@@ -0,0 +1,45 @@
+"""Balance index, checked against sums over the rows"""
+import pytest
+
+from src.utils.balance_index import BalanceIndex
+from src.utils.dates import SECONDS_PER_DAY, format_date
+
+def balance(ledger, last_day, first_day=None):
+    """Income and expense cents of the rows dated first_day..last_day, summed row by row"""
+    totals = [0, 0]
+    for row in range(len(ledger)):
+        day = ledger.dates[row] // SECONDS_PER_DAY
+        if (first_day is None or first_day <= day) and day <= last_day:
+            totals[ledger.types[row]] += round(ledger.amounts[row] * 100)
+    return totals
+
+def check_balances(ledger, index):
+    """Compare balances and range totals with sums over the rows on a spread of days"""
+    days = sorted({stamp // SECONDS_PER_DAY for stamp in ledger.dates})
+    for day in days[::max(len(days) // 50, 1)] + [days[0] - 1, days[-1] + 1000]:
+        income, expenses = balance(ledger, day)
+        assert round(index.balance_at(day * SECONDS_PER_DAY) * 100) == income - expenses
+    for first, last in zip(days[::97], days[40::97]):
+        totals = index.totals_between(format_date(first * SECONDS_PER_DAY), format_date(last * SECONDS_PER_DAY))
+        assert [round(value * 100) for value in totals] == balance(ledger, last, first)
+
+def test_matches_rows_after_bulk_load(ledger):
+    check_balances(ledger, ledger.attach("balance", BalanceIndex()))
+
+def test_follows_appends_and_removals(ledger, records):
+    index = ledger.attach("balance", BalanceIndex())
+
+    # Rows far before and after the others grow the day range
+    for record in records[:100] + [dict(records[0], date="1901-05-05"), dict(records[1], date="2190-01-01")]:
+        ledger.append(record)
+    for row in (0, 250, -1, 42):
+        ledger.remove(row % len(ledger))
+    check_balances(ledger, index)
+
+def test_out_of_range_rows_leave_the_index_unchanged(ledger):
+    index = ledger.attach("balance", BalanceIndex())
+    base, capacity = index.base, index.capacity
+    ledger.dates[0] = 10 ** 12
+    with pytest.raises(ValueError, match="Date out of range"):
+        index.on_append(ledger, 0, 1)
+    assert (index.base, index.capacity) == (base, capacity)
@@ -0,0 +1,109 @@
+"""Binary ledger (.ledger) files of every format version"""
+import io
+import json
+from array import array
+
+import pytest
+
+from src.utils import binary_ledger
+from src.utils.binary_ledger import CODE_TYPE, FORMAT_VERSION, HEADER, MAGIC, encode_column, padding
+from src.utils.dates import format_date
+from src.utils.ledger import Ledger
+from src.utils.ledger_io import LedgerIO
+
+def write_old_ledger(ledger, version):
+    """
+    Write a ledger in the layout of format version 1, 2 or 3
+
+    Versions 1 and 2 store dates as codes into a table of date strings
+    (with lengths in characters in version 1), version 3 as a timestamp
+    column; none of them store categories.
+    """
+    metadata = json.dumps({"saved_date": "2020-01-01 00:00:00"}).encode('utf-8')
+    description_codes, descriptions = encode_column(ledger.descriptions)
+    if version == 1:
+        description_lengths = [len(description) for description in descriptions]
+    else:
+        description_lengths = [len(description.encode('utf-8')) for description in descriptions]
+    description_text = "".join(descriptions).encode('utf-8')
+
+    date_codes, dates = encode_column(format_date(stamp) for stamp in ledger.dates)
+    date_text = "".join(dates).encode('ascii')
+    if version >= 3:
+        dates, date_text = [], b""
+
+    file = io.BytesIO()
+    file.write(HEADER.pack(
+        MAGIC, version, 0, len(ledger), len(dates), len(descriptions),
+        len(date_text), len(description_text), len(metadata), 0
+    ))
+    file.write(metadata + b"\0" * padding(len(metadata)))
+    file.write(array('d', ledger.amounts).tobytes())
+    if version >= 3:
+        file.write(array('q', ledger.dates).tobytes())
+    else:
+        file.write(date_codes.tobytes())
+    file.write(description_codes.tobytes())
+    file.write(array(CODE_TYPE, map(len, dates)).tobytes())
+    file.write(array(CODE_TYPE, description_lengths).tobytes())
+    file.write(array('b', ledger.types).tobytes())
+    file.write(date_text)
+    file.write(description_text)
+    return file.getvalue()
+
+def uncategorized(ledger):
+    """The records of a ledger as a file without categories reads them"""
+    return [dict(record, category="") for record in ledger.records()]
+
+@pytest.mark.parametrize("version", [1, 2, 3])
+def test_reads_older_versions(tmp_path, ledger, version):
+    path = tmp_path / f"v{version}.ledger"
+    path.write_bytes(write_old_ledger(ledger, version))
+
+    data = LedgerIO.load_binary(str(path))
+    assert data["saved_date"] == "2020-01-01 00:00:00"
+    assert list(data["transactions"].records()) == uncategorized(ledger)
+
+    mapped = LedgerIO.map_binary(str(path))["transactions"]
+    assert list(mapped.records()) == uncategorized(ledger)
+
+def test_current_version_round_trip(tmp_path, ledger):
+    path = str(tmp_path / "current.ledger")
+    LedgerIO.save_binary({"transactions": ledger, "saved_date": "today"}, path)
+    with open(path, 'rb') as file:
+        assert HEADER.unpack_from(file.read(HEADER.size))[1] == FORMAT_VERSION
+
+    loaded = LedgerIO.load_binary(path)
+    assert loaded["saved_date"] == "today"
+    assert list(loaded["transactions"].records()) == list(ledger.records())
+
+    mapped = LedgerIO.map_binary(path)["transactions"]
+    assert list(mapped.records()) == list(ledger.records())
+
+def test_mapped_ledger_takes_new_rows(tmp_path, ledger, records):
+    path = str(tmp_path / "current.ledger")
+    LedgerIO.save_binary({"transactions": ledger}, path)
+    mapped = LedgerIO.map_binary(path)["transactions"]
+    mapped.append(records[0])
+    mapped.remove(0)
+    assert list(mapped.records()) == list(ledger.records(1)) + list(Ledger([records[0]]).records())
+
+def test_rejects_newer_version(ledger):
+    data = bytearray(write_old_ledger(ledger, 3))
+    HEADER.pack_into(data, 0, MAGIC, FORMAT_VERSION + 1, *HEADER.unpack_from(data)[2:])
+    with pytest.raises(ValueError, match="newer"):
+        binary_ledger.read_ledger(io.BytesIO(bytes(data)))
+
+def test_rejects_other_files():
+    with pytest.raises(ValueError, match="Not a binary ledger"):
+        binary_ledger.read_ledger(io.BytesIO(b"date,description\n"))
+
+@pytest.mark.parametrize("stamp", [-10 ** 12, 10 ** 12])
+def test_rejects_dates_out_of_range(tmp_path, ledger, stamp):
+    path = str(tmp_path / "damaged.ledger")
+    ledger.dates[len(ledger) // 2] = stamp
+    LedgerIO.save_binary({"transactions": ledger}, path)
+    with pytest.raises(ValueError, match="Date out of range"):
+        LedgerIO.load_binary(path)
+    with pytest.raises(ValueError, match="Date out of range"):
+        LedgerIO.map_binary(path)
@@ -0,0 +1,102 @@
+"""Single-file streaming CSV import and multi-file merging by date"""
+import csv
+
+import pytest
+
+from src.utils.csv_importer import CsvImporter
+from src.utils.ledger import Ledger
+from src.utils.parallel_import import merge_by_date, parse_statement
+
+FIELDS = ["date", "description", "amount", "type", "category"]
+
+def write_csv(path, rows):
+    """Write rows as a CSV statement"""
+    with open(path, 'w', newline='', encoding='utf-8') as file:
+        writer = csv.DictWriter(file, fieldnames=FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+    return str(path)
+
+def drain(importer):
+    """Take every batch of a running import, the way the window does"""
+    batches = []
+    while not importer.done():
+        batches.extend(importer.get_batches())
+    importer.thread.join()
+    assert importer.error is None
+    return batches
+
+def joined(batches):
+    """Concatenate ledger batches"""
+    ledger = Ledger()
+    for batch in batches:
+        ledger.extend_ledger(batch)
+    return ledger
+
+def test_streams_batches_before_the_file_is_read(tmp_path, ledger):
+    sorted_ledger = ledger.sorted_by_date()
+    path = write_csv(tmp_path / "sorted.csv", sorted_ledger.records())
+    importer = CsvImporter(path, batch_size=100, max_pending=1).start()
+
+    # The first batch is ready while most of the file is still unread
+    first = importer.batches.get(timeout=5)
+    assert len(first) == 100
+    assert importer.bytes_read < importer.total_bytes / 2
+
+    rows = joined([first] + drain(importer))
+    assert list(rows.records()) == list(sorted_ledger.records())
+    assert importer.in_date_order
+
+@pytest.mark.parametrize("batch_size", [7, 64, 5000])
+def test_tracks_whether_rows_are_in_date_order(tmp_path, ledger, batch_size):
+    path = write_csv(tmp_path / "unsorted.csv", ledger.records())
+    importer = CsvImporter(path, batch_size=batch_size).start()
+    rows = joined(drain(importer))
+    assert list(rows.records()) == list(ledger.records())
+    assert not importer.in_date_order
+
+    newest_first = ledger.take(sorted(range(len(ledger)), key=lambda row: -ledger.dates[row]))
+    importer = CsvImporter(write_csv(tmp_path / "newest.csv", newest_first.records()), batch_size).start()
+    drain(importer)
+    assert not importer.in_date_order
+
+def test_ambiguous_dates_wait_for_the_file_order(tmp_path):
+    dates = ["01/02/2024", "02/02/2024", "03/02/2024", "25/02/2024"]
+    path = write_csv(tmp_path / "day_first.csv", [
+        {"date": date, "description": "row", "amount": 1, "type": "Income", "category": ""} for date in dates
+    ])
+    rows = joined(drain(CsvImporter(path, batch_size=1).start()))
+    assert [record["date"] for record in rows.records()] == ["2024-02-01", "2024-02-02", "2024-02-03", "2024-02-25"]
+
+def test_skipped_rows_are_numbered_through_the_file(tmp_path, records):
+    rows = records[:10]
+    rows[2] = dict(rows[2], amount="lots")
+    rows[7] = dict(rows[7], date="someday")
+    importer = CsvImporter(write_csv(tmp_path / "bad.csv", rows), batch_size=3).start()
+    assert len(joined(drain(importer))) == 8
+    assert [number for number, _ in importer.skipped] == [3, 8]
+
+def test_merge_concatenates_separate_periods(ledger):
+    ordered = ledger.sorted_by_date()
+    halves = [ordered.take(range(1000, 2000)), ordered.take(range(1000))]
+    merged = merge_by_date(halves + [Ledger()])
+    assert list(merged.records()) == list(ordered.records())
+
+def test_merge_interleaves_overlapping_statements(ledger):
+    first = ledger.take(range(0, 2000, 2)).sorted_by_date()
+    second = ledger.take(range(1, 2000, 2)).sorted_by_date()
+    first.category_code("Only In First")
+    merged = merge_by_date([first, second])
+
+    # Equal dates keep the order of the statements, then of their rows
+    expected = sorted(
+        [(first.dates[row], 0, row, first.record(row)) for row in range(len(first))]
+        + [(second.dates[row], 1, row, second.record(row)) for row in range(len(second))],
+        key=lambda entry: entry[:3]
+    )
+    assert list(merged.records()) == [entry[3] for entry in expected]
+
+def test_statement_is_parsed_in_date_order(tmp_path, ledger):
+    parsed, skipped = parse_statement(write_csv(tmp_path / "statement.csv", ledger.records()))
+    assert skipped == []
+    assert list(parsed.records()) == list(ledger.sorted_by_date().records())
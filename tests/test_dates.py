@@ -0,0 +1,49 @@
+"""Date parsing to timestamps, and the supported date range"""
+from datetime import date, datetime
+
+import pytest
+
+from src.utils.dates import (
+    FIRST_DATE, LAST_DATE, SECONDS_PER_DAY, check_day, check_stamp, format_date, parse_date,
+    slash_dates_day_first
+)
+
+def test_first_and_last_supported_dates():
+    first = parse_date(FIRST_DATE.isoformat())
+    last = parse_date(LAST_DATE.isoformat())
+    assert format_date(first) == "1900-01-01"
+    assert format_date(last) == "2199-12-31"
+    assert check_day(first // SECONDS_PER_DAY) == first // SECONDS_PER_DAY
+    assert check_stamp(last + SECONDS_PER_DAY - 1) == last + SECONDS_PER_DAY - 1
+
+@pytest.mark.parametrize("value", [
+    "1899-12-31", "2200-01-01", "12/31/1899", "0001-01-01", date(2200, 1, 1), datetime(1850, 6, 1, 12, 0)
+])
+def test_dates_outside_the_range_are_rejected(value):
+    with pytest.raises(ValueError, match="Date out of range"):
+        parse_date(value)
+
+def test_out_of_range_numbers_are_rejected():
+    last = parse_date("2199-12-31")
+    with pytest.raises(ValueError, match="Date out of range: 2200-01-01"):
+        parse_date(last + SECONDS_PER_DAY)
+    with pytest.raises(ValueError, match="Date out of range"):
+        check_stamp(parse_date("1900-01-01") - 1)
+
+    # Days beyond what datetime can show are still reported, by number
+    with pytest.raises(ValueError, match="day 9000000000"):
+        check_day(9000000000)
+
+def test_day_first_when_the_file_shows_it():
+    assert slash_dates_day_first(["25/03/2024", "01/02/2024", "13/12/2023"])
+    assert not slash_dates_day_first(["03/25/2024", "01/02/2024"])
+    assert not slash_dates_day_first(["01/02/2024", "2024-03-25", "Mar 25, 2024"])
+    assert parse_date("01/02/2024", day_first=True) == parse_date("2024-02-01")
+    assert parse_date("01/02/2024") == parse_date("2024-01-02")
+
+def test_formats_round_trip():
+    assert format_date(parse_date("Mar 5, 2024")) == "2024-03-05"
+    assert format_date(parse_date("2024-03-05 14:30:15")) == "2024-03-05 14:30:15"
+    assert format_date(parse_date(datetime(2024, 3, 5, 0, 0, 1))) == "2024-03-05 00:00:01"
+    with pytest.raises(ValueError, match="Unrecognized date"):
+        parse_date("next tuesday")
@@ -0,0 +1,87 @@
+"""Duplicate detection for imports merged into existing data"""
+from collections import Counter
+
+from src.utils.dates import SECONDS_PER_DAY
+from src.utils.duplicates import Deduplicator, DuplicateIndex, drop_overlaps, normalize_description
+from src.utils.ledger import Ledger
+
+def identities(ledger):
+    """Count the (day, signed cents, description) identities of every row, row by row"""
+    return Counter(
+        (
+            ledger.dates[row] // SECONDS_PER_DAY,
+            round(ledger.amounts[row] * 100) * (-1 if ledger.types[row] == Ledger.EXPENSE else 1),
+            normalize_description(ledger.descriptions[row])
+        )
+        for row in range(len(ledger))
+    )
+
+def transaction(date, description="Coffee Shop", amount=4.5, kind="Expense"):
+    """Build a transaction record, a coffee purchase unless told otherwise"""
+    return {"date": date, "description": description, "amount": amount, "type": kind}
+
+def test_index_counts_follow_appends_and_removals(ledger, records):
+    index = ledger.attach("duplicates", DuplicateIndex())
+    index.build()
+    for record in records[:100]:
+        ledger.append(record)
+    for row in (0, 250, -1, 42):
+        ledger.remove(row % len(ledger))
+    assert index.counts == dict(identities(ledger))
+
+def test_filter_drops_rows_already_present(ledger):
+    existing = ledger.take(range(1000))
+    index = existing.attach("duplicates", DuplicateIndex())
+
+    # Half the import repeats existing rows, with descriptions in other case and spacing
+    repeated = existing.take(range(0, 1000, 2))
+    repeated.descriptions = ["  " + description.upper().replace(" ", "   ") for description in repeated.descriptions]
+    incoming = Ledger()
+    incoming.extend_ledger(repeated)
+    incoming.extend_ledger(ledger, 1000)
+
+    deduplicator = Deduplicator(index)
+    kept = deduplicator.filter(incoming)
+    assert deduplicator.skipped == 500
+    assert list(kept.records()) == list(ledger.records(1000))
+
+def test_dates_within_the_tolerance_match_once():
+    existing = Ledger([transaction("2024-03-10"), transaction("2024-03-10"), transaction("2024-01-01", "Rent", 900)])
+    deduplicator = Deduplicator(existing.attach("duplicates", DuplicateIndex()))
+    incoming = Ledger([
+        transaction("2024-03-12"),  # Posted two days later: matches
+        transaction("2024-03-07"),  # Three days earlier: matches the second existing row
+        transaction("2024-03-09"),  # Both existing rows are used up: kept
+        transaction("2024-03-10", amount=4.51),  # Another amount: kept
+        transaction("2024-03-10", kind="Income"),  # Another sign: kept
+        transaction("2024-03-20"),  # Beyond the tolerance: kept
+    ])
+    kept = deduplicator.filter(incoming)
+    assert deduplicator.skipped == 2
+    assert [record["date"] for record in kept.records()] == ["2024-03-09", "2024-03-10", "2024-03-10", "2024-03-20"]
+
+def test_rows_repeated_within_an_import_are_kept():
+    existing = Ledger([transaction("2024-03-10")])
+    deduplicator = Deduplicator(existing.attach("duplicates", DuplicateIndex()))
+    kept = deduplicator.filter(Ledger([transaction("2024-03-10")] * 3))
+    assert deduplicator.skipped == 1
+    assert len(kept) == 2
+
+def test_span_is_widened_by_the_tolerance():
+    # A copy posted three days after the latest existing row, outside its span, still matches
+    existing = Ledger([transaction("2024-01-01", "Rent", 900), transaction("2024-03-10")])
+    deduplicator = Deduplicator(existing.attach("duplicates", DuplicateIndex()))
+    assert len(deduplicator.filter(Ledger([transaction("2024-03-13")]))) == 0
+
+def test_empty_ledger_keeps_every_row(ledger):
+    deduplicator = Deduplicator(Ledger().attach("duplicates", DuplicateIndex()))
+    assert deduplicator.filter(ledger) is ledger
+
+def test_overlapping_statements_drop_repeated_rows(ledger):
+    ordered = ledger.sorted_by_date()
+    earlier = ordered.take(range(0, 1200))
+    later = ordered.take(range(1000, 2000))
+    kept, skipped = drop_overlaps([earlier, later])
+    assert skipped == 200
+    assert kept[0] is earlier
+    assert identities(kept[0]) + identities(kept[1]) == identities(ordered)
@@ -0,0 +1,93 @@
+"""Autosave journal recovery"""
+import os
+
+import pytest
+
+from src.utils.journal import JOURNAL_NAME, Journal
+from src.utils.ledger import Ledger
+from src.utils.ledger_io import LedgerIO
+
+def test_recovers_journaled_rows(tmp_path, records):
+    journal = Journal(str(tmp_path))
+    for record in records[:50]:
+        journal.append(record)
+    journal.close()
+
+    recovered = Journal(str(tmp_path)).recover()
+    assert list(recovered.records()) == list(Ledger(records[:50]).records())
+
+def test_recovers_snapshot_and_later_records(tmp_path, records):
+    journal = Journal(str(tmp_path))
+    for record in records[:30]:
+        journal.append(record)
+    journal.compact(Ledger(records[:30]))
+    for record in records[30:40]:
+        journal.append(record)
+    journal.close()
+
+    restarted = Journal(str(tmp_path))
+    recovered = restarted.recover()
+    assert list(recovered.records()) == list(Ledger(records[:40]).records())
+
+    # Numbering continues after the recovered records
+    restarted.append(records[40])
+    restarted.close()
+    assert len(Journal(str(tmp_path)).recover()) == 41
+
+def test_skips_torn_final_write(tmp_path, records):
+    journal = Journal(str(tmp_path))
+    for record in records[:5]:
+        journal.append(record)
+    journal.close()
+    with open(os.path.join(str(tmp_path), JOURNAL_NAME), 'a') as file:
+        file.write('{"date": "2024-01-01", "descrip')
+
+    restarted = Journal(str(tmp_path))
+    assert len(restarted.recover()) == 5
+
+    # The next record starts on a fresh line
+    restarted.append(records[5])
+    restarted.close()
+    assert len(Journal(str(tmp_path)).recover()) == 6
+
+def test_snapshot_refers_to_unchanged_ledger_file(tmp_path, ledger, records):
+    path = str(tmp_path / "saved.ledger")
+    LedgerIO.save_binary({"transactions": ledger}, path)
+
+    journal = Journal(str(tmp_path / "autosave"))
+    journal.compact(LedgerIO.map_binary(path)["transactions"], source=path)
+    journal.append(records[0])
+    journal.close()
+
+    restarted = Journal(str(tmp_path / "autosave"))
+    recovered = restarted.recover()
+    assert restarted.warning is None
+    assert len(recovered) == len(ledger) + 1
+    assert list(recovered.records(0, len(ledger))) == list(ledger.records())
+
+@pytest.mark.parametrize("change", ["saved over", "removed"])
+def test_changed_ledger_file_keeps_later_records(tmp_path, ledger, records, change):
+    path = str(tmp_path / "saved.ledger")
+    LedgerIO.save_binary({"transactions": ledger}, path)
+    journal = Journal(str(tmp_path / "autosave"))
+    journal.compact(ledger, source=path)
+    for record in records[:5]:
+        journal.append(record)
+    journal.close()
+
+    if change == "removed":
+        os.remove(path)
+    else:
+        LedgerIO.save_binary({"transactions": ledger.take(range(10))}, path)
+    restarted = Journal(str(tmp_path / "autosave"))
+    recovered = restarted.recover()
+    assert "changed or removed" in restarted.warning
+    assert list(recovered.records()) == list(Ledger(records[:5]).records())
+
+    # Compacting what was recovered replaces the snapshot that referred to the file
+    restarted.compact(recovered)
+    restarted.append(records[5])
+    restarted.close()
+    again = Journal(str(tmp_path / "autosave"))
+    assert list(again.recover().records()) == list(Ledger(records[:6]).records())
+    assert again.warning is None
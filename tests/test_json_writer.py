@@ -0,0 +1,63 @@
+"""Streamed JSON output, compared with json.dumps of the same records"""
+import io
+import json
+import threading
+
+import pytest
+
+from src.utils.json_writer import JsonWriter, save_json_file, write_json
+from src.utils.ledger import Ledger
+
+def expected_json(data, compact):
+    """The text json.dumps gives for the data with the ledger as a list of records"""
+    plain = dict(data, transactions=list(data["transactions"].records()))
+    if compact:
+        return json.dumps(plain, separators=(',', ':'))
+    return json.dumps(plain, indent=4)
+
+@pytest.mark.parametrize("compact", [False, True])
+@pytest.mark.parametrize("chunk_size", [1, 7, 5000])
+def test_matches_json_dumps(ledger, compact, chunk_size):
+    ledger.append({"date": "2024-02-29", "description": 'Quote " and \\ and ünïcode', "amount": 1e-7,
+                   "type": "Income", "category": "Café"})
+    data = {"transactions": ledger, "total_income": 12.5, "saved_date": "2024-01-01 00:00:00",
+            "nested": {"a": [1, 2]}}
+    file = io.StringIO()
+    assert write_json(data, file, compact, chunk_size)
+    assert file.getvalue() == expected_json(data, compact)
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_empty_data(compact):
+    file = io.StringIO()
+    write_json({}, file, compact)
+    assert file.getvalue() == "{}"
+
+    data = {"transactions": Ledger(), "saved_date": "today"}
+    file = io.StringIO()
+    write_json(data, file, compact)
+    assert file.getvalue() == expected_json(data, compact)
+
+def test_reports_progress_by_chunk(ledger):
+    written = []
+    write_json({"transactions": ledger}, io.StringIO(), chunk_size=900, progress=written.append)
+    assert written == [900, 1800, 2000]
+
+def test_cancelled_save_keeps_old_file(tmp_path, ledger):
+    path = tmp_path / "data.json"
+    path.write_text("old")
+    cancelled = threading.Event()
+    cancelled.set()
+    assert not save_json_file({"transactions": ledger}, str(path), cancelled=cancelled)
+    assert path.read_text() == "old"
+    assert [entry.name for entry in tmp_path.iterdir()] == ["data.json"]
+
+def test_background_writer_copies_the_ledger(tmp_path, ledger, records):
+    path = tmp_path / "data.json"
+    expected = list(ledger.records())
+    writer = JsonWriter({"transactions": ledger}, str(path))
+
+    # Rows added after the save started are not part of it
+    ledger.append(records[0])
+    writer.start().wait()
+    assert writer.error is None and writer.progress() == (len(expected), len(expected))
+    assert json.loads(path.read_text())["transactions"] == expected
@@ -0,0 +1,120 @@
+"""Ledger columns and the indexes deferred by replace()"""
+import pytest
+
+from src.utils.aggregates import CategoryTotals, LedgerTotals
+from src.utils.balance_index import BalanceIndex
+from src.utils.ledger import Ledger
+
+SUMMED = ("totals", "categories", "balance")
+
+def attach_sums(ledger):
+    """Attach the indexes the window defers when it adopts a mapped ledger"""
+    return {
+        "totals": ledger.attach("totals", LedgerTotals()),
+        "categories": ledger.attach("categories", CategoryTotals()),
+        "balance": ledger.attach("balance", BalanceIndex()),
+    }
+
+def check_sums(ledger, indexes):
+    """Compare the indexes with ones built in one go over the same rows"""
+    built = attach_sums(ledger.copy())
+    assert indexes["totals"].type_cents == built["totals"].type_cents
+    assert indexes["totals"].month_cents == built["totals"].month_cents
+    for name in set(ledger.category_names):
+        assert indexes["categories"].totals(name) == built["categories"].totals(name)
+    for stamp in ledger.dates[::37]:
+        assert indexes["balance"].balance_at(stamp) == built["balance"].balance_at(stamp)
+
+@pytest.mark.parametrize("step", [None, 1, 333])
+def test_deferred_indexes_catch_up(ledger, step):
+    copy = Ledger()
+    indexes = attach_sums(copy)
+    copy.replace(ledger.copy(), deferred=SUMMED)
+    assert indexes["totals"].type_cents == [0, 0]
+    while not copy.catch_up(step):
+        pass
+    check_sums(copy, indexes)
+
+def test_change_finishes_deferred_catch_up(ledger, records):
+    copy = Ledger()
+    indexes = attach_sums(copy)
+    copy.replace(ledger.copy(), deferred=SUMMED)
+    copy.catch_up(100)
+
+    # Rows added before the catch-up ends are counted once, after every earlier row
+    copy.append(records[0])
+    copy.remove(5)
+    assert copy.catch_up()
+    check_sums(copy, indexes)
+
+class FailingIndex:
+    """An index whose first append raises, like a bad row reaching the balance index"""
+
+    def __init__(self):
+        self.failures = 1
+        self.rows = 0
+
+    def on_reset(self, ledger):
+        self.rows = len(ledger) if ledger is not None else 0
+
+    def on_append(self, ledger, start, stop):
+        if self.failures:
+            self.failures -= 1
+            raise ValueError("Date out of range")
+        self.rows += stop - start
+
+    def on_remove(self, ledger, index):
+        self.rows -= 1
+
+def test_catch_up_retries_without_counting_rows_twice(ledger):
+    copy = Ledger()
+    indexes = attach_sums(copy)
+    failing = copy.attach("failing", FailingIndex())
+    copy.replace(ledger.copy(), deferred=SUMMED + ("failing",))
+
+    # The indexes before the failing one keep the rows they were given
+    with pytest.raises(ValueError):
+        copy.catch_up(500)
+    while not copy.catch_up(500):
+        pass
+    assert failing.rows == len(copy)
+    check_sums(copy, indexes)
+
+def test_from_rows_skips_unreadable_rows_in_file_order():
+    rows = [
+        {"date": "2024-01-05", "description": "ok", "amount": "1.50", "type": "Income"},
+        {"date": "never", "description": "bad date", "amount": "2", "type": "Expense"},
+        {"date": "2024-01-06", "description": "bad amount", "amount": "lots", "type": "Expense"},
+        {"date": "2024-01-07", "amount": "3", "type": "Expense"},
+        {"date": "2300-01-01", "description": "far future", "amount": "4", "type": "Expense"},
+        {"date": "2024-01-08", "description": "also ok", "amount": "5", "type": "Expense", "category": "Food"},
+    ]
+    skipped = [(99, "earlier file")]
+    ledger = Ledger.from_rows(rows, skipped)
+    assert [record["description"] for record in ledger.records()] == ["ok", "also ok"]
+    assert ledger.category_name(1) == "Food"
+    assert [number for number, _ in skipped] == [99, 2, 3, 4, 5]
+    assert skipped[3][1] == "Missing field 'description'"
+
+def test_from_rows_reads_slash_dates_in_the_file_order():
+    rows = [{"date": date, "description": "row", "amount": 1, "type": "Income"}
+            for date in ("01/02/2024", "25/02/2024")]
+    ledger = Ledger.from_rows(rows)
+    assert [record["date"] for record in ledger.records()] == ["2024-02-01", "2024-02-25"]
+
+def test_sort_by_date_moves_only_later_rows(ledger, records):
+    start = 500
+    copy = Ledger()
+    indexes = attach_sums(copy)
+    copy.extend_ledger(ledger)
+    head = list(copy.records(0, start))
+
+    assert copy.sort_by_date(start, deferred=SUMMED)
+    assert list(copy.records(0, start)) == head
+    assert list(copy.records(start)) == list(ledger.take(range(start, len(ledger))).sorted_by_date().records())
+    while not copy.catch_up(300):
+        pass
+    check_sums(copy, indexes)
+
+    # Rows already in order are left alone
+    assert not copy.sort_by_date(start)
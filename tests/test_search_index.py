@@ -0,0 +1,23 @@
+"""Description search, checked against a scan of every row"""
+from src.utils.search_index import SearchIndex, normalize
+
+QUERIES = ("coffee", "CAF", "e", "#12", "crème", "missing")
+
+def scan(ledger, query):
+    """Rows whose description contains the query, found row by row"""
+    return [row for row in range(len(ledger)) if normalize(query) in normalize(ledger.descriptions[row])]
+
+def test_matches_scan_after_bulk_load(ledger):
+    index = ledger.attach("search", SearchIndex())
+    for query in QUERIES:
+        assert list(index.search(query)) == scan(ledger, query)
+
+def test_follows_appends_and_removals(ledger, records):
+    index = ledger.attach("search", SearchIndex())
+    index.search("coffee")
+    for record in records[:50]:
+        ledger.append(record)
+    for row in (0, 250, -1, 42):
+        ledger.remove(row % len(ledger))
+    for query in QUERIES:
+        assert list(index.search(query)) == scan(ledger, query)
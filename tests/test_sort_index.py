@@ -0,0 +1,38 @@
+"""Sort permutations, checked against sorting the rows"""
+from src.utils.sort_index import SortIndex
+
+def check_orders(ledger, index):
+    """Compare every column's order with a stable sort of its values"""
+    for column in SortIndex.COLUMNS:
+        values = index.values(column)
+        assert list(index.rows(column)) == sorted(range(len(ledger)), key=values.__getitem__)
+
+def test_orders_after_bulk_load(ledger):
+    check_orders(ledger, ledger.attach("sort", SortIndex()))
+
+def test_orders_follow_appends_and_removals(ledger, records):
+    index = ledger.attach("sort", SortIndex())
+    for column in SortIndex.COLUMNS:
+        index.rows(column)
+
+    # Single rows are placed by binary search, including back-dated ones
+    for record in records[:100]:
+        ledger.append(record)
+    for row in (0, 250, -1, 42):
+        ledger.remove(row % len(ledger))
+    check_orders(ledger, index)
+
+def test_orderings_sort_subsets_and_find_rows(ledger):
+    index = ledger.attach("sort", SortIndex())
+    subset = list(range(0, len(ledger), 7))
+    for column in SortIndex.COLUMNS:
+        for descending in (False, True):
+            order = index.ordering(column, descending)
+            rows = list(order.rows[0:len(order.rows)])
+            expected = list(index.rows(column))
+            assert rows == (expected[::-1] if descending else expected)
+
+            # A subset sorts like the full order, and every row is found by position
+            assert order.sort(list(subset)) == [row for row in rows if row % 7 == 0]
+            for row in subset[::25]:
+                assert rows[order.position(row)] == row
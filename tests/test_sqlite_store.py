@@ -0,0 +1,99 @@
+"""SQLite ledger schema migration and reading"""
+import sqlite3
+
+import pytest
+
+from src.utils import sqlite_store
+from src.utils.sqlite_store import SCHEMA_VERSION, SqliteStore
+
+VERSION_1_SCHEMA = """
+CREATE TABLE transactions (
+    id INTEGER PRIMARY KEY,
+    date TEXT NOT NULL,
+    description TEXT NOT NULL,
+    amount REAL NOT NULL,
+    type INTEGER NOT NULL
+);
+CREATE TABLE metadata (key TEXT PRIMARY KEY, value TEXT);
+PRAGMA user_version=1;
+"""
+
+def version_1_database(path, rows):
+    """Write a database the way version 1 of the schema stored it"""
+    connection = sqlite3.connect(path)
+    connection.executescript(VERSION_1_SCHEMA)
+    connection.executemany(
+        "INSERT INTO transactions (date, description, amount, type) VALUES (?, ?, ?, ?)", rows
+    )
+    connection.commit()
+    connection.close()
+
+def schema(path):
+    """Get the transaction columns and user_version of a database"""
+    connection = sqlite3.connect(path)
+    try:
+        columns = [row[1] for row in connection.execute("PRAGMA table_info(transactions)")]
+        return columns, connection.execute("PRAGMA user_version").fetchone()[0]
+    finally:
+        connection.close()
+
+def test_migrates_version_1(tmp_path):
+    path = str(tmp_path / "old.db")
+    version_1_database(path, [("2024-01-0%d" % day, f"row {day}", day, day % 2) for day in range(1, 10)])
+
+    store = SqliteStore(path)
+    ledger = store.read_ledger()
+    store.close()
+    assert schema(path) == (["id", "date", "description", "amount", "type", "category"], SCHEMA_VERSION)
+    assert list(ledger.descriptions) == [f"row {day}" for day in range(1, 10)]
+    assert set(ledger.category_names) == {""}
+
+    # Opening it again leaves it as it is
+    SqliteStore(path).close()
+    assert schema(path)[1] == SCHEMA_VERSION
+
+def test_failed_migration_leaves_version_1(tmp_path, monkeypatch):
+    path = str(tmp_path / "old.db")
+    version_1_database(path, [("2024-01-01", "row", 1.0, 0)])
+    monkeypatch.setattr(sqlite_store, "SCHEMA_STATEMENTS", sqlite_store.SCHEMA_STATEMENTS + ["CREATE TABLE ("])
+
+    with pytest.raises(sqlite3.Error):
+        SqliteStore(path)
+    assert schema(path) == (["id", "date", "description", "amount", "type"], 1)
+
+    monkeypatch.undo()
+    SqliteStore(path).close()
+    assert schema(path)[1] == SCHEMA_VERSION
+
+def test_rejects_newer_version(tmp_path):
+    path = str(tmp_path / "new.db")
+    connection = sqlite3.connect(path)
+    connection.execute(f"PRAGMA user_version={SCHEMA_VERSION + 1}")
+    connection.close()
+    with pytest.raises(ValueError, match="schema version"):
+        SqliteStore(path)
+
+def test_round_trip_in_pages(tmp_path, ledger):
+    store = SqliteStore(str(tmp_path / "ledger.db"))
+    store.replace_all(ledger, saved_date="2024-01-01 00:00:00")
+    batches = list(sqlite_store.read_batches(store.connection, 300))
+    store.close()
+
+    assert [len(batch) for batch in batches[:-1]] == [300] * (len(batches) - 1)
+    rows = [record for batch in batches for record in batch.records()]
+    assert rows == list(ledger.records())
+
+def test_reader_stops_at_rows_stored_when_it_started(tmp_path, ledger, records):
+    store = SqliteStore(str(tmp_path / "ledger.db"))
+    store.replace_all(ledger.take(range(101)))
+    reader = store.start_reader(batch_size=10)
+
+    # A transaction added while the load runs is already in the window's ledger
+    store.insert(records[0])
+    rows = []
+    while not reader.done():
+        for batch in reader.get_batches():
+            rows.extend(batch.records())
+    assert reader.error is None
+    store.close()
+    assert rows == list(ledger.records(0, 101))
@@ -0,0 +1,14 @@
+"""Synthetic ledgers the benchmarks run on"""
+from benchmarks.synthetic import generate_ledger
+from src.utils.ledger import Ledger
+
+def test_same_seed_same_ledger():
+    assert list(generate_ledger(500).records()) == list(generate_ledger(500).records())
+    assert list(generate_ledger(500, seed=1).records()) != list(generate_ledger(500).records())
+
+def test_rows_in_date_order_with_categories():
+    ledger = generate_ledger(2000)
+    assert len(ledger) == 2000
+    assert list(ledger.dates) == sorted(ledger.dates)
+    assert "" not in {ledger.category_name(row) for row in range(len(ledger))}
+    assert {ledger.type_name(row) for row in range(len(ledger))} == set(Ledger.TYPES)
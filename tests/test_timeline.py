@@ -0,0 +1,61 @@
+"""Running-balance timeline and its M4 downsampling"""
+import numpy as np
+
+from src.utils.balance_index import BalanceIndex
+from src.utils.dates import SECONDS_PER_DAY
+from src.utils.timeline import BalanceTimeline, downsample
+
+def daily_balances(ledger):
+    """Balance at the end of every day with transactions, summed row by row"""
+    cents = {}
+    for row in range(len(ledger)):
+        sign = -1 if ledger.types[row] else 1
+        day = ledger.dates[row] // SECONDS_PER_DAY
+        cents[day] = cents.get(day, 0) + sign * round(ledger.amounts[row] * 100)
+    days, balances, total = [], [], 0
+    for day in sorted(cents):
+        total += cents[day]
+        days.append(day)
+        balances.append(total / 100)
+    return days, balances
+
+def test_matches_running_balance(ledger, records):
+    timeline = BalanceTimeline(ledger.attach("balance", BalanceIndex()))
+    days, balances = daily_balances(ledger)
+    assert timeline.bounds() == (days[0], days[-1])
+    assert list(timeline.days) == days
+    assert np.allclose(timeline.balances, balances)
+
+    # Added rows show up on the next read, including ones dated before the rest
+    ledger.append(dict(records[0], date="1990-06-01"))
+    days, balances = daily_balances(ledger)
+    assert timeline.bounds() == (days[0], days[-1])
+    assert np.allclose(timeline.balances, balances)
+
+def test_empty_ledger_has_no_bounds(ledger):
+    ledger.clear()
+    assert BalanceTimeline(ledger.attach("balance", BalanceIndex())).bounds() is None
+
+def test_short_line_is_kept_whole():
+    x = np.arange(10, dtype=float)
+    y = x * 2
+    sampled_x, sampled_y = downsample(x, y, 0, 9, 100)
+    assert list(sampled_x) == list(x) and list(sampled_y) == list(y)
+
+def test_keeps_extremes_of_every_pixel_column():
+    generator = np.random.default_rng(3)
+    x = np.arange(100000, dtype=float)
+    y = np.cumsum(generator.normal(size=len(x)))
+    width = 200
+    sampled_x, sampled_y = downsample(x, y, 20000, 80000, width)
+    assert len(sampled_x) <= 4 * (width + 2)
+    assert list(sampled_x) == sorted(sampled_x)
+
+    # The nearest point outside each edge is kept, so the line runs off the view
+    assert sampled_x[0] == 19999 and sampled_x[-1] == 80001
+
+    # Within each column, the lowest and highest point are among the samples
+    columns = np.floor((x - 20000) * (width / 60000)).astype(int)
+    for column in range(0, width, 17):
+        inside = columns == column
+        assert y[inside].min() in sampled_y and y[inside].max() in sampled_y